@@ -0,0 +1,46 @@
+"""
+签名开销基准测试，输出每次请求组装headers的耗时（微秒）
+python -m benchmarks.bench_auth
+"""
+import sys
+import time
+import uuid
+import timeit
+import hashlib
+
+import requests
+
+from wulaisdk.auth import Signer, make_user_agent
+from wulaisdk.client import SDK_VERSION
+
+pubkey = "bench_pubkey"
+secret = "bench_secret"
+
+
+def legacy_headers():
+    headers = {}
+    timestamp = str(int(time.time()))
+    nonce = uuid.uuid4().hex
+    sign = hashlib.sha1((nonce + timestamp + secret).encode("utf-8")).hexdigest()
+    data = {
+        "pubkey": pubkey,
+        "sign": sign,
+        "nonce": nonce,
+        "timestamp": timestamp
+    }
+    for k, v in data.items():
+        headers["Api-Auth-" + k] = v
+    py_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
+    headers["User-Agent"] = f"wulai-openapi-sdk-python/v2-{SDK_VERSION} python/{py_version} requests/{requests.__version__}"
+    return headers
+
+
+def main(number=200000):
+    signer = Signer(pubkey, secret, make_user_agent("v2", SDK_VERSION))
+    for name, fn in (("legacy", legacy_headers), ("signer", signer.headers)):
+        seconds = min(timeit.repeat(fn, number=number, repeat=3))
+        print("{:<8} {:.2f} us/request".format(name, seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+json编解码基准测试，对比标准库json与orjson
+python -m benchmarks.bench_codec
+"""
+import json
+import timeit
+
+from wulaisdk.codec import JSONCodec, OrjsonCodec, orjson
+
+
+def batch_create_knowledge(n):
+    return {"knowledge_items": [{
+        "knowledge_tag": {"parent_knowledge_tag_id": "0", "id": "1", "name": "分类"},
+        "similar_questions": [{"knowledge_id": str(i), "question": "相似问{}".format(j)} for j in range(10)],
+        "user_attribute_group_answers": [],
+        "knowledge": {
+            "status": True, "standard_question": "标准问{}".format(i), "respond_all": True,
+            "maintained_by_user_attribute_group": False,
+        },
+    } for i in range(n)]}
+
+
+def knowledge_items(n):
+    return {"page_count": 10, "knowledge_items": [{
+        "knowledge_tag": {"parent_knowledge_tag_id": "0", "id": "1", "name": "分类"},
+        "similar_questions": [{"knowledge_id": str(i), "question": "相似问{}".format(j), "id": str(j)}
+                              for j in range(10)],
+        "knowledge": {
+            "status": True, "update_time": "2020-01-01 00:00:00", "maintained_by_user_attribute_group": False,
+            "standard_question": "标准问{}".format(i), "create_time": "2020-01-01 00:00:00", "respond_all": True,
+            "id": str(i),
+        },
+    } for i in range(n)]}
+
+
+def message_history(n):
+    return {"has_more": True, "msg": [{
+        "direction": "FROM_USER",
+        "sender_info": {"avatar_url": "", "nickname": "", "real_name": ""},
+        "msg_type": "TEXT", "extra": "", "msg_id": str(i), "msg_ts": "1576480000000",
+        "user_info": {"avatar_url": "", "nickname": "用户"},
+        "msg_body": {"text": {"content": "你好，请问怎么退货？"}},
+    } for i in range(n)]}
+
+
+def bench(name, fn, number=20):
+    seconds = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print("{:<48} {:>8.3f} ms".format(name, seconds * 1e3))
+
+
+def main():
+    codecs = [JSONCodec()]
+    if orjson is not None:
+        codecs.append(OrjsonCodec())
+    else:
+        print("orjson is not installed")
+    cases = [
+        ("batch_create_knowledge 1000 items (encode)", batch_create_knowledge(1000), "dumps"),
+        ("knowledge_items 200 items (decode)", knowledge_items(200), "loads"),
+        ("get_message_history 1000 msgs (decode)", message_history(1000), "loads"),
+    ]
+    for name, payload, direction in cases:
+        data = json.dumps(payload).encode("utf-8")
+        for codec in codecs:
+            if direction == "dumps":
+                bench("{} {}".format(name, codec.name), lambda: codec.dumps(payload))
+            else:
+                bench("{} {}".format(name, codec.name), lambda: codec.loads(data))
+
+
+if __name__ == "__main__":
+    main()
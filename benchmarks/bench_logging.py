@@ -0,0 +1,46 @@
+"""
+日志开销基准测试，debug=False时每次请求日志语句的耗时（微秒）
+legacy为原先无论日志级别都先执行str.format的写法
+python -m benchmarks.bench_logging
+"""
+import logging
+import timeit
+
+from wulaisdk.log import log_event
+
+logger = logging.getLogger("wulaisdk.bench")
+logger.setLevel(logging.ERROR)
+
+action = "/qa/knowledge-items/batch-create"
+endpoint = "https://openapi.wul.ai"
+opts = {"method": "POST", "retry": None, "timeout": 5, "response_format": "model"}
+
+
+def make_payload(size):
+    return {"knowledge_items": [{"knowledge": {"standard_question": "question-{}".format(i), "status": True},
+                                 "similar_questions": [{"question": "similar-{}".format(i)}]}
+                                for i in range(size)]}
+
+
+def legacy(params):
+    logger.debug("Request received. Action: {}. Endpoint: {}. Params: {}. Opts: {}".format(
+        action, endpoint, params, opts))
+    logger.debug("Response received. Action: {}. Response-body: {}".format(action, params))
+
+
+def deferred(params):
+    log_event(logger, logging.DEBUG, "Request received", action=action, endpoint=endpoint, params=params, opts=opts)
+    log_event(logger, logging.DEBUG, "Response received", action=action, body=params)
+
+
+def main():
+    for size in (1, 100, 1000):
+        params = make_payload(size)
+        number = max(20, 200000 // size)
+        for name, fn in (("legacy", legacy), ("deferred", deferred)):
+            seconds = min(timeit.repeat(lambda: fn(params), number=number, repeat=3))
+            print("{:<8} items={:<5} {:.2f} us/request".format(name, size, seconds / number * 1e6))
+
+
+if __name__ == "__main__":
+    main()
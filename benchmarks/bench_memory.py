@@ -0,0 +1,60 @@
+"""
+响应类内存占用基准测试（tracemalloc），对比普通响应类与slotted生成的__slots__响应类
+python -m benchmarks.bench_memory
+"""
+import gc
+import tracemalloc
+
+from wulaisdk.response.slots import slotted
+from wulaisdk.response.category_talk import HistoryMessage
+from wulaisdk.response.category_nlp import MiningResult
+
+
+def history_message(n):
+    return {
+        "has_more": False,
+        "msg": [{
+            "direction": "FROM_USER",
+            "sender_info": {"avatar_url": "", "nickname": "bot", "real_name": ""},
+            "msg_type": "TEXT",
+            "extra": "",
+            "msg_id": str(i),
+            "msg_ts": "1576480000000",
+            "user_info": {"avatar_url": "", "nickname": "user"},
+            "msg_body": {"text": {"content": "你好"}},
+        } for i in range(n)],
+    }
+
+
+def mining_result(n):
+    return {
+        "status": "COMPLETED",
+        "page_count": 1,
+        "clusters": [{"id": i, "sentences": [{"id": j, "sentence": "你好"} for j in range(10)]} for i in range(n)],
+    }
+
+
+def measure(model, body):
+    gc.collect()
+    tracemalloc.start()
+    resp = model.from_dict(body)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del resp
+    return size
+
+
+def main():
+    cases = [
+        ("HistoryMessage 100k msgs", HistoryMessage, history_message(100000)),
+        ("MiningResult 10k clusters", MiningResult, mining_result(10000)),
+    ]
+    for name, model, body in cases:
+        regular = measure(model, body)
+        compact = measure(slotted(model), body)
+        print("{:<28} regular {:>8.1f} MB  slots {:>8.1f} MB  ({:.0%})".format(
+            name, regular / 2 ** 20, compact / 2 ** 20, compact / regular))
+
+
+if __name__ == "__main__":
+    main()
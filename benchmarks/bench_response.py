@@ -0,0 +1,83 @@
+"""
+响应解析基准测试，对比每次调用inspect.signature的旧解析方式与按类预先生成解析计划的新方式
+python -m benchmarks.bench_response
+"""
+import inspect
+import timeit
+
+from contextlib import contextmanager
+
+from wulaisdk.response import BaseModel
+from wulaisdk.response.category_knowledge import SimilarQuestions, KnowledgeItems
+from wulaisdk.response.category_dictionary import DictionaryTerms
+
+
+def legacy_from_dict(cls, env, lazy=False):
+    if not isinstance(env, dict):
+        return env
+    parameters = inspect.signature(cls).parameters
+    return cls(**{
+        k: v for k, v in env.items()
+        if k in parameters or set(parameters.keys()) == {'kwargs'}
+    })
+
+
+@contextmanager
+def legacy_parsing():
+    from_dict = BaseModel.__dict__["from_dict"]
+    BaseModel.from_dict = classmethod(legacy_from_dict)
+    try:
+        yield
+    finally:
+        BaseModel.from_dict = from_dict
+
+
+def similar_questions(n):
+    return {
+        "page_count": 1,
+        "similar_questions": [{"knowledge_id": "1", "question": "q{}".format(i), "id": str(i)} for i in range(n)],
+    }
+
+
+def dictionary_terms(n):
+    return {
+        "page_count": 1,
+        "term_item": [{"term": {"name": "t{}".format(i), "id": str(i)}, "synonyms": ["s"]} for i in range(n)],
+    }
+
+
+def knowledge_items(n):
+    return {
+        "page_count": 1,
+        "knowledge_items": [{
+            "knowledge_tag": {"parent_knowledge_tag_id": "0", "id": "1", "name": "tag"},
+            "similar_questions": [{"knowledge_id": str(i), "question": "q", "id": str(j)} for j in range(5)],
+            "knowledge": {
+                "status": True, "update_time": "", "maintained_by_user_attribute_group": False,
+                "standard_question": "q{}".format(i), "create_time": "", "respond_all": True, "id": str(i),
+            },
+        } for i in range(n)],
+    }
+
+
+def bench(name, fn, number=20):
+    seconds = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print("{:<40} {:>10.3f} ms/page".format(name, seconds * 1e3))
+
+
+def main(n=1000):
+    cases = [
+        ("SimilarQuestions", SimilarQuestions, similar_questions(n)),
+        ("DictionaryTerms", DictionaryTerms, dictionary_terms(n)),
+        ("KnowledgeItems", KnowledgeItems, knowledge_items(n)),
+    ]
+    print("{} items per page".format(n))
+    for name, model, body in cases:
+        with legacy_parsing():
+            bench("{} legacy".format(name), lambda: model.from_dict(body))
+        bench("{} compiled".format(name), lambda: model.from_dict(body))
+        bench("{} lazy".format(name), lambda: model.from_dict(body, lazy=True))
+
+
+if __name__ == "__main__":
+    main()
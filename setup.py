@@ -25,5 +25,11 @@ setup(
     packages=find_packages(),
     include_package_data=True,
     platforms="any",
-    install_requires=["requests"]
+    install_requires=["requests"],
+    extras_require={
+        "async": ["httpx"],
+        "http2": ["httpx[http2]"],
+        "orjson": ["orjson"],
+        "tracing": ["opentelemetry-api"],
+    }
 )
@@ -0,0 +1,94 @@
+"""
+异步client测试，使用httpx.MockTransport模拟服务端
+"""
+import json
+import asyncio
+import pytest
+
+httpx = pytest.importorskip("httpx")
+
+from wulaisdk.async_client import AsyncWulaiClient
+from wulaisdk.request import CommonRequest
+from wulaisdk.exceptions import ClientException, ServerException
+from wulaisdk.response.category_talk import BotResponse
+from tests.utils import AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def make_client(handler):
+    return AsyncWulaiClient(pubkey, secret, pool=AsyncMockTransport(handler))
+
+
+def bot_response_handler(request):
+    body = json.loads(request.content)
+    assert request.url.path == "/v2/msg/bot-response"
+    assert request.headers["Api-Auth-pubkey"] == pubkey
+    return httpx.Response(200, json={
+        "is_dispatch": False,
+        "suggested_response": [],
+        "msg_id": body["user_id"],
+        "extra": "",
+    })
+
+
+def test_async_bot_response():
+    async def main():
+        async with make_client(bot_response_handler) as client:
+            return await client.get_bot_response("shierlou", {"text": {"content": "你好"}})
+
+    resp = asyncio.run(main())
+    assert isinstance(resp, BotResponse)
+    assert resp.msg_id == "shierlou"
+
+
+def test_async_concurrent_requests():
+    async def main():
+        async with make_client(bot_response_handler) as client:
+            return await asyncio.gather(*[
+                client.get_bot_response("user-{}".format(i), {"text": {"content": "你好"}}) for i in range(50)
+            ])
+
+    resps = asyncio.run(main())
+    assert [r.msg_id for r in resps] == ["user-{}".format(i) for i in range(50)]
+
+
+@pytest.mark.parametrize('status_code,exception_class', [
+    (400, ClientException),
+    (401, ClientException),
+    (500, ServerException),
+])
+def test_async_error_response(status_code, exception_class):
+    def handler(request):
+        return httpx.Response(status_code, json={"message": "error"})
+
+    async def main():
+        async with make_client(handler) as client:
+            request = CommonRequest("/user/create", {"user_id": "shierlou"}, {"retry": 0})
+            await client.process_common_request(request)
+
+    with pytest.raises(exception_class):
+        asyncio.run(main())
+
+
+def test_async_connection_error():
+    def handler(request):
+        raise httpx.ConnectError("connection refused")
+
+    async def main():
+        async with make_client(handler) as client:
+            await client.create_user("shierlou", retry=0)
+
+    with pytest.raises(ClientException) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.error_code == "SDK_SERVER_UNREACHABLE"
+
+
+def test_async_raw_response_format():
+    async def main():
+        async with make_client(bot_response_handler) as client:
+            return await client.get_bot_response("shierlou", {"text": {"content": "你好"}}, response_format="raw")
+
+    resp = asyncio.run(main())
+    assert json.loads(resp)["msg_id"] == "shierlou"
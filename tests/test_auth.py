@@ -0,0 +1,72 @@
+"""
+签名测试
+"""
+import os
+import hashlib
+import pytest
+
+from wulaisdk.auth import Signer, NonceSource, make_user_agent
+from wulaisdk.client import WulaiClient, SDK_VERSION
+from tests.utils import FakeTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def check_sign(headers):
+    expected = hashlib.sha1(
+        (headers["Api-Auth-nonce"] + headers["Api-Auth-timestamp"] + secret).encode("utf-8")).hexdigest()
+    assert headers["Api-Auth-sign"] == expected
+    assert headers["Api-Auth-pubkey"] == pubkey
+
+
+@pytest.mark.parametrize('user_agent', [None, "ua"])
+def test_signer_headers(user_agent):
+    signer = Signer(pubkey, secret, user_agent)
+    headers = signer.headers()
+    check_sign(headers)
+    assert headers.get("User-Agent") == user_agent
+    check_sign(signer.auth_headers())
+
+
+def test_nonce_source():
+    source = NonceSource(batch_size=4)
+    nonces = [source.next() for _ in range(10)]
+    assert len(set(nonces)) == 10
+    assert all(len(nonce) == 32 for nonce in nonces)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="requires os.fork")
+def test_nonce_source_after_fork():
+    source = NonceSource()
+    source.next()
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        os.write(write_fd, source.next().encode("ascii"))
+        os._exit(0)
+    os.close(write_fd)
+    child_nonce = os.read(read_fd, 32).decode("ascii")
+    os.close(read_fd)
+    os.waitpid(pid, 0)
+    assert len(child_nonce) == 32
+    assert child_nonce != source.next()
+
+
+def test_client_request_headers():
+    headers = []
+
+    def handler(method, url, data, request_headers):
+        headers.append(request_headers)
+        return 200, {"avatar_url": "", "nickname": "shierlou"}
+
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    client.get_user("shierlou")
+    client.get_user("shierlou")
+    for request_headers in headers:
+        check_sign(request_headers)
+        assert request_headers["User-Agent"] == make_user_agent("v2", SDK_VERSION)
+        assert request_headers["Content-Type"] == "application/json"
+    assert headers[0]["Api-Auth-nonce"] != headers[1]["Api-Auth-nonce"]
+    check_sign(client.make_authentication(pubkey, secret))
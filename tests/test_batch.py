@@ -0,0 +1,85 @@
+"""
+批量请求测试
+"""
+import json
+import time
+import random
+import asyncio
+import threading
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.request import CommonRequest
+from wulaisdk.exceptions import ClientException
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def make_requests(n):
+    return [CommonRequest("/user/get", {"user_id": "user-{}".format(i)}, {"retry": 0}) for i in range(n)]
+
+
+def handler(method, url, data, headers):
+    time.sleep(random.random() / 100)
+    if data["user_id"].endswith("3"):
+        return 400, {"message": "invalid user"}
+    return 200, {"user_id": data["user_id"]}
+
+
+@pytest.mark.parametrize('n,concurrency', [
+    (0, 4),
+    (1, 4),
+    (50, 8),
+])
+def test_execute_many(n, concurrency):
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def counting_handler(method, url, data, headers):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        try:
+            return handler(method, url, data, headers)
+        finally:
+            with lock:
+                active.pop()
+
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(counting_handler))
+    results = client.execute_many(make_requests(n), concurrency=concurrency)
+
+    assert len(results) == n
+    assert max(peak or [0]) <= concurrency
+    for i, result in enumerate(results):
+        assert result.request.params["user_id"] == "user-{}".format(i)
+        if i % 10 == 3:
+            assert not result.ok
+            assert isinstance(result.exception, ClientException)
+            with pytest.raises(ClientException):
+                result.result()
+        else:
+            assert result.ok
+            assert result.result() == {"user_id": "user-{}".format(i)}
+
+
+def test_async_execute_many():
+    httpx = pytest.importorskip("httpx")
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    def async_handler(request):
+        user_id = json.loads(request.content)["user_id"]
+        if user_id.endswith("3"):
+            return httpx.Response(400, json={"message": "invalid user"})
+        return httpx.Response(200, json={"user_id": user_id})
+
+    async def main():
+        pool = AsyncMockTransport(async_handler)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool) as client:
+            return await client.execute_many(make_requests(30), concurrency=4)
+
+    results = asyncio.run(main())
+    assert [r.ok for r in results] == [i % 10 != 3 for i in range(30)]
+    assert [r.body["user_id"] for r in results if r.ok] == ["user-{}".format(i) for i in range(30) if i % 10 != 3]
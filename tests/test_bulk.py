@@ -0,0 +1,224 @@
+"""
+分块批量提交及上传测试
+"""
+import asyncio
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.bulk import chunk_items, merge_list_bodies, QueryFilter, Checkpoint
+from wulaisdk.response.category_knowledge import KnowledgeBatchCreate
+from wulaisdk.response.category_nlp import MiningUpload
+from wulaisdk.exceptions import ClientException, ServerException, BulkPartialFailure
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def knowledge_item(i):
+    return {
+        "knowledge_tag": {"parent_knowledge_tag_id": "0", "id": "1", "name": "tag"},
+        "similar_questions": [],
+        "user_attribute_group_answers": [],
+        "knowledge": {"standard_question": "question-{}".format(i), "status": True, "respond_all": True,
+                      "maintained_by_user_attribute_group": False, "update_time": "0", "create_time": "0"},
+    }
+
+
+def batch_create_handler(failures=None):
+    failures = failures if failures is not None else {}
+
+    def handler(method, url, data, headers):
+        items = data["knowledge_items"]
+        first = items[0]["knowledge"]["standard_question"]
+        if failures.get(first):
+            failures[first] -= 1
+            return 429, {"message": "too many requests"}
+        related = []
+        for item in items:
+            knowledge = dict(item["knowledge"], id=item["knowledge"]["standard_question"].split("-")[1])
+            related.append(dict(item, knowledge=knowledge))
+        return 200, {"knowledge_related_items": related}
+    return handler
+
+
+@pytest.mark.parametrize('sizes,max_items,max_bytes,expected', [
+    ([], 3, None, []),
+    ([1, 1, 1, 1, 1], 2, None, [2, 2, 1]),
+    ([1, 1, 1, 1], 10, 8, [2, 2]),
+    ([1, 100, 1], 10, 8, [1, 1, 1]),
+])
+def test_chunk_items(sizes, max_items, max_bytes, expected):
+    items = ["x" * size for size in sizes]
+    chunks = list(chunk_items(items, max_items, max_bytes))
+    assert [len(chunk) for chunk in chunks] == expected
+    assert [item for chunk in chunks for item in chunk] == items
+
+
+def test_merge_list_bodies():
+    bodies = [{"items": [1, 2]}, {}, {"items": [3]}, None]
+    assert merge_list_bodies(bodies, "items") == {"items": [1, 2, 3]}
+
+
+def test_bulk_create_knowledge():
+    transport = FakeTransport(batch_create_handler())
+    client = WulaiClient(pubkey, secret, pool=transport)
+    resp = client.bulk_create_knowledge((knowledge_item(i) for i in range(25)), chunk_size=10, concurrency=3)
+    assert isinstance(resp, KnowledgeBatchCreate)
+    assert [item.knowledge.id for item in resp.knowledge_related_items] == [str(i) for i in range(25)]
+    assert sorted(len(call[2]["knowledge_items"]) for call in transport.calls) == [5, 10, 10]
+
+
+def test_bulk_create_knowledge_dict():
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(batch_create_handler()), response_format="dict")
+    resp = client.bulk_create_knowledge([knowledge_item(i) for i in range(3)], chunk_size=2)
+    assert [item["knowledge"]["id"] for item in resp["knowledge_related_items"]] == ["0", "1", "2"]
+
+
+def test_bulk_create_knowledge_retries_failed_chunks():
+    failures = {"question-10": 1}
+    transport = FakeTransport(batch_create_handler(failures))
+    client = WulaiClient(pubkey, secret, pool=transport)
+    resp = client.bulk_create_knowledge([knowledge_item(i) for i in range(30)], chunk_size=10, retry=0)
+    assert [item.knowledge.id for item in resp.knowledge_related_items] == [str(i) for i in range(30)]
+    assert len(transport.calls) == 4
+
+
+def test_bulk_create_knowledge_does_not_retry_processed_chunks():
+    calls = []
+
+    def handler(method, url, data, headers):
+        calls.append(data)
+        return 500, {"message": "error"}
+
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    with pytest.raises(BulkPartialFailure) as e:
+        client.bulk_create_knowledge([knowledge_item(0)], chunk_retries=3, retry=0)
+    assert isinstance(e.value.failed[0][2], ServerException)
+    assert len(calls) == 1
+
+
+def test_bulk_create_knowledge_partial_failure():
+    def handler(method, url, data, headers):
+        if data["knowledge_items"][0]["knowledge"]["standard_question"] == "question-2":
+            return 500, {"message": "error"}
+        return batch_create_handler()(method, url, data, headers)
+
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    items = [knowledge_item(i) for i in range(5)]
+    with pytest.raises(BulkPartialFailure) as e:
+        client.bulk_create_knowledge(items, chunk_size=2, retry=0)
+    # 成功的块保留结果，只需重新提交失败的块
+    assert isinstance(e.value.result, KnowledgeBatchCreate)
+    assert [item.knowledge.id for item in e.value.result.knowledge_related_items] == ["0", "1", "4"]
+    assert [(index, exception.http_status_code) for index, _, exception in e.value.failed] == [(1, 500)]
+    assert e.value.failed_items == items[2:4]
+    assert e.value.error_code == "SDK_BULK_PARTIAL_FAILURE"
+
+
+def test_async_bulk_create_knowledge():
+    httpx = pytest.importorskip("httpx")
+    import json
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    handle = batch_create_handler({"question-0": 1})
+
+    def handler(request):
+        data = json.loads(request.content)
+        status, body = handle("POST", str(request.url), data, request.headers)
+        return httpx.Response(status, json=body)
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool) as client:
+            return await client.bulk_create_knowledge([knowledge_item(i) for i in range(7)], chunk_size=3, retry=0)
+
+    resp = asyncio.run(main())
+    assert [item.knowledge.id for item in resp.knowledge_related_items] == [str(i) for i in range(7)]
+
+
+def mining_upload_handler(fail_first=None):
+    uploaded = []
+
+    def handler(method, url, data, headers):
+        queries = data["queries"]
+        if fail_first is not None and fail_first in queries:
+            return 500, {"message": "error"}
+        uploaded.extend(queries)
+        return 200, {"succeeded_count": len(queries), "failed_count": 0, "duplicated_count": 0}
+    return handler, uploaded
+
+
+def test_query_filter():
+    query_filter = QueryFilter()
+    assert list(query_filter.filter(["a\n", " b ", "\n", "a", "c", "b"])) == ["a", "b", "c"]
+    assert query_filter.duplicated_count == 2
+    assert list(QueryFilter(dedupe=False).filter(["a", "a"])) == ["a", "a"]
+
+
+def test_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    checkpoint = Checkpoint(path, 10)
+    checkpoint.mark_done(0, {"succeeded_count": 10})
+    checkpoint.mark_done(2, {"succeeded_count": 5})
+    checkpoint.save()
+
+    checkpoint = Checkpoint(path, 10)
+    assert checkpoint.completed == 1
+    assert [checkpoint.is_done(i) for i in range(3)] == [True, False, True]
+    assert checkpoint.counts == {"succeeded_count": 15}
+    checkpoint.mark_done(1, {"succeeded_count": 10})
+    assert checkpoint.completed == 3 and not checkpoint.done
+
+    with pytest.raises(ClientException):
+        Checkpoint(path, 20)
+
+
+def test_bulk_mining_upload():
+    handler, uploaded = mining_upload_handler()
+    transport = FakeTransport(handler)
+    client = WulaiClient(pubkey, secret, pool=transport)
+    queries = ["query-{}\n".format(i % 40) for i in range(50)]
+    resp = client.bulk_mining_upload(iter(queries), chunk_size=15, concurrency=2)
+    assert isinstance(resp, MiningUpload)
+    assert (resp.succeeded_count, resp.failed_count, resp.duplicated_count) == (40, 0, 10)
+    assert uploaded == ["query-{}".format(i) for i in range(40)]
+    assert len(transport.calls) == 3
+
+
+def test_bulk_mining_upload_resumes_from_checkpoint(tmp_path):
+    path = str(tmp_path / "checkpoint.json")
+    queries = ["query-{}".format(i) for i in range(50)]
+
+    handler, uploaded = mining_upload_handler(fail_first="query-30")
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    with pytest.raises(ServerException):
+        client.bulk_mining_upload(queries, chunk_size=10, concurrency=2, checkpoint_path=path, retry=0)
+    assert uploaded == queries[:30]
+
+    handler, uploaded = mining_upload_handler()
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), response_format="dict")
+    resp = client.bulk_mining_upload(queries, chunk_size=10, concurrency=2, checkpoint_path=path)
+    assert uploaded == queries[30:]
+    assert resp == {"succeeded_count": 50, "failed_count": 0, "duplicated_count": 0}
+
+
+def test_async_bulk_mining_upload():
+    httpx = pytest.importorskip("httpx")
+    import json
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    handle, uploaded = mining_upload_handler()
+
+    def handler(request):
+        status, body = handle("POST", str(request.url), json.loads(request.content), request.headers)
+        return httpx.Response(status, json=body)
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool) as client:
+            return await client.bulk_mining_upload(["a", "b", "a", "c"], chunk_size=2)
+
+    resp = asyncio.run(main())
+    assert (resp.succeeded_count, resp.duplicated_count) == (3, 1)
+    assert sorted(uploaded) == ["a", "b", "c"]
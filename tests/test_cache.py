@@ -0,0 +1,150 @@
+"""
+响应缓存测试
+"""
+import time
+import asyncio
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.request import CommonRequest
+from wulaisdk.cache import LRUCache, ResponseCache
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def user_handler(method, url, data, headers):
+    if url.endswith("/user/get"):
+        return 200, {"avatar_url": "", "nickname": data["user_id"]}
+    return 200, {}
+
+
+def test_lru_eviction():
+    cache = LRUCache(maxsize=2)
+    cache.set("a", {"v": 1}, 60)
+    cache.set("b", {"v": 2}, 60)
+    assert cache.get("a") == {"v": 1}
+    cache.set("c", {"v": 3}, 60)
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+    assert len(cache) == 2
+
+
+def test_lru_ttl():
+    cache = LRUCache()
+    cache.set("a", {"v": 1}, 0.05)
+    assert cache.get("a") == {"v": 1}
+    time.sleep(0.06)
+    assert cache.get("a") is None
+
+
+@pytest.mark.parametrize('action,applies', [
+    ("/user/get", True),
+    ("/qa/knowledge-items/list", True),
+    ("/scene/list", False),
+    ("/user/create", False),
+])
+def test_cache_applies(action, applies):
+    assert ResponseCache().applies(action) == applies
+
+
+def test_action_ttls():
+    cache = ResponseCache(action_ttls={"/scene/list": 600, "/user/get": 0})
+    assert cache.applies("/scene/list")
+    assert not cache.applies("/user/get")
+
+
+def test_client_cache_hit_and_invalidation():
+    transport = FakeTransport(user_handler)
+    cache = ResponseCache()
+    client = WulaiClient(pubkey, secret, pool=transport, response_cache=cache)
+    first = client.get_user("shierlou")
+    second = client.get_user("shierlou")
+    client.get_user("other")
+    assert first.nickname == second.nickname == "shierlou"
+    assert first is not second
+    assert len(transport.calls) == 2
+    assert cache.stats() == {"hits": 1, "misses": 2}
+
+    client.update_user("shierlou", nickname="new")
+    client.get_user("shierlou")
+    assert len(transport.calls) == 4
+    assert cache.stats() == {"hits": 1, "misses": 3}
+
+
+def test_client_cache_returns_copies():
+    transport = FakeTransport(user_handler)
+    client = WulaiClient(pubkey, secret, pool=transport, response_cache=ResponseCache(), response_format="dict")
+    first = client.get_user("shierlou")
+    first["nickname"] = "MUTATED"
+    second = client.get_user("shierlou")
+    second["avatar_url"] = "MUTATED"
+    third = client.get_user("shierlou")
+    assert first is not second
+    assert third == {"avatar_url": "", "nickname": "shierlou"}
+    assert len(transport.calls) == 1
+
+
+def test_client_cache_write_during_read():
+    state = {"nickname": "old"}
+
+    def handler(method, url, data, headers):
+        if url.endswith("/user/get"):
+            body = {"avatar_url": "", "nickname": state["nickname"]}
+            # 读请求返回前，另一个client的写操作已生效
+            writer.update_user("shierlou", nickname="new")
+            return 200, body
+        state["nickname"] = data["nickname"]
+        return 200, {}
+
+    cache = ResponseCache()
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), response_cache=cache)
+    writer = WulaiClient(pubkey, secret, pool=FakeTransport(handler), response_cache=cache)
+    assert client.get_user("shierlou").nickname == "old"
+    assert client.get_user("shierlou").nickname == "new"
+
+
+def test_shared_backend_invalidation():
+    backend = LRUCache()
+    transport = FakeTransport(user_handler)
+    # 两个ResponseCache共用一个后端，模拟多个进程共用进程外缓存
+    reader = WulaiClient(pubkey, secret, pool=transport, response_cache=ResponseCache(backend=backend))
+    writer = WulaiClient(pubkey, secret, pool=transport, response_cache=ResponseCache(backend=backend))
+    reader.get_user("shierlou")
+    writer.get_user("shierlou")
+    assert len(transport.calls) == 1
+    writer.update_user("shierlou", nickname="new")
+    reader.get_user("shierlou")
+    assert len(transport.calls) == 3
+
+
+def test_client_cache_skips_errors():
+    responses = [(500, {"message": "error"}), (200, {"avatar_url": "", "nickname": "shierlou"})]
+    transport = FakeTransport(lambda method, url, data, headers: responses.pop(0))
+    client = WulaiClient(pubkey, secret, pool=transport, response_cache=ResponseCache())
+    with pytest.raises(Exception):
+        client.get_user("shierlou", retry=0)
+    assert client.get_user("shierlou").nickname == "shierlou"
+    assert client.get_user("shierlou").nickname == "shierlou"
+    assert len(transport.calls) == 2
+
+
+def test_async_client_cache():
+    httpx = pytest.importorskip("httpx")
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    calls = []
+
+    def handler(request):
+        calls.append(request.url.path)
+        return httpx.Response(200, json={"avatar_url": "", "nickname": "shierlou"})
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool, response_cache=ResponseCache()) as client:
+            await client.get_user("shierlou")
+            await client.process_common_request(CommonRequest("/user/get", {"user_id": "shierlou"}, {}))
+
+    asyncio.run(main())
+    assert calls == ["/v2/user/get"]
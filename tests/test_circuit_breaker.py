@@ -0,0 +1,125 @@
+"""
+熔断器测试
+"""
+import time
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.retry import RetryPolicy
+from wulaisdk.circuit_breaker import CircuitBreaker, CircuitBreakers, CLOSED, OPEN, HALF_OPEN
+from wulaisdk.exceptions import ClientException, ServerException
+from tests.utils import FakeTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def test_circuit_breaker_states():
+    breaker = CircuitBreaker(failure_rate_threshold=0.5, window_size=4, min_calls=4,
+                             open_duration=0.05, half_open_max_calls=2)
+    for failed in (False, False, True, False):
+        assert breaker.allow_request()
+        breaker.record(failed, 0.01)
+    assert breaker.state == CLOSED
+    breaker.record(True, 0.01)
+    assert breaker.state == OPEN
+    assert not breaker.allow_request()
+
+    time.sleep(0.06)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record(False, 0.01)
+    breaker.record(False, 0.01)
+    assert breaker.state == CLOSED
+
+
+def test_circuit_breaker_half_open_failure():
+    breaker = CircuitBreaker(window_size=2, min_calls=2, open_duration=0.01, half_open_max_calls=1)
+    breaker.record(True, 0.01)
+    breaker.record(True, 0.01)
+    assert breaker.state == OPEN
+    time.sleep(0.02)
+    assert breaker.allow_request()
+    breaker.record(True, 0.01)
+    assert breaker.state == OPEN
+
+
+def test_circuit_breaker_slow_calls():
+    breaker = CircuitBreaker(slow_call_rate_threshold=0.5, slow_call_duration=1.0, window_size=2, min_calls=2)
+    breaker.record(False, 2.0)
+    breaker.record(False, 2.0)
+    assert breaker.state == OPEN
+
+
+def test_circuit_breakers_in_client():
+    def handler(method, url, data, headers):
+        if url.endswith("/msg/bot-response"):
+            return 503, {"message": "unavailable"}
+        return 200, {"avatar_url": "", "nickname": "shierlou"}
+
+    transport = FakeTransport(handler)
+    breakers = CircuitBreakers(failure_rate_threshold=0.6, window_size=8, min_calls=4, open_duration=60)
+    client = WulaiClient(pubkey, secret, pool=transport, circuit_breakers=breakers,
+                         retry_policy=RetryPolicy(max_retries=0))
+    for _ in range(4):
+        client.get_user("shierlou")
+    for _ in range(4):
+        with pytest.raises(ServerException):
+            client.get_bot_response("shierlou", {"text": {"content": "你好"}})
+
+    # bot-response熔断，快速失败，不再发出请求
+    calls = len(transport.calls)
+    with pytest.raises(ClientException) as excinfo:
+        client.get_bot_response("shierlou", {"text": {"content": "你好"}})
+    assert excinfo.value.error_code == "SDK_CIRCUIT_OPEN"
+    assert len(transport.calls) == calls
+
+    # 其他action不受影响
+    assert breakers.states()[client.endpoint] == CLOSED
+    assert breakers.states()[(client.endpoint, "/msg/bot-response")] == OPEN
+    client.get_user("shierlou")
+    assert len(transport.calls) == calls + 1
+
+
+def test_circuit_breakers_ignore_client_errors():
+    transport = FakeTransport(lambda method, url, data, headers: (400, {"message": "invalid"}))
+    breakers = CircuitBreakers(window_size=2, min_calls=2)
+    client = WulaiClient(pubkey, secret, pool=transport, circuit_breakers=breakers)
+    for _ in range(5):
+        with pytest.raises(ClientException) as excinfo:
+            client.get_user("shierlou")
+        assert excinfo.value.error_code == "SDK_INVALID_PARAMS"
+    assert set(breakers.states().values()) == {CLOSED}
+
+
+def test_circuit_breakers_record_unexpected_errors():
+    def handler(method, url, data, headers):
+        raise RuntimeError("unexpected")
+
+    breakers = CircuitBreakers(window_size=2, min_calls=2, open_duration=60)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), circuit_breakers=breakers)
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            client.get_user("shierlou")
+    assert breakers.states()[client.endpoint] == OPEN
+
+
+def test_slow_successful_calls_with_defaults():
+    breakers = CircuitBreakers()
+    endpoint = "https://openapi.wul.ai"
+    for _ in range(20):
+        breakers.record(breakers.acquire(endpoint, "/qa/knowledge-items/batch-create"), None, 3.5)
+    assert set(breakers.states().values()) == {CLOSED}
+    breakers.acquire(endpoint, "/msg/bot-response")
+
+
+def test_slow_calls_only_open_action_breaker():
+    breakers = CircuitBreakers(slow_call_rate_threshold=0.5, slow_call_duration=1, window_size=4, min_calls=4)
+    endpoint = "https://openapi.wul.ai"
+    for _ in range(4):
+        breakers.record(breakers.acquire(endpoint, "/qa/knowledge-items/batch-create"), None, 2)
+    assert breakers.states()[endpoint] == CLOSED
+    assert breakers.states()[(endpoint, "/qa/knowledge-items/batch-create")] == OPEN
+    breakers.acquire(endpoint, "/msg/bot-response")
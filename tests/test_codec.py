@@ -0,0 +1,59 @@
+"""
+json编解码测试
+"""
+import json
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.codec import JSONCodec, OrjsonCodec, get_codec
+from wulaisdk.exceptions import ClientException
+from tests.utils import FakeTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+payload = {"user_id": "shierlou", "msg_body": {"text": {"content": "你好"}}, "extra": [1, 2.5, None, True]}
+
+
+@pytest.mark.parametrize('name', ["json", "orjson"])
+def test_codec_roundtrip(name):
+    if name == "orjson":
+        pytest.importorskip("orjson")
+    codec = get_codec(name)
+    data = codec.dumps(payload)
+    assert isinstance(data, bytes)
+    assert json.loads(data) == payload
+    assert codec.loads(data) == payload
+
+
+def test_get_codec():
+    assert get_codec(None) is None
+    assert isinstance(get_codec("fast"), JSONCodec)
+    codec = JSONCodec()
+    assert get_codec(codec) is codec
+    with pytest.raises(ClientException):
+        get_codec("yaml")
+    with pytest.raises(ClientException):
+        get_codec(object())
+
+
+@pytest.mark.parametrize('codec', ["json", "fast", None])
+def test_client_codec(codec):
+    bodies = []
+
+    def handler(method, url, data, headers):
+        bodies.append(data)
+        return 200, {"avatar_url": "", "nickname": "shierlou"}
+
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), codec=codec)
+    assert client.get_user("shierlou").nickname == "shierlou"
+    if codec is None:
+        assert bodies == [{"user_id": "shierlou"}]
+    else:
+        assert isinstance(bodies[0], bytes)
+        assert json.loads(bodies[0]) == {"user_id": "shierlou"}
+
+
+def test_orjson_codec_non_str_keys():
+    pytest.importorskip("orjson")
+    assert json.loads(OrjsonCodec().dumps({1: "a"})) == {"1": "a"}
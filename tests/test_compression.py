@@ -0,0 +1,60 @@
+"""
+请求体压缩测试
+"""
+import gzip
+import json
+import zlib
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.compression import CompressionPolicy
+from wulaisdk.exceptions import ClientException
+from tests.utils import FakeTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+queries = [{"text": "句子{}".format(i)} for i in range(1000)]
+
+
+def make_client(compression):
+    requests = []
+
+    def handler(method, url, data, headers):
+        requests.append((data, dict(headers)))
+        if url.endswith("/user/get"):
+            return 200, {"avatar_url": "", "nickname": "shierlou"}
+        return 200, {"succeeded_count": 1000, "failed_count": 0, "duplicated_count": 0}
+
+    return WulaiClient(pubkey, secret, pool=FakeTransport(handler), compression=compression), requests
+
+
+@pytest.mark.parametrize('encoding,decompress', [
+    ("gzip", gzip.decompress),
+    ("deflate", zlib.decompress),
+])
+def test_compress_bulk_request(encoding, decompress):
+    client, requests = make_client(CompressionPolicy(min_size=1024, encoding=encoding))
+    client.mining_upload(queries)
+    data, headers = requests[0]
+    assert headers["Content-Encoding"] == encoding
+    assert headers["Accept-Encoding"] == "gzip, deflate"
+    assert json.loads(decompress(data)) == {"queries": queries}
+    assert len(data) < len(json.dumps({"queries": queries}, ensure_ascii=False).encode("utf-8"))
+
+
+def test_skip_small_and_other_requests():
+    client, requests = make_client(CompressionPolicy(min_size=1024 * 1024))
+    client.mining_upload(queries)
+    client.get_user("shierlou")
+    data, headers = requests[0]
+    assert "Content-Encoding" not in headers
+    assert json.loads(data) == {"queries": queries}
+    data, headers = requests[1]
+    assert "Content-Encoding" not in headers
+    assert data == {"user_id": "shierlou"}
+
+
+def test_invalid_encoding():
+    with pytest.raises(ClientException):
+        CompressionPolicy(encoding="br")
@@ -0,0 +1,198 @@
+"""
+对冲请求测试
+"""
+import json
+import time
+import asyncio
+import threading
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.hedge import HedgePolicy
+from wulaisdk.retry import RetryBudget
+from wulaisdk.ratelimit import TokenBucket
+from wulaisdk.exceptions import ServerException
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+msg_body = {"text": {"content": "你好"}}
+
+
+def bot_response(msg_id):
+    return {"is_dispatch": False, "suggested_response": [], "qa_suggested_response": [],
+            "task_suggested_response": [], "msg_id": msg_id, "extra": ""}
+
+
+def test_hedge_policy_delay():
+    policy = HedgePolicy(percentile=0.9, min_samples=10, min_delay=0.01)
+    assert policy.get_delay("/msg/bot-response") is None
+    for i in range(1, 11):
+        policy.record_latency("/msg/bot-response", i / 10)
+    assert policy.get_delay("/msg/bot-response") == 0.9
+    assert HedgePolicy(delay=0.2).get_delay("/msg/bot-response") == 0.2
+    assert not policy.applies("/user/create")
+
+
+def test_hedged_request_wins():
+    calls = []
+    lock = threading.Lock()
+
+    def handler(method, url, data, headers):
+        with lock:
+            calls.append(headers["Api-Auth-nonce"])
+            n = len(calls)
+        if n == 1:
+            time.sleep(0.5)
+        return 200, bot_response(str(n))
+
+    policy = HedgePolicy(delay=0.05)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), hedge_policy=policy)
+    start = time.monotonic()
+    resp = client.get_bot_response("shierlou", msg_body)
+    assert time.monotonic() - start < 0.4
+    assert resp.msg_id == "2"
+    # 对冲请求重新签名
+    assert len(set(calls)) == 2
+    assert policy.stats()["/msg/bot-response"] == {"requests": 1, "hedged": 1, "hedge_wins": 1}
+    client.close()
+
+
+def test_hedged_request_not_fired():
+    transport = FakeTransport(lambda method, url, data, headers: (200, bot_response("1")))
+    policy = HedgePolicy(delay=1)
+    client = WulaiClient(pubkey, secret, pool=transport, hedge_policy=policy)
+    for _ in range(3):
+        client.get_qa_bot_response("shierlou", msg_body)
+    client.create_user("shierlou")
+    assert len(transport.calls) == 4
+    assert policy.stats() == {"/msg/bot-response/qa": {"requests": 3, "hedged": 0, "hedge_wins": 0}}
+    client.close()
+
+
+def test_hedged_request_failure_falls_back():
+    def handler(method, url, data, headers):
+        time.sleep(0.1)
+        return 500, {"message": "error"}
+
+    policy = HedgePolicy(delay=0.01)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), hedge_policy=policy)
+    with pytest.raises(ServerException):
+        client.get_bot_response("shierlou", msg_body, retry=0)
+    assert policy.stats()["/msg/bot-response"]["hedge_wins"] == 0
+    client.close()
+
+
+def test_hedged_primary_not_queued():
+    def handler(method, url, data, headers):
+        time.sleep(0.1)
+        return 200, bot_response("1")
+
+    policy = HedgePolicy(delay=0.5, max_workers=2)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), hedge_policy=policy)
+    threads = [threading.Thread(target=client.get_bot_response, args=("shierlou", msg_body)) for _ in range(20)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 首个请求不受对冲线程池大小限制，也不会因排队触发对冲
+    assert time.monotonic() - start < 0.4
+    assert policy.stats()["/msg/bot-response"] == {"requests": 20, "hedged": 0, "hedge_wins": 0}
+    client.close()
+
+
+def test_hedged_primary_pool_full_falls_back():
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def handler(method, url, data, headers):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.1)
+        with lock:
+            active.pop()
+        return 200, bot_response("1")
+
+    policy = HedgePolicy(delay=0.5, max_primaries=2)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), hedge_policy=policy)
+    before = threading.active_count()
+    threads = [threading.Thread(target=client.get_bot_response, args=("shierlou", msg_body)) for _ in range(10)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 线程池已满时在调用方线程直接发出请求，不排队也不对冲，线程数不随调用次数增长
+    assert time.monotonic() - start < 0.4
+    assert max(peak) > 2
+    assert threading.active_count() <= before + 2
+    assert policy.stats()["/msg/bot-response"] == {"requests": 10, "hedged": 0, "hedge_wins": 0}
+    client.close()
+
+
+def test_hedge_budget():
+    def handler(method, url, data, headers):
+        time.sleep(0.05)
+        return 200, bot_response("1")
+
+    transport = FakeTransport(handler)
+    policy = HedgePolicy(delay=0.01, budget=RetryBudget(ratio=0.5, min_retries_per_second=0))
+    client = WulaiClient(pubkey, secret, pool=transport, hedge_policy=policy)
+    for _ in range(4):
+        client.get_bot_response("shierlou", msg_body)
+    assert policy.stats()["/msg/bot-response"]["hedged"] == 2
+    assert len(transport.calls) == 6
+    client.close()
+
+
+def test_hedge_consumes_rate_limit_token():
+    def handler(method, url, data, headers):
+        time.sleep(0.1)
+        return 200, bot_response("1")
+
+    transport = FakeTransport(handler)
+    policy = HedgePolicy(delay=0.01)
+    client = WulaiClient(pubkey, secret, pool=transport, hedge_policy=policy,
+                         rate_limiter=TokenBucket(rate=0.1, burst=3))
+    client.get_bot_response("shierlou", msg_body)
+    client.get_bot_response("shierlou", msg_body)
+    # 第一次调用的首个请求及对冲请求各消耗一个令牌，第二次调用的对冲请求没有可用令牌，不发出
+    assert policy.stats()["/msg/bot-response"]["hedged"] == 1
+    assert len(transport.calls) == 3
+    client.close()
+
+
+def test_async_hedged_request_cancels_loser():
+    httpx = pytest.importorskip("httpx")
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    calls = []
+    cancelled = []
+
+    async def handler(request):
+        calls.append(request)
+        n = len(calls)
+        if n == 1:
+            try:
+                await asyncio.sleep(1)
+            except asyncio.CancelledError:
+                cancelled.append(n)
+                raise
+        return httpx.Response(200, json=bot_response(str(n)))
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        policy = HedgePolicy(delay=0.05)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool, hedge_policy=policy) as client:
+            resp = await client.get_task_bot_response("shierlou", msg_body)
+            await asyncio.sleep(0)
+        return resp, policy
+
+    resp, policy = asyncio.run(main())
+    assert resp.msg_id == "2"
+    assert cancelled == [1]
+    assert json.loads(calls[0].content) == json.loads(calls[1].content)
+    assert policy.stats()["/msg/bot-response/task"]["hedge_wins"] == 1
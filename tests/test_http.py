@@ -0,0 +1,141 @@
+"""
+传输层测试
+"""
+import json
+import threading
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.http import BaseTransport, BaseRequest, HTTP2Request
+from wulaisdk.exceptions import ClientException
+from tests.utils import FakeTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+class EchoAdapter(BaseAdapter):
+    """
+    requests适配器，直接返回请求信息
+    """
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        resp = requests.Response()
+        resp.status_code = 200
+        resp._content = json.dumps({
+            "method": request.method,
+            "url": request.url,
+            "body": json.loads(request.body) if request.body else None,
+            "stream": stream,
+        }).encode("utf-8")
+        resp.request = request
+        return resp
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize('method,stream', [
+    ("POST", False),
+    ("GET", False),
+    ("POST", True),
+])
+def test_base_request_send(method, stream):
+    pool = BaseRequest()
+    pool.init_session()
+    pool._session.mount(pool.endpoint, EchoAdapter())
+    resp = pool.send(method, "https://openapi.wul.ai/v2/user/get", {"user_id": "shierlou"}, {}, 3, stream=stream)
+    js = resp.json()
+    assert js["method"] == method
+    assert js["stream"] == stream
+    if method == "GET":
+        assert "user_id=shierlou" in js["url"]
+    else:
+        assert js["body"] == {"user_id": "shierlou"}
+    pool.close()
+    assert pool._session is None
+
+
+def test_base_request_session_created_once():
+    created = []
+
+    class CountingRequest(BaseRequest):
+        def init_session(self):
+            created.append(1)
+            super().init_session()
+
+    pool = CountingRequest()
+    barrier = threading.Barrier(8)
+
+    def first_use():
+        barrier.wait()
+        pool.get_session()
+
+    threads = [threading.Thread(target=first_use) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(created) == 1
+    pool.close()
+
+
+def test_base_transport_requires_send():
+    class IncompleteTransport(BaseTransport):
+        pass
+
+    with pytest.raises(TypeError):
+        IncompleteTransport()
+
+
+def test_custom_transport():
+    transport = FakeTransport(lambda method, url, data, headers: (200, {"avatar_url": "", "nickname": "shierlou"}))
+    with WulaiClient(pubkey, secret, pool=transport) as client:
+        resp = client.get_user("shierlou")
+    assert resp.nickname == "shierlou"
+    assert transport.calls == [("POST", "https://openapi.wul.ai/v2/user/get", {"user_id": "shierlou"})]
+    assert transport.closed
+
+
+def test_invalid_transport():
+    with pytest.raises(ClientException) as excinfo:
+        WulaiClient(pubkey, secret, transport="http3")
+    assert excinfo.value.error_code == "SDK_INVALID_PARAMS"
+
+
+def test_http2_request_send():
+    httpx = pytest.importorskip("httpx")
+
+    def handler(request):
+        return httpx.Response(200, json={"avatar_url": "", "nickname": json.loads(request.content)["user_id"]})
+
+    pool = HTTP2Request()
+    pool._client = httpx.Client(transport=httpx.MockTransport(handler))
+    client = WulaiClient(pubkey, secret, pool=pool)
+    resp = client.get_user("shierlou")
+    assert resp.nickname == "shierlou"
+    client.close()
+    assert pool._client is None
+
+
+def test_http2_connection_error():
+    httpx = pytest.importorskip("httpx")
+
+    def handler(request):
+        raise httpx.ConnectError("connection refused")
+
+    pool = HTTP2Request()
+    pool._client = httpx.Client(transport=httpx.MockTransport(handler))
+    client = WulaiClient(pubkey, secret, pool=pool)
+    with pytest.raises(ClientException):
+        client.get_user("shierlou", retry=0)
+
+
+def test_base_request_send_encoded_body():
+    pool = BaseRequest()
+    pool.init_session()
+    pool._session.mount(pool.endpoint, EchoAdapter())
+    body = json.dumps({"user_id": "shierlou"}).encode("utf-8")
+    resp = pool.send("POST", "https://openapi.wul.ai/v2/user/get", body, {"Content-Type": "application/json"}, 3)
+    assert resp.json()["body"] == {"user_id": "shierlou"}
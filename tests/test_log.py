@@ -0,0 +1,123 @@
+"""
+日志格式化测试
+"""
+import json
+import logging
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.log import render, log_event, Fields, StructuredFormatter, LogConfig
+from tests.utils import FakeTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+class Unprintable:
+    def __str__(self):
+        raise AssertionError("should not be formatted")
+
+
+@pytest.mark.parametrize('value,expected', [
+    ({"a": 1, "b": [True, None]}, "{'a': 1, 'b': [True, None]}"),
+    ({"Secret": "s", "Api-Auth-sign": "x", "user_id": "u"}, "{'Secret': '***', 'Api-Auth-sign': '***', 'user_id': 'u'}"),
+    (b"\x00" * 10, "<10 bytes>"),
+    ("中文", "'中文'"),
+])
+def test_render(value, expected):
+    assert render(value) == expected
+
+
+def test_render_truncates_without_walking_whole_payload():
+    items = [{"question": "q" * 100} for _ in range(100000)]
+    text = render({"knowledge_items": items}, limit=200)
+    assert len(text) == 200 + len("...(truncated)")
+    assert text.endswith("...(truncated)")
+    assert render("x" * 1000, limit=10) == "'xxxxxxxxx...(truncated)"
+    assert render("x" * 1000, limit=None) == repr("x" * 1000)
+
+
+def test_fields():
+    assert str(Fields({"action": "/user/create", "params": {"secret": "s"}})) == \
+        "action='/user/create' params={'secret': '***'}"
+
+
+def test_log_event_disabled_level_does_not_format():
+    logger = logging.getLogger("wulaisdk.test.disabled")
+    logger.setLevel(logging.ERROR)
+    log_event(logger, logging.DEBUG, "Response received", body=Unprintable())
+
+
+def test_log_event_output(caplog):
+    logger = logging.getLogger("wulaisdk.test.output")
+    with caplog.at_level(logging.DEBUG, logger="wulaisdk.test.output"):
+        log_event(logger, logging.DEBUG, "Response received", action="/user/create", body={"token": "t"})
+    assert caplog.records[0].getMessage() == "Response received. action='/user/create' body={'token': '***'}"
+    assert caplog.records[0].wulai == {"action": "/user/create", "body": {"token": "t"}}
+
+
+def test_structured_formatter(caplog):
+    logger = logging.getLogger("wulaisdk.test.structured")
+    with caplog.at_level(logging.DEBUG, logger="wulaisdk.test.structured"):
+        log_event(logger, logging.DEBUG, "Retry needed", action="/user/create", attempt=1, exception="err")
+        logger.debug("plain %s", "message")
+    formatter = StructuredFormatter()
+    record = json.loads(formatter.format(caplog.records[0]))
+    assert record["message"] == "Retry needed"
+    assert record["attempt"] == 1
+    assert record["action"] == "'/user/create'"
+    assert json.loads(formatter.format(caplog.records[1]))["message"] == "plain message"
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_client_debug_logging():
+    handler = ListHandler()
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(lambda *args: (200, {})),
+                         log_config=LogConfig(debug=True, handlers=[handler], payload_limit=20))
+    client.create_user("user-1")
+    messages = [record.getMessage() for record in handler.records]
+    assert messages[0].startswith("Request received. action='/user/create'")
+    assert "params={'user_id': 'user-1'...(truncated)" in messages[0]
+    assert messages[-1] == "Response received. action='/user/create' body={}"
+
+
+def test_client_loggers_are_isolated(caplog):
+    debug_handler, quiet_handler = ListHandler(), ListHandler()
+    transport = FakeTransport(lambda *args: (200, {}))
+    debug_client = WulaiClient(pubkey, secret, pool=transport, log_config=LogConfig(True, handlers=[debug_handler]))
+    quiet_client = WulaiClient(pubkey, secret, pool=transport, log_config=LogConfig(False, handlers=[quiet_handler]))
+    default_client = WulaiClient(pubkey, secret, pool=transport)
+    with caplog.at_level(logging.DEBUG, logger="wulaisdk.client"):
+        debug_client.create_user("user-1")
+        quiet_client.create_user("user-1")
+        default_client.create_user("user-1")
+    assert len(debug_handler.records) == 2
+    assert quiet_handler.records == []
+    # 有handler的logger不向parent传递，默认client的ERROR以下日志不输出
+    assert caplog.records == []
+    assert debug_client.logger is not quiet_client.logger
+    assert not logging.getLogger("wulaisdk.client").handlers
+
+
+def test_client_error_propagates_to_module_logger(caplog):
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(lambda *args: (400, {"message": "bad"})))
+    with caplog.at_level(logging.DEBUG, logger="wulaisdk.client"):
+        with pytest.raises(Exception):
+            client.create_user("user-1", retry=0)
+    assert [record.wulai_event for record in caplog.records] == ["Request failed"]
+
+
+def test_custom_logger(caplog):
+    logger = logging.getLogger("app.wulai")
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(lambda *args: (200, {})), log_config=LogConfig(logger=logger))
+    with caplog.at_level(logging.DEBUG, logger="app.wulai"):
+        client.create_user("user-1")
+    assert [record.wulai_event for record in caplog.records] == ["Request received", "Response received"]
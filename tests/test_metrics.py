@@ -0,0 +1,123 @@
+"""
+请求指标测试
+"""
+import asyncio
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.metrics import MetricsHook, MetricsCollector, Histogram
+from wulaisdk.retry import RetryPolicy
+from wulaisdk.request import CommonRequest
+from wulaisdk.exceptions import ServerException
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+class RecordingHook(MetricsHook):
+    def __init__(self):
+        self.events = []
+
+    def on_request_start(self, request):
+        self.events.append(("start", request.action))
+
+    def on_response(self, request, timing):
+        self.events.append(("response", timing.status_code))
+
+    def on_retry(self, request, attempt, delay, exception):
+        self.events.append(("retry", attempt))
+
+    def on_error(self, request, exception, retries, duration):
+        self.events.append(("error", retries))
+
+    def on_request_end(self, request, retries, duration, parse_time):
+        self.events.append(("end", retries))
+
+
+def client_request(action, **opts):
+    return CommonRequest(action, {}, opts)
+
+
+def flaky_handler(failures):
+    state = {"failures": failures}
+
+    def handler(method, url, data, headers):
+        if state["failures"]:
+            state["failures"] -= 1
+            return 500, {"message": "error"}
+        return 200, {"id": "1", "name": "tag", "parent_knowledge_tag_id": "0"}
+    return handler
+
+
+def test_histogram():
+    histogram = Histogram(buckets=(1, 2, 4))
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 5
+    assert snapshot["sum"] == 16.5
+    assert (snapshot["min"], snapshot["max"]) == (0.5, 10)
+    assert snapshot["buckets"] == [(1, 1), (2, 3), (4, 4), ("+Inf", 5)]
+    assert 1 <= histogram.quantile(0.5) <= 2
+    assert histogram.quantile(1) == 10
+    assert Histogram().quantile(0.5) is None
+
+
+def test_metrics_hook_events():
+    hook = RecordingHook()
+    policy = RetryPolicy(backoff_base=0)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(flaky_handler(1)), retry_policy=policy, metrics=hook)
+    client.process_common_request(client_request("/qa/knowledge-tags/list"))
+    assert hook.events == [("start", "/qa/knowledge-tags/list"), ("response", 500), ("retry", 1),
+                           ("response", 200), ("end", 1)]
+
+
+def test_metrics_collector():
+    collector = MetricsCollector()
+    policy = RetryPolicy(backoff_base=0)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(flaky_handler(1)), retry_policy=policy,
+                         metrics=collector)
+    client.process_common_request(client_request("/qa/knowledge-tags/list"))
+    client.process_common_request(client_request("/qa/knowledge-tags/list"))
+    snapshot = collector.snapshot()["/qa/knowledge-tags/list"]
+    assert snapshot["requests"] == 2
+    assert snapshot["responses"] == 3
+    assert snapshot["retries"] == 1
+    assert snapshot["status_codes"] == {"500": 1, "200": 2}
+    assert snapshot["response_bytes"] > 0
+    assert snapshot["latency"]["total"]["count"] == 2
+    assert snapshot["latency"]["http"]["count"] == 3
+    assert snapshot["latency"]["parse"]["count"] == 2
+    collector.reset()
+    assert collector.snapshot() == {}
+
+
+def test_metrics_collector_error():
+    collector = MetricsCollector()
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(flaky_handler(10)), metrics=collector)
+    with pytest.raises(ServerException):
+        client.process_common_request(client_request("/qa/knowledge-tags/list", retry=0))
+    snapshot = collector.snapshot()["/qa/knowledge-tags/list"]
+    assert snapshot["errors"] == {"SDK_UNKNOWN_SERVER_ERROR": 1}
+    assert snapshot["latency"]["total"]["count"] == 1
+
+
+def test_async_metrics_collector():
+    httpx = pytest.importorskip("httpx")
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    def handler(request):
+        return httpx.Response(200, json={"id": "1"})
+
+    collector = MetricsCollector()
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool, metrics=collector) as client:
+            await client.process_common_request(client_request("/qa/knowledge-tags/list"))
+
+    asyncio.run(main())
+    snapshot = collector.snapshot()["/qa/knowledge-tags/list"]
+    assert snapshot["requests"] == 1
+    assert snapshot["latency"]["http"]["count"] == 1
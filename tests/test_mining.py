@@ -0,0 +1,120 @@
+"""
+聚类任务测试
+"""
+import asyncio
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.mining import MiningJob, AsyncMiningJob, PollBackoff, MINING_IN_PROGRESS, MINING_COMPLETED
+from wulaisdk.response.category_nlp import Cluster, Sentence
+from wulaisdk.exceptions import ClientException
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def mining_handler(polls_in_progress=2, clusters=5, final_status=MINING_COMPLETED):
+    state = {"polls": polls_in_progress, "actions": []}
+
+    def handler(method, url, data, headers):
+        action = url.split("/v2")[-1]
+        state["actions"].append(action)
+        if action == "/nlp/sentence/mining/upload":
+            return 200, {"succeeded_count": len(data["queries"]), "failed_count": 0, "duplicated_count": 0}
+        if action == "/nlp/sentence/mining/execute":
+            return 200, {"status": MINING_IN_PROGRESS}
+        if action == "/nlp/sentence/mining/result/get":
+            if state["polls"]:
+                state["polls"] -= 1
+                return 200, {"status": MINING_IN_PROGRESS, "clusters": [], "page_count": 0}
+            start = (data["page"] - 1) * data["page_size"]
+            page = [{"id": i, "sentences": [{"id": i * 10 + j, "sentence": "s"} for j in range(2)]}
+                    for i in range(start, min(start + data["page_size"], clusters))]
+            page_count = (clusters + data["page_size"] - 1) // data["page_size"]
+            return 200, {"status": final_status, "clusters": page, "page_count": page_count}
+        return 200, {}
+    return handler, state
+
+
+def fast_poll(timeout=None):
+    return PollBackoff(initial=0.001, maximum=0.002, timeout=timeout)
+
+
+def test_poll_backoff():
+    delays = PollBackoff(initial=1, maximum=4, factor=2, jitter=0).delays()
+    assert [next(delays) for _ in range(5)] == [1, 2, 4, 4, 4]
+    assert list(PollBackoff(initial=0.01, timeout=0).delays()) == []
+
+
+def test_mining_job():
+    handler, state = mining_handler()
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    job = MiningJob(client, ["a", "b", "a"], page_size=2, poll=fast_poll())
+    clusters = list(job.run())
+    assert all(isinstance(cluster, Cluster) for cluster in clusters)
+    assert [cluster.id for cluster in clusters] == [0, 1, 2, 3, 4]
+    assert (job.upload_result.succeeded_count, job.upload_result.duplicated_count) == (2, 1)
+    actions = state["actions"]
+    assert actions[:3] == ["/nlp/sentence/mining/empty", "/nlp/sentence/mining/upload",
+                           "/nlp/sentence/mining/execute"]
+    # 2次进行中 + 第1页（完成） + 第2、3页
+    assert actions[3:].count("/nlp/sentence/mining/result/get") == 5
+
+
+def test_mining_job_sentences():
+    handler, state = mining_handler(polls_in_progress=0, clusters=2)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    job = MiningJob(client, empty=False, poll=fast_poll())
+    job.start()
+    job.wait()
+    pairs = list(job.iter_sentences())
+    assert all(isinstance(sentence, Sentence) for _, sentence in pairs)
+    assert [(cluster.id, sentence.id) for cluster, sentence in pairs] == [(0, 0), (0, 1), (1, 10), (1, 11)]
+    assert "/nlp/sentence/mining/upload" not in state["actions"]
+
+
+def test_mining_job_timeout():
+    handler, _ = mining_handler(polls_in_progress=1000)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    job = MiningJob(client, poll=fast_poll(timeout=0.05))
+    with pytest.raises(ClientException) as e:
+        job.run()
+    assert e.value.error_code == "SDK_MINING_TIMEOUT"
+
+
+@pytest.mark.parametrize('status', ["MINING_STATUS_FAILED", None])
+def test_mining_job_failed(status):
+    handler, state = mining_handler(polls_in_progress=1, final_status=status)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    job = MiningJob(client, poll=fast_poll())
+    with pytest.raises(ClientException) as e:
+        job.run()
+    assert e.value.error_code == "SDK_MINING_FAILED"
+    assert state["actions"].count("/nlp/sentence/mining/result/get") == 2
+
+
+def test_async_mining_jobs():
+    httpx = pytest.importorskip("httpx")
+    import json
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    def make_client(clusters):
+        handle, _ = mining_handler(clusters=clusters)
+
+        def handler(request):
+            status, body = handle("POST", str(request.url), json.loads(request.content or b"{}"), request.headers)
+            return httpx.Response(status, json=body)
+
+        pool = AsyncMockTransport(handler)
+        return AsyncWulaiClient(pubkey, secret, pool=pool)
+
+    async def run(clusters):
+        async with make_client(clusters) as client:
+            job = AsyncMiningJob(client, ["a", "b"], page_size=2, poll=fast_poll())
+            return [cluster.id async for cluster in await job.run()]
+
+    async def main():
+        return await asyncio.gather(run(3), run(5))
+
+    assert asyncio.run(main()) == [[0, 1, 2], [0, 1, 2, 3, 4]]
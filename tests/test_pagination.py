@@ -0,0 +1,162 @@
+"""
+分页遍历测试
+"""
+import time
+import asyncio
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.response.category_knowledge import KnowledgeTag
+from wulaisdk.response.category_task import IntentTrigger
+from wulaisdk.exceptions import ClientException, ServerException
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def tag(i):
+    return {"parent_knowledge_tag_id": "0", "id": str(i), "name": "tag-{}".format(i)}
+
+
+def tags_handler(total, with_page_count=True):
+    def handler(method, url, data, headers):
+        start = (data["page"] - 1) * data["page_size"]
+        body = {"knowledge_tags": [tag(i) for i in range(start, min(start + data["page_size"], total))]}
+        if with_page_count:
+            body["page_count"] = (total + data["page_size"] - 1) // data["page_size"]
+        return 200, body
+    return handler
+
+
+@pytest.mark.parametrize('total,page_size,prefetch,with_page_count,requests', [
+    (0, 10, True, True, 1),
+    (25, 10, True, True, 3),
+    (30, 10, False, True, 3),
+    (30, 10, True, False, 4),
+    (5, 10, True, False, 1),
+])
+def test_iter_pages(total, page_size, prefetch, with_page_count, requests):
+    transport = FakeTransport(tags_handler(total, with_page_count))
+    client = WulaiClient(pubkey, secret, pool=transport)
+    items = list(client.iter_knowledge_tags(page_size, parent_k_tag_id="0", prefetch=prefetch))
+    assert all(isinstance(item, KnowledgeTag) for item in items)
+    assert [item.id for item in items] == [str(i) for i in range(total)]
+    assert len(transport.calls) == requests
+    assert [call[2]["page"] for call in transport.calls] == list(range(1, requests + 1))
+    assert all(call[2]["parent_k_tag_id"] == "0" for call in transport.calls)
+
+
+def test_iter_pages_prefetch():
+    transport = FakeTransport(tags_handler(30))
+    client = WulaiClient(pubkey, secret, pool=transport)
+    iterator = client.iter_knowledge_tags(10)
+    next(iterator)
+    for _ in range(50):
+        if len(transport.calls) == 2:
+            break
+        time.sleep(0.01)
+    assert len(transport.calls) == 2
+    iterator.close()
+
+
+def test_iter_pages_without_page_count_model():
+    def handler(method, url, data, headers):
+        assert data["intent_id"] == 1
+        triggers = [{"text": "t", "intent_id": 1, "type": "TRIGGER_TYPE_EXACT_MATCH_KEYWORD", "id": data["page"]}]
+        return 200, {"intent_triggers": triggers, "page_count": 2}
+
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    items = list(client.iter_intent_triggers(1, page_size=1))
+    assert all(isinstance(item, IntentTrigger) for item in items)
+    assert [item.id for item in items] == [1, 2]
+
+
+def test_async_iter_pages():
+    httpx = pytest.importorskip("httpx")
+    import json
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    handle = tags_handler(25)
+    pages = []
+
+    def handler(request):
+        data = json.loads(request.content)
+        pages.append(data["page"])
+        return httpx.Response(200, json=handle("POST", str(request.url), data, request.headers)[1])
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool) as client:
+            return [item.id async for item in client.iter_knowledge_tags(10)]
+
+    assert asyncio.run(main()) == [str(i) for i in range(25)]
+    assert pages == [1, 2, 3]
+
+
+@pytest.mark.parametrize('total,with_page_count,requests', [
+    (0, True, 1),
+    (95, True, 10),
+    (30, False, 4),
+])
+def test_fetch_all_pages(total, with_page_count, requests):
+    transport = FakeTransport(tags_handler(total, with_page_count))
+    client = WulaiClient(pubkey, secret, pool=transport)
+    items = client.fetch_all_pages("/qa/knowledge-tags/list", 10, concurrency=4, params={"parent_k_tag_id": "0"})
+    assert [item.id for item in items] == [str(i) for i in range(total)]
+    assert len(transport.calls) == requests
+
+
+def test_fetch_all_pages_retries_failed_pages():
+    handle = tags_handler(50)
+    failures = {3: 1, 4: 1}
+
+    def handler(method, url, data, headers):
+        if failures.get(data["page"]):
+            failures[data["page"]] -= 1
+            return 500, {"message": "error"}
+        return handle(method, url, data, headers)
+
+    transport = FakeTransport(handler)
+    client = WulaiClient(pubkey, secret, pool=transport)
+    items = client.fetch_all_pages("/qa/knowledge-tags/list", 10, concurrency=2, retry=0)
+    assert [item.id for item in items] == [str(i) for i in range(50)]
+    assert len(transport.calls) == 7
+
+
+def test_fetch_all_pages_raises_after_page_retries():
+    handle = tags_handler(50)
+
+    def handler(method, url, data, headers):
+        if data["page"] == 2:
+            return 500, {"message": "error"}
+        return handle(method, url, data, headers)
+
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler))
+    with pytest.raises(ServerException):
+        client.fetch_all_pages("/qa/knowledge-tags/list", 10, page_retries=2, retry=0)
+
+
+def test_fetch_all_pages_invalid_action():
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(tags_handler(0)))
+    with pytest.raises(ClientException):
+        client.fetch_all_pages("/scene/list", 10)
+
+
+def test_async_fetch_all_pages():
+    httpx = pytest.importorskip("httpx")
+    import json
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    handle = tags_handler(95)
+
+    def handler(request):
+        data = json.loads(request.content)
+        return httpx.Response(200, json=handle("POST", str(request.url), data, request.headers)[1])
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool) as client:
+            return await client.fetch_all_pages("/qa/knowledge-tags/list", 10, concurrency=4)
+
+    assert [item.id for item in asyncio.run(main())] == [str(i) for i in range(95)]
@@ -0,0 +1,191 @@
+"""
+多租户client注册表及限流测试
+"""
+import time
+import asyncio
+import threading
+import pytest
+
+from wulaisdk.registry import WulaiClientRegistry
+from wulaisdk.ratelimit import TokenBucket
+from wulaisdk.cache import ResponseCache
+from wulaisdk.request import CommonRequest
+from wulaisdk.exceptions import ClientException
+from tests.utils import FakeTransport, AsyncMockTransport
+
+
+def tag_handler(method, url, data, headers):
+    return 200, {"id": "1", "name": "tag", "parent_knowledge_tag_id": "0"}
+
+
+def credentials(tenant):
+    return "pubkey_" + tenant, "secret_" + tenant
+
+
+def client_request(action, **opts):
+    return CommonRequest(action, {}, opts)
+
+
+def test_registry_shared_pool():
+    pubkeys = []
+
+    def handler(method, url, data, headers):
+        pubkeys.append(headers["Api-Auth-pubkey"])
+        return tag_handler(method, url, data, headers)
+
+    pool = FakeTransport(handler)
+    registry = WulaiClientRegistry(credentials, pool=pool)
+    a = registry.get("a")
+    b = registry.get("b")
+    assert a is registry.get("a")
+    assert a._http is b._http is pool
+    assert (a.pubkey, b.pubkey) == ("pubkey_a", "pubkey_b")
+    a.process_common_request(client_request("/qa/knowledge-tags/list"))
+    b.process_common_request(client_request("/qa/knowledge-tags/list"))
+    assert pubkeys == ["pubkey_a", "pubkey_b"]
+    assert registry.stats() == {"clients": 2, "created": 2, "evicted": 0}
+    registry.close()
+    assert pool.closed
+    assert len(registry) == 0
+
+
+def test_registry_register():
+    registry = WulaiClientRegistry(pool=FakeTransport(tag_handler))
+    with pytest.raises(ClientException):
+        registry.get("a")
+    registry.register("a", "pubkey", "secret")
+    client = registry.get("a")
+    assert client.pubkey == "pubkey"
+    registry.register("a", "pubkey2", "secret2")
+    assert "a" not in registry
+    assert registry.get("a").pubkey == "pubkey2"
+    registry.unregister("a")
+    with pytest.raises(ClientException):
+        registry.get("a")
+
+
+def test_registry_lru_eviction():
+    registry = WulaiClientRegistry(credentials, pool=FakeTransport(tag_handler), max_clients=2)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+    assert "a" in registry and "c" in registry
+    assert "b" not in registry
+    assert registry.stats() == {"clients": 2, "created": 3, "evicted": 1}
+
+
+def test_registry_idle_eviction():
+    registry = WulaiClientRegistry(credentials, pool=FakeTransport(tag_handler), idle_timeout=0.05)
+    registry.get("a")
+    time.sleep(0.1)
+    registry.get("b")
+    assert "a" not in registry
+    assert "b" in registry
+
+
+def test_registry_rejects_shared_cache():
+    with pytest.raises(ClientException):
+        WulaiClientRegistry(credentials, pool=FakeTransport(tag_handler), response_cache=ResponseCache())
+
+
+def test_registry_rate_limit():
+    registry = WulaiClientRegistry(credentials, pool=FakeTransport(tag_handler), rate=1, rate_limit_timeout=0)
+    registry.register("fast", "pubkey", "secret", rate=1000, burst=10)
+    client = registry.get("a")
+    assert client.rate_limiter is not registry.get("b").rate_limiter
+    client.process_common_request(client_request("/qa/knowledge-tags/list"))
+    with pytest.raises(ClientException) as e:
+        client.process_common_request(client_request("/qa/knowledge-tags/list"))
+    assert e.value.error_code == "SDK_RATE_LIMITED"
+    fast = registry.get("fast")
+    for _ in range(5):
+        fast.process_common_request(client_request("/qa/knowledge-tags/list"))
+
+
+def test_registry_rate_limit_survives_eviction():
+    registry = WulaiClientRegistry(credentials, pool=FakeTransport(tag_handler), max_clients=1, rate=1,
+                                   rate_limit_timeout=0)
+    registry.get("a").process_common_request(client_request("/qa/knowledge-tags/list"))
+    registry.get("b")
+    assert "a" not in registry
+    # 重新创建的client沿用原来的令牌桶，不会因淘汰获得新的令牌
+    with pytest.raises(ClientException) as e:
+        registry.get("a").process_common_request(client_request("/qa/knowledge-tags/list"))
+    assert e.value.error_code == "SDK_RATE_LIMITED"
+
+
+def test_registry_evicted_client_still_usable():
+    registry = WulaiClientRegistry(credentials, pool=FakeTransport(tag_handler), max_clients=1)
+    a = registry.get("a")
+    registry.get("b")
+    assert "a" not in registry
+    a.process_common_request(client_request("/qa/knowledge-tags/list"))
+
+
+def test_registry_slow_credentials_do_not_block_other_tenants():
+    slow_started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_credentials(tenant):
+        calls.append(tenant)
+        if tenant == "slow":
+            slow_started.set()
+            release.wait(5)
+        return credentials(tenant)
+
+    registry = WulaiClientRegistry(slow_credentials, pool=FakeTransport(tag_handler))
+    threads = [threading.Thread(target=registry.get, args=("slow",)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    assert slow_started.wait(5)
+    start = time.monotonic()
+    registry.get("fast")
+    assert time.monotonic() - start < 1
+    release.set()
+    for thread in threads:
+        thread.join()
+    # 同一个租户只获取一次密钥
+    assert sorted(calls) == ["fast", "slow"]
+    assert registry.stats()["created"] == 2
+
+
+def test_token_bucket():
+    bucket = TokenBucket(rate=100, burst=2)
+    assert bucket.is_full()
+    assert bucket.reserve() == 0
+    assert not bucket.is_full()
+    assert bucket.reserve() == 0
+    assert 0 < bucket.reserve() <= 0.01
+    start = time.monotonic()
+    bucket.acquire()
+    assert time.monotonic() - start > 0.005
+    with pytest.raises(ClientException):
+        TokenBucket(rate=0)
+    bucket = TokenBucket(rate=1, timeout=0.5)
+    bucket.acquire()
+    with pytest.raises(ClientException):
+        bucket.acquire()
+
+
+def test_async_registry():
+    httpx = pytest.importorskip("httpx")
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    def handler(request):
+        return httpx.Response(200, json={"id": "1", "name": "tag", "parent_knowledge_tag_id": "0"})
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        async with WulaiClientRegistry(credentials, pool=pool, client_class=AsyncWulaiClient, rate=100) as registry:
+            a = registry.get("a")
+            b = registry.get("b")
+            assert isinstance(a, AsyncWulaiClient)
+            assert a._http is b._http is pool
+            await asyncio.gather(a.process_common_request(client_request("/qa/knowledge-tags/list")),
+                                 b.process_common_request(client_request("/qa/knowledge-tags/list")))
+        return pool
+
+    pool = asyncio.run(main())
+    assert pool.closed
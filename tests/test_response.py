@@ -0,0 +1,159 @@
+"""
+响应类解析测试
+"""
+import pytest
+
+from wulaisdk.response.category_knowledge import KnowledgeItems, KnowledgeItem, KnowledgeTag
+from wulaisdk.response.category_talk import BotResponse, HistoryMessage, Msg
+from wulaisdk.response.msg_body import Event
+
+knowledge_items = {
+    "page_count": 3,
+    "knowledge_items": [{
+        "knowledge_tag": {"parent_knowledge_tag_id": "0", "id": "1", "name": "tag"},
+        "similar_questions": [{"knowledge_id": "2", "question": "q{}".format(i), "id": str(i)} for i in range(3)],
+        "knowledge": {
+            "status": True, "update_time": "", "maintained_by_user_attribute_group": False,
+            "standard_question": "standard", "create_time": "", "respond_all": True, "id": "2",
+        },
+    }],
+}
+
+bot_response = {
+    "is_dispatch": False,
+    "msg_id": "1",
+    "extra": "",
+    "suggested_response": [{
+        "is_send": True,
+        "score": 1,
+        "quick_reply": ["a"],
+        "detail": {"qa": {"knowledge_id": "2", "standard_question": "standard", "question": "q"}},
+        "bot": {"qa": {"knowledge_id": "2", "standard_question": "standard", "question": "q"}},
+        "response": [{
+            "msg_body": {"text": {"content": "answer"}},
+            "similar_response": [],
+            "enable_evaluate": False,
+            "delay_ts": 0,
+            "extra": "",
+            "answer_id": 1,
+        }],
+        "source": "QA_BOT",
+        "enable_evaluate": False,
+        "delay_ts": 0,
+        "similar_response": [],
+    }],
+}
+
+history = {
+    "msg": [{
+        "direction": "FROM_USER", "sender_info": {}, "msg_type": "TEXT", "extra": "", "msg_id": "1",
+        "msg_ts": "1", "user_info": None, "msg_body": {"text": {"content": "hi"}},
+    }],
+    "has_more": False,
+}
+
+
+@pytest.mark.parametrize('model,body', [
+    (KnowledgeItems, knowledge_items),
+    (BotResponse, bot_response),
+    (HistoryMessage, history),
+])
+def test_lazy_to_dict(model, body):
+    assert model.from_dict(body, lazy=True).to_dict() == model.from_dict(body).to_dict()
+
+
+def test_lazy_parse_on_access():
+    resp = KnowledgeItems.from_dict(knowledge_items, lazy=True)
+    assert "knowledge_items" not in resp.__dict__
+    assert resp.page_count == 3
+    item = resp.knowledge_items[0]
+    assert isinstance(item, KnowledgeItem)
+    assert "knowledge_tag" not in item.__dict__
+    assert isinstance(item.knowledge_tag, KnowledgeTag)
+    assert item.knowledge_tag is item.knowledge_tag
+    assert [sq.question for sq in item.similar_questions] == ["q0", "q1", "q2"]
+    with pytest.raises(AttributeError):
+        resp.missing
+
+
+def test_lazy_falls_back_to_eager():
+    msg = Msg.from_dict(history["msg"][0], lazy=True)
+    assert msg.user_info.nickname == ""
+    assert msg.msg_body.text.content == "hi"
+    event = Event.from_dict({"fields": {"a": 1}, "event_type": "click"}, lazy=True)
+    assert event.fields == {"a": 1}
+    assert event.to_dict() == {"fields": {"a": 1}, "event_type": "click"}
+
+
+def test_client_lazy_parsing():
+    from wulaisdk.client import WulaiClient
+    from tests.utils import FakeTransport
+
+    client = WulaiClient("test_pubkey", "test_secret", lazy_parsing=True,
+                         pool=FakeTransport(lambda method, url, data, headers: (200, knowledge_items)))
+    resp = client.knowledge_items(1, 10)
+    assert "_raw" in resp.__dict__
+    assert resp.knowledge_items[0].knowledge.standard_question == "standard"
+
+
+def test_from_dict_uses_compiled_plan(monkeypatch):
+    import inspect
+
+    def fail(*args, **kwargs):
+        raise AssertionError("inspect.signature called")
+
+    monkeypatch.setattr(inspect, "signature", fail)
+    resp = KnowledgeItems.from_dict(dict(knowledge_items, unknown="ignored"))
+    assert resp.knowledge_items[0].similar_questions[2].question == "q2"
+    assert not hasattr(resp, "unknown")
+    assert BotResponse.from_dict(bot_response).suggested_response[0].response[0].msg_body.text.content == "answer"
+
+
+def test_subclass_plan():
+    class Parent(KnowledgeTag):
+        pass
+
+    assert Parent.model_fields() == KnowledgeTag.model_fields()
+    assert Parent.from_dict({"parent_knowledge_tag_id": "0", "id": "1", "name": "tag", "x": 1}).name == "tag"
+
+
+@pytest.mark.parametrize('model,body', [
+    (KnowledgeItems, knowledge_items),
+    (BotResponse, bot_response),
+    (HistoryMessage, history),
+])
+def test_slotted_to_dict(model, body):
+    from wulaisdk.response.slots import slotted
+
+    resp = slotted(model).from_dict(body)
+    assert not hasattr(resp, "__dict__")
+    assert resp.to_dict() == model.from_dict(body).to_dict()
+
+
+def test_slotted_models():
+    from wulaisdk.response.slots import slotted
+    from wulaisdk.response.msg_body import MsgBody
+
+    assert slotted(KnowledgeItems) is slotted(KnowledgeItems)
+    assert slotted(MsgBody) is MsgBody
+    resp = slotted(HistoryMessage).from_dict(history)
+    msg = resp.msg[0]
+    assert type(msg) is slotted(Msg)
+    assert type(msg.user_info).__slots__ == ("avatar_url", "nickname")
+    assert msg.user_info.nickname == ""
+    assert msg.msg_body.text.content == "hi"
+    with pytest.raises(AttributeError):
+        msg.unknown = 1
+    with pytest.raises(TypeError):
+        slotted(KnowledgeTag).from_dict({"id": "1"})
+
+
+def test_client_compact_models():
+    from wulaisdk.client import WulaiClient
+    from tests.utils import FakeTransport
+
+    client = WulaiClient("test_pubkey", "test_secret", compact_models=True,
+                         pool=FakeTransport(lambda method, url, data, headers: (200, knowledge_items)))
+    resp = client.knowledge_items(1, 10)
+    assert not hasattr(resp, "__dict__")
+    assert resp.knowledge_items[0].knowledge.standard_question == "standard"
@@ -0,0 +1,66 @@
+"""
+响应格式测试
+"""
+import json
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.cache import ResponseCache
+from wulaisdk.exceptions import ClientException
+from wulaisdk.response.category_user import GetUser
+from tests.utils import FakeTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+user = {"avatar_url": "", "nickname": "shierlou"}
+
+
+def user_handler(method, url, data, headers):
+    return 200, user
+
+
+@pytest.mark.parametrize('client_format,call_format,expected', [
+    ("model", None, GetUser),
+    ("dict", None, dict),
+    ("raw", None, bytes),
+    ("model", "dict", dict),
+    ("dict", "raw", bytes),
+    ("raw", "model", GetUser),
+])
+def test_response_format(client_format, call_format, expected):
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(user_handler), response_format=client_format)
+    kwargs = {"response_format": call_format} if call_format else {}
+    resp = client.get_user("shierlou", **kwargs)
+    assert isinstance(resp, expected)
+    if expected is bytes:
+        assert json.loads(resp) == user
+    elif expected is dict:
+        assert resp == user
+
+
+def test_invalid_response_format():
+    with pytest.raises(ClientException):
+        WulaiClient(pubkey, secret, pool=FakeTransport(user_handler), response_format="xml")
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(user_handler))
+    with pytest.raises(ClientException):
+        client.get_user("shierlou", response_format="xml")
+
+
+def test_raw_response_format_bypasses_cache():
+    transport = FakeTransport(user_handler)
+    client = WulaiClient(pubkey, secret, pool=transport, response_cache=ResponseCache())
+    assert isinstance(client.get_user("shierlou", response_format="raw"), bytes)
+    assert isinstance(client.get_user("shierlou"), GetUser)
+    assert isinstance(client.get_user("shierlou", response_format="dict"), dict)
+    assert isinstance(client.get_user("shierlou", response_format="raw"), bytes)
+    assert len(transport.calls) == 3
+
+
+def test_iter_pages_response_format():
+    def handler(method, url, data, headers):
+        return 200, {"knowledge_tags": [{"parent_knowledge_tag_id": "0", "id": "1", "name": "tag"}], "page_count": 1}
+
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), response_format="raw")
+    assert list(client.iter_knowledge_tags(10)) == [{"parent_knowledge_tag_id": "0", "id": "1", "name": "tag"}]
+    assert client.fetch_all_pages("/qa/knowledge-tags/list", 10, response_format="model")[0].name == "tag"
@@ -0,0 +1,109 @@
+"""
+重试策略测试
+"""
+import pytest
+
+from requests.exceptions import ConnectionError
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.request import CommonRequest
+from wulaisdk.retry import RetryPolicy, RetryBudget
+from wulaisdk.exceptions import ClientException, ServerException
+from tests.utils import FakeTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def make_client(responses, **policy_kwargs):
+    """
+    :param responses: 依次返回的(status_code, body)，或需要抛出的异常
+    """
+    responses = list(responses)
+
+    def handler(method, url, data, headers):
+        resp = responses.pop(0)
+        if isinstance(resp, Exception):
+            raise resp
+        return resp
+
+    policy_kwargs.setdefault("backoff_base", 0)
+    transport = FakeTransport(handler)
+    client = WulaiClient(pubkey, secret, pool=transport, retry_policy=RetryPolicy(**policy_kwargs))
+    return client, transport
+
+
+@pytest.mark.parametrize('responses,expected_calls', [
+    ([(200, {})], 1),
+    ([(500, {}), (502, {}), (200, {})], 3),
+    ([(429, {}), (200, {})], 2),
+    ([(400, {"message": "invalid"})], 1),
+    ([(401, {})], 1),
+])
+def test_retry_status_codes(responses, expected_calls):
+    client, transport = make_client(responses)
+    try:
+        client.process_common_request(CommonRequest("/user/get", {"user_id": "shierlou"}, {}))
+    except (ClientException, ServerException):
+        pass
+    assert len(transport.calls) == expected_calls
+
+
+def test_retry_exhausted():
+    client, transport = make_client([(503, {})] * 3, max_retries=2)
+    with pytest.raises(ServerException) as excinfo:
+        client.get_user("shierlou")
+    assert excinfo.value.http_status_code == 503
+    assert len(transport.calls) == 3
+
+
+def test_retry_opts_override():
+    client, transport = make_client([(503, {})] * 2)
+    with pytest.raises(ServerException):
+        client.get_user("shierlou", retry=1)
+    assert len(transport.calls) == 2
+
+
+@pytest.mark.parametrize('responses,expected_calls', [
+    # 服务端可能已处理，非幂等api不重试
+    ([(500, {}), (200, {"msg_id": "1"})], 1),
+    # 请求未到达服务端，可以重试
+    ([(429, {}), (200, {"msg_id": "1"})], 2),
+    ([ConnectionError("refused"), (200, {"msg_id": "1"})], 2),
+])
+def test_retry_non_idempotent(responses, expected_calls):
+    client, transport = make_client(responses)
+    try:
+        client.receive_message("shierlou", {"text": {"content": "你好"}})
+    except (ClientException, ServerException):
+        pass
+    assert len(transport.calls) == expected_calls
+
+
+def test_retry_budget():
+    budget = RetryBudget(ratio=0.5, min_retries_per_second=0, ttl=10)
+    for _ in range(4):
+        budget.record_request()
+    assert [budget.can_retry() for _ in range(3)] == [True, True, False]
+
+
+def test_retry_budget_in_client():
+    budget = RetryBudget(ratio=0.1, min_retries_per_second=0.1, ttl=10)
+    client, transport = make_client([(500, {})] * 30, max_retries=2, budget=budget)
+    for _ in range(10):
+        with pytest.raises(ServerException):
+            client.get_user("shierlou")
+    # 10 requests, budget = 0.1 * 10 + 1 = 2 retries
+    assert len(transport.calls) == 12
+
+
+@pytest.mark.parametrize('attempt,upper', [
+    (1, 0.1),
+    (3, 0.4),
+    (10, 2.0),
+])
+def test_backoff_full_jitter(attempt, upper):
+    policy = RetryPolicy(backoff_base=0.1, backoff_max=2.0)
+    delays = [policy.backoff(attempt) for _ in range(200)]
+    assert all(0 <= d <= upper for d in delays)
+    assert max(delays) > upper / 2
@@ -0,0 +1,100 @@
+"""
+请求合并测试
+"""
+import time
+import asyncio
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.request import CommonRequest
+from wulaisdk.singleflight import SingleFlight
+from wulaisdk.exceptions import ServerException
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+def slow_handler(method, url, data, headers):
+    time.sleep(0.1)
+    if url.endswith("/scene/list"):
+        return 200, {"scenes": []}
+    if url.endswith("/user/get"):
+        return 200, {"avatar_url": "", "nickname": data["user_id"]}
+    return 200, {}
+
+
+def test_make_key():
+    a = CommonRequest("/user/get", {"user_id": "a", "b": [1, 2]}, {})
+    b = CommonRequest("/user/get", {"b": [1, 2], "user_id": "a"}, {"timeout": 1})
+    c = CommonRequest("/user/get", {"user_id": "b", "b": [1, 2]}, {})
+    assert SingleFlight.make_key(a) == SingleFlight.make_key(b)
+    assert SingleFlight.make_key(a) != SingleFlight.make_key(c)
+
+
+def test_single_flight_shares_result():
+    transport = FakeTransport(slow_handler)
+    single_flight = SingleFlight()
+    client = WulaiClient(pubkey, secret, pool=transport, single_flight=single_flight)
+    with ThreadPoolExecutor(max_workers=10) as executor:
+        scenes = list(executor.map(lambda _: client.scenes(), range(10)))
+        users = list(executor.map(lambda i: client.get_user("user-{}".format(i % 2)), range(10)))
+
+    assert all(resp is scenes[0] for resp in scenes)
+    assert sorted(set(resp.nickname for resp in users)) == ["user-0", "user-1"]
+    assert len(transport.calls) == 3
+    assert single_flight.stats() == {"requests": 20, "shared": 17}
+
+
+def test_single_flight_skips_writes():
+    transport = FakeTransport(slow_handler)
+    client = WulaiClient(pubkey, secret, pool=transport, single_flight=SingleFlight())
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        list(executor.map(lambda _: client.create_user("shierlou"), range(5)))
+    assert len(transport.calls) == 5
+
+
+def test_single_flight_shares_exception():
+    def handler(method, url, data, headers):
+        time.sleep(0.1)
+        return 500, {"message": "error"}
+
+    transport = FakeTransport(handler)
+    client = WulaiClient(pubkey, secret, pool=transport, single_flight=SingleFlight())
+
+    def call(_):
+        try:
+            client.scenes(retry=0)
+        except ServerException as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        errors = list(executor.map(call, range(5)))
+    assert all(isinstance(e, ServerException) for e in errors)
+    assert len(transport.calls) == 1
+
+
+def test_async_single_flight():
+    httpx = pytest.importorskip("httpx")
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"scenes": []})
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        async with AsyncWulaiClient(pubkey, secret, pool=pool, single_flight=SingleFlight()) as client:
+            first = await asyncio.gather(*[client.scenes() for _ in range(20)])
+            second = await client.scenes()
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert all(resp is first[0] for resp in first)
+    assert second is not first[0]
+    assert len(calls) == 2
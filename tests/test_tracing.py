@@ -0,0 +1,130 @@
+"""
+链路追踪测试
+"""
+import asyncio
+import contextlib
+import pytest
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.tracing import TracingPolicy
+from wulaisdk.retry import RetryPolicy
+from wulaisdk.exceptions import ClientException, ServerException
+from tests.utils import FakeTransport, AsyncMockTransport
+
+pubkey = "test_pubkey"
+secret = "test_secret"
+
+
+class FakeSpan:
+    def __init__(self, name, parent, attributes):
+        self.name = name
+        self.parent = parent
+        self.attributes = dict(attributes or {})
+        self.exceptions = []
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def record_exception(self, exception):
+        self.exceptions.append(exception)
+
+
+class FakeTracer:
+    def __init__(self):
+        self.spans = []
+        self.current = None
+
+    @contextlib.contextmanager
+    def start_as_current_span(self, name, attributes=None, **kwargs):
+        span = FakeSpan(name, self.current, attributes)
+        self.spans.append(span)
+        parent, self.current = self.current, span
+        try:
+            yield span
+        finally:
+            self.current = parent
+
+
+def inject(tracer):
+    def inject_headers(headers):
+        headers["traceparent"] = tracer.current.name
+    return inject_headers
+
+
+def user_handler(failures=0):
+    state = {"failures": failures, "headers": []}
+
+    def handler(method, url, data, headers):
+        state["headers"].append(dict(headers))
+        if state["failures"]:
+            state["failures"] -= 1
+            return 503, {"message": "unavailable"}
+        return 200, {}
+    return handler, state
+
+
+def test_tracing_spans_and_headers():
+    tracer = FakeTracer()
+    handler, state = user_handler(failures=1)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler), retry_policy=RetryPolicy(backoff_base=0),
+                         tracing=TracingPolicy(tracer, inject=inject(tracer), hash_salt="salt"))
+    client.create_user("user-1")
+
+    call, *attempts = tracer.spans
+    assert call.name == "wulai /user/create"
+    assert call.parent is None
+    assert call.attributes["wulai.action"] == "/user/create"
+    assert call.attributes["wulai.retries"] == 1
+    assert len(call.attributes["wulai.user_id_hash"]) == 16
+    assert call.attributes["wulai.user_id_hash"] != TracingPolicy(tracer).hash_user_id("user-1")
+    assert [span.parent for span in attempts] == [call, call]
+    assert [span.attributes["wulai.attempt"] for span in attempts] == [0, 1]
+    assert [span.attributes["http.response.status_code"] for span in attempts] == [503, 200]
+    assert attempts[0].attributes["wulai.error_code"] == "SDK_UNKNOWN_SERVER_ERROR"
+    assert [headers["traceparent"] for headers in state["headers"]] == ["wulai /user/create attempt"] * 2
+
+
+def test_tracing_error():
+    tracer = FakeTracer()
+    handler, _ = user_handler(failures=10)
+    client = WulaiClient(pubkey, secret, pool=FakeTransport(handler),
+                         tracing=TracingPolicy(tracer, inject=inject(tracer), record_user_id=False))
+    with pytest.raises(ServerException):
+        client.create_user("user-1", retry=0)
+    call = tracer.spans[0]
+    assert "wulai.user_id_hash" not in call.attributes
+    assert call.attributes["wulai.retries"] == 0
+    assert call.attributes["http.response.status_code"] == 503
+    assert len(call.exceptions) == 1
+
+
+def test_tracing_requires_opentelemetry():
+    from wulaisdk import tracing
+    if tracing.trace is not None:
+        pytest.skip("opentelemetry is installed")
+    with pytest.raises(ClientException) as e:
+        TracingPolicy()
+    assert e.value.error_code == "SDK_DEPENDENCY_MISSING"
+
+
+def test_async_tracing():
+    httpx = pytest.importorskip("httpx")
+    from wulaisdk.async_client import AsyncWulaiClient
+
+    traceparents = []
+
+    def handler(request):
+        traceparents.append(request.headers.get("traceparent"))
+        return httpx.Response(200, json={})
+
+    tracer = FakeTracer()
+
+    async def main():
+        pool = AsyncMockTransport(handler)
+        tracing = TracingPolicy(tracer, inject=inject(tracer))
+        async with AsyncWulaiClient(pubkey, secret, pool=pool, tracing=tracing) as client:
+            await client.create_user("user-1")
+
+    asyncio.run(main())
+    assert [span.name for span in tracer.spans] == ["wulai /user/create", "wulai /user/create attempt"]
+    assert traceparents == ["wulai /user/create attempt"]
@@ -0,0 +1,55 @@
+"""
+离线测试工具
+"""
+import json
+import threading
+import requests
+
+from wulaisdk.http import BaseTransport, AsyncBaseRequest
+
+
+def make_response(status_code=200, body=None):
+    resp = requests.Response()
+    resp.status_code = status_code
+    resp._content = json.dumps(body if body is not None else {}).encode("utf-8")
+    return resp
+
+
+class FakeTransport(BaseTransport):
+    """
+    模拟传输层
+    handler(method, url, data, headers)返回(status_code, body)或抛出异常
+    """
+    def __init__(self, handler):
+        self.handler = handler
+        self.calls = []
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def send(self, method, url, data, headers, timeout=3, stream=False):
+        with self._lock:
+            self.calls.append((method, url, data))
+        status_code, body = self.handler(method, url, data, headers)
+        return make_response(status_code, body)
+
+    def close(self):
+        self.closed = True
+
+
+class AsyncMockTransport(AsyncBaseRequest):
+    """
+    模拟异步传输层，基于httpx.MockTransport，需要安装httpx
+    handler(httpx.Request)返回httpx.Response，也可以是协程
+    """
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.closed = False
+
+    def init_client(self):
+        import httpx
+        self._client = httpx.AsyncClient(transport=httpx.MockTransport(self.handler))
+
+    async def close(self):
+        await super().close()
+        self.closed = True
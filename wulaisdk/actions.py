@@ -0,0 +1,161 @@
+"""
+api分类
+"""
+
+# 非幂等api：重复请求会产生重复的消息或数据
+NON_IDEMPOTENT_ACTIONS = frozenset([
+    "/msg/receive",
+    "/msg/sync",
+    "/msg/send",
+    "/qa/knowledge-tag-knowledge/create",
+    "/qa/knowledge-items/batch-create",
+    "/qa/knowledge-tag/create",
+    "/qa/similar-question/create",
+    "/qa/user-attribute-group-items/create",
+    "/qa/user-attribute-group-answer/create",
+    "/qa/satisfaction/create",
+    "/dictionary/term/create",
+    "/dictionary/entity/enumeration/create",
+    "/dictionary/entity/intent/create",
+    "/nlp/sentence/mining/upload",
+    "/scene/create",
+    "/scene/intent/create",
+    "/scene/intent/trigger/create",
+    "/scene/slot/create",
+    "/scene/slot/data-source/create",
+    "/scene/block/inform-block/create",
+    "/scene/block/request-block/create",
+    "/scene/block/end-block/create",
+    "/scene/block/response/create",
+    "/scene/block/relation/create",
+])
+
+# 获取机器人回复，直接影响用户侧的响应时间
+BOT_RESPONSE_ACTIONS = frozenset([
+    "/msg/bot-response",
+    "/msg/bot-response/keyword",
+    "/msg/bot-response/qa",
+    "/msg/bot-response/task",
+])
+
+# 只读api：相同参数的请求返回相同的结果
+READ_ACTIONS = frozenset([
+    "/user/get",
+    "/user/user-attribute/pair/list",
+    "/user-attribute/list",
+    "/msg/user-suggestion/get",
+    "/qa/knowledge-items/list",
+    "/qa/knowledge-tags/list",
+    "/qa/similar-question/list",
+    "/qa/user-attribute-group-items/list",
+    "/qa/user-attribute-group-answers/list",
+    "/stats/qa/satisfaction/daily/knowledge/list",
+    "/stats/qa/recall/daily/list",
+    "/stats/qa/recall/daily/knowledge/list",
+    "/dictionary/entity/list",
+    "/dictionary/entity/get",
+    "/dictionary/term/list",
+    "/nlp/entities/extract",
+    "/nlp/tokenize",
+    "/nlp/sentence/mining/result/get",
+    "/scene/list",
+    "/scene/intent/list",
+    "/scene/intent/trigger/list",
+    "/scene/intent/trigger-learning/list",
+    "/scene/slot/list",
+    "/scene/slot/get",
+    "/scene/slot/data-source/list",
+    "/scene/block/list",
+    "/scene/block/inform-block/get",
+    "/scene/block/request-block/get",
+    "/scene/block/end-block/get",
+])
+
+# 默认缓存的只读api
+CACHEABLE_ACTIONS = frozenset([
+    "/user/get",
+    "/user-attribute/list",
+    "/qa/knowledge-items/list",
+    "/qa/knowledge-tags/list",
+    "/qa/similar-question/list",
+    "/dictionary/term/list",
+    "/dictionary/entity/get",
+    "/scene/slot/list",
+    "/scene/block/list",
+])
+
+_KNOWLEDGE_READS = ("/qa/knowledge-items/list", "/qa/similar-question/list")
+_ENTITY_READS = ("/dictionary/entity/list", "/dictionary/entity/get")
+_SLOT_READS = ("/scene/slot/list", "/scene/slot/get")
+_BLOCK_READS = ("/scene/block/list", "/scene/block/inform-block/get", "/scene/block/request-block/get",
+                "/scene/block/end-block/get")
+
+# 写操作成功后需要失效的只读api缓存
+CACHE_INVALIDATIONS = {
+    "/user/create": ("/user/get",),
+    "/user/update": ("/user/get",),
+    "/user/user-attribute/create": ("/user/user-attribute/pair/list",),
+    "/qa/knowledge-tag-knowledge/create": _KNOWLEDGE_READS,
+    "/qa/knowledge/update": _KNOWLEDGE_READS,
+    "/qa/knowledge/delete": _KNOWLEDGE_READS,
+    "/qa/knowledge-items/batch-create": _KNOWLEDGE_READS,
+    "/qa/knowledge-tag/create": ("/qa/knowledge-tags/list",),
+    "/qa/knowledge-tag/update": ("/qa/knowledge-tags/list",) + _KNOWLEDGE_READS,
+    "/qa/knowledge-tag/delete": ("/qa/knowledge-tags/list",) + _KNOWLEDGE_READS,
+    "/qa/similar-question/create": _KNOWLEDGE_READS,
+    "/qa/similar-question/update": _KNOWLEDGE_READS,
+    "/qa/similar-question/delete": _KNOWLEDGE_READS,
+    "/qa/user-attribute-group-items/create": ("/qa/user-attribute-group-items/list",),
+    "/qa/user-attribute-group-items/update": ("/qa/user-attribute-group-items/list",),
+    "/qa/user-attribute-group-answer/create": ("/qa/user-attribute-group-answers/list",) + _KNOWLEDGE_READS,
+    "/qa/user-attribute-group-answer/update": ("/qa/user-attribute-group-answers/list",) + _KNOWLEDGE_READS,
+    "/qa/user-attribute-group-answer/delete": ("/qa/user-attribute-group-answers/list",) + _KNOWLEDGE_READS,
+    "/dictionary/term/create": ("/dictionary/term/list",),
+    "/dictionary/term/update": ("/dictionary/term/list",),
+    "/dictionary/term/delete": ("/dictionary/term/list",),
+    "/dictionary/entity/enumeration/create": _ENTITY_READS,
+    "/dictionary/entity/enumeration/value/create": _ENTITY_READS,
+    "/dictionary/entity/enumeration/value/delete": _ENTITY_READS,
+    "/dictionary/entity/intent/create": _ENTITY_READS,
+    "/dictionary/entity/intent/value/create": _ENTITY_READS,
+    "/dictionary/entity/intent/value/delete": _ENTITY_READS,
+    "/dictionary/entity/delete": _ENTITY_READS,
+    "/scene/create": ("/scene/list",),
+    "/scene/update": ("/scene/list",),
+    "/scene/delete": ("/scene/list",),
+    "/scene/intent/create": ("/scene/intent/list",),
+    "/scene/intent/update": ("/scene/intent/list",),
+    "/scene/intent/delete": ("/scene/intent/list",),
+    "/scene/intent/status/update": ("/scene/intent/list",),
+    "/scene/intent/trigger/create": ("/scene/intent/trigger/list",),
+    "/scene/intent/trigger/update": ("/scene/intent/trigger/list",),
+    "/scene/intent/trigger/delete": ("/scene/intent/trigger/list",),
+    "/scene/intent/trigger-learning/delete": ("/scene/intent/trigger-learning/list",),
+    "/scene/slot/create": _SLOT_READS,
+    "/scene/slot/update": _SLOT_READS,
+    "/scene/slot/delete": _SLOT_READS,
+    "/scene/slot/data-source/create": ("/scene/slot/data-source/list",),
+    "/scene/slot/data-source/delete": ("/scene/slot/data-source/list",),
+    "/scene/block/inform-block/create": _BLOCK_READS,
+    "/scene/block/inform-block/update": _BLOCK_READS,
+    "/scene/block/request-block/create": _BLOCK_READS,
+    "/scene/block/request-block/update": _BLOCK_READS,
+    "/scene/block/end-block/create": _BLOCK_READS,
+    "/scene/block/end-block/update": _BLOCK_READS,
+    "/scene/block/response/create": _BLOCK_READS,
+    "/scene/block/response/update": _BLOCK_READS,
+    "/scene/block/response/delete": _BLOCK_READS,
+    "/scene/block/relation/create": _BLOCK_READS,
+    "/scene/block/relation/delete": _BLOCK_READS,
+    "/scene/block/delete": _BLOCK_READS,
+    "/nlp/sentence/mining/empty": ("/nlp/sentence/mining/result/get",),
+    "/nlp/sentence/mining/execute": ("/nlp/sentence/mining/result/get",),
+    "/nlp/sentence/mining/sentence/delete": ("/nlp/sentence/mining/result/get",),
+}
+
+# 请求体可能很大的批量导入api，默认开启请求体压缩
+BULK_ACTIONS = frozenset([
+    "/qa/knowledge-items/batch-create",
+    "/nlp/sentence/mining/upload",
+    "/dictionary/entity/enumeration/create",
+])
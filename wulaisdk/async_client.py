@@ -0,0 +1,387 @@
+import time
+import asyncio
+import logging
+
+from wulaisdk.http import AsyncBaseRequest, TRANSPORTS
+from wulaisdk.client import WulaiClient
+from wulaisdk.log import LogConfig
+from wulaisdk.ratelimit import TokenBucket
+from wulaisdk.exceptions import ClientException
+from wulaisdk.batch import BatchResult
+from wulaisdk.request import CommonRequest
+from wulaisdk.retry import RetryPolicy
+from wulaisdk.circuit_breaker import CircuitBreakers
+from wulaisdk.hedge import HedgePolicy
+from wulaisdk.singleflight import SingleFlight
+from wulaisdk.cache import ResponseCache
+from wulaisdk.tracing import TracingPolicy
+from wulaisdk.metrics import MetricsHook
+from wulaisdk.compression import CompressionPolicy
+from wulaisdk.pagination import PAGINATED_ACTIONS, page_items, item_model, has_next_page
+from wulaisdk.bulk import chunk_items, batched, QueryFilter, Checkpoint
+from wulaisdk.response.category_knowledge import KnowledgeBatchCreate
+from wulaisdk.response.category_nlp import MiningUpload
+
+from requests.exceptions import ConnectionError, ConnectTimeout
+
+
+class AsyncWulaiClient(WulaiClient):
+    """
+    异步client，基于asyncio及httpx实现
+    所有api与WulaiClient保持一致，调用后返回awaitable对象：
+        client = AsyncWulaiClient(pubkey, secret)
+        resp = await client.get_bot_response(user_id, msg_body)
+        await client.close()
+    签名、参数校验及响应处理逻辑与WulaiClient共用。
+    """
+    def __init__(self, pubkey: str, secret: str, endpoint: str="https://openapi.wul.ai",
+                 api_version: str="v2", debug: bool=False, pool=None, pool_connections: int=100,
+                 pool_maxsize: int=100, max_retries: int=3, global_timeout=5, transport: str="requests",
+                 retry_policy: RetryPolicy=None, circuit_breakers: CircuitBreakers=None,
+                 hedge_policy: HedgePolicy=None, single_flight: SingleFlight=None,
+                 response_cache: ResponseCache=None, lazy_parsing: bool=False, compact_models: bool=False,
+                 response_format: str="model", codec=None, compression: CompressionPolicy=None,
+                 metrics: MetricsHook=None, tracing: TracingPolicy=None, log_config: LogConfig=None,
+                 rate_limiter: TokenBucket=None):
+        """
+        async client
+        :param pubkey:
+        :param secret:
+        :param endpoint:
+        :param api_version:
+        :param debug: Log DEBUG records of this client. Ignored when log_config is passed in.
+        :param pool: AsyncBaseRequest. Each client instance has its own keep-alive pool by default.
+        :param pool_connections: max keep-alive connections
+        :param pool_maxsize: max concurrent connections
+        :param max_retries: Connection retries of the underlying pool.
+        :param global_timeout: Basic timeout setting for each api and could be reset in specific api. Default: 5 seconds.
+        :param transport: "requests"(HTTP/1.1, default) or "http2". Ignored when pool is passed in.
+        :param retry_policy: RetryPolicy. Backoff, retryable errors and retry budget of api calls. Default: RetryPolicy()
+        :param circuit_breakers: CircuitBreakers. Opt-in circuit breakers keyed by endpoint and by action.
+        :param hedge_policy: HedgePolicy. Opt-in hedged requests for latency-critical apis.
+        :param single_flight: SingleFlight. Opt-in coalescing of identical concurrent read-only requests.
+        :param response_cache: ResponseCache. Opt-in response cache of read-only apis.
+        :param lazy_parsing: Parse nested response models on first attribute access instead of eagerly.
+        :param compact_models: Return __slots__ variants of response models to reduce memory footprint.
+        :param response_format: "model"(default), "dict" or "raw"(response bytes). Could be reset in specific api.
+        :param codec: JSON codec for request and response bodies: "json", "orjson"(falls back to json when orjson
+        is not installed) or an object with dumps/loads. Default: None, the transport's builtin json is used.
+        :param compression: CompressionPolicy. Opt-in gzip/deflate compression of large request bodies of bulk apis.
+        :param metrics: MetricsHook. Opt-in per request timing and retry hooks, e.g. MetricsCollector().
+        :param tracing: TracingPolicy. Opt-in tracing spans per api call and per attempt, and trace headers injection.
+        :param log_config: LogConfig. Logger, handlers and payload limit of this client. Default: LogConfig(debug)
+        :param rate_limiter: TokenBucket. Opt-in client side rate limit of http requests, retries included.
+        """
+        super().__init__(pubkey, secret, endpoint=endpoint, api_version=api_version, debug=debug, pool=pool,
+                         pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=max_retries,
+                         global_timeout=global_timeout, transport=transport, retry_policy=retry_policy,
+                         circuit_breakers=circuit_breakers, hedge_policy=hedge_policy,
+                         single_flight=single_flight, response_cache=response_cache,
+                         lazy_parsing=lazy_parsing, compact_models=compact_models,
+                         response_format=response_format, codec=codec, compression=compression,
+                         metrics=metrics, tracing=tracing, log_config=log_config, rate_limiter=rate_limiter)
+
+    @staticmethod
+    def connection_pool_init(endpoint, pool_connections, pool_maxsize, max_retries, transport="requests"):
+        if transport not in TRANSPORTS:
+            raise ClientException("SDK_INVALID_PARAMS", "Unsupported transport: {}".format(transport))
+        pool = AsyncBaseRequest(endpoint=endpoint, pool_connections=pool_connections, pool_maxsize=pool_maxsize,
+                                max_retries=max_retries, http2=transport == "http2")
+        return pool
+
+    async def handle_single_request(self, request):
+        method, url, timeout, data = self.prepare_single_request(request)
+        breakers = self.acquire_circuit_breakers(request)
+        start = time.monotonic()
+        exception = None
+        try:
+            try:
+                resp = await self._http.send(method, url, data, request.headers, timeout)
+            except asyncio.CancelledError:
+                self.release_circuit_breakers(breakers)
+                breakers = ()
+                raise
+            except (ConnectTimeout, ConnectionError) as e:
+                exception = self.handle_http_error(request, "SDK_SERVER_UNREACHABLE", e)
+                raise exception
+            except IOError as e:
+                exception = self.handle_http_error(request, "SDK_HTTP_ERROR", e)
+                raise exception
+            received = time.monotonic()
+            body, exception = self.response_wrapper(resp, self.get_response_format(request) == "raw")
+            if self.metrics is not None:
+                self.record_response(request, resp, start, received)
+        except BaseException as e:
+            # 解析响应出错等任何异常都记为失败，避免半开状态的探测请求出错后熔断器被关闭
+            exception = exception or e
+            raise
+        finally:
+            self.record_circuit_breakers(breakers, exception, time.monotonic() - start)
+        return body, exception
+
+    async def timed_single_request(self, request):
+        start = time.monotonic()
+        body, exception = await self.handle_single_request(request)
+        if exception is None:
+            self.hedge_policy.record_latency(request.action, time.monotonic() - start)
+        return body, exception
+
+    async def handle_hedged_request(self, request):
+        """
+        对冲请求：首个请求超过对冲等待时间未返回时，再发出一个相同的请求，先成功返回的结果生效，另一个请求被取消
+        :param request:
+        :return:
+        """
+        delay = self.hedge_policy.get_delay(request.action)
+        if delay is None:
+            return await self.timed_single_request(request)
+        primary = asyncio.ensure_future(self.timed_single_request(request.copy()))
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return self.hedge_outcome(primary)
+            if not self.can_send_hedge(request):
+                self.log_config.log(logging.DEBUG, "Hedge skipped", action=request.action, reason="budget or rate limit")
+                await asyncio.wait(pending)
+                return self.hedge_outcome(primary)
+            self.hedge_policy.record_hedge(request.action)
+            self.log_config.log(logging.DEBUG, "Hedged request sent", action=request.action, delay=round(delay, 3))
+            hedge = asyncio.ensure_future(self.timed_single_request(request.copy()))
+            pending.add(hedge)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    body, exception = self.hedge_outcome(task)
+                    if exception is None:
+                        if task is hedge:
+                            self.hedge_policy.record_hedge_win(request.action)
+                        return body, exception
+            return self.hedge_outcome(primary)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def handle_request(self, request):
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire_async()
+        if self.hedge_policy is not None and self.hedge_policy.applies(request.action):
+            return await self.handle_hedged_request(request)
+        return await self.handle_single_request(request)
+
+    async def process_common_request(self, request, response_model=None):
+        """
+        发起请求，按照retry_policy进行重试，opts中的retry可覆盖最大重试次数
+        :param request: CommonRequest
+        :param response_model: 响应类，为None时返回原始dict
+        :return:
+        """
+        body = self.get_cached_response(request)
+        if body is not None:
+            return self.parse_response(body, response_model, self.get_response_format(request))
+        if self.single_flight is not None and self.single_flight.applies(request.action):
+            key = self.single_flight.make_key(request, response_model)
+            return await self.single_flight.do_async(
+                key, lambda: self.process_request_with_retry(request, response_model))
+        return await self.process_request_with_retry(request, response_model)
+
+    async def process_request_with_retry(self, request, response_model=None):
+        if self.tracing is None:
+            return await self.retry_request(request, response_model)
+        with self.tracing.request_span(request, self.api_version) as span:
+            return await self.retry_request(request, response_model, span)
+
+    async def attempt_request(self, request, attempt, span=None):
+        if span is None:
+            try:
+                return await self.handle_request(request)
+            except ClientException as e:
+                return None, e
+        with self.tracing.attempt_span(request, attempt) as attempt_span:
+            try:
+                body, exception = await self.handle_request(request)
+            except ClientException as e:
+                body, exception = None, e
+            self.tracing.record_result(attempt_span, exception)
+        return body, exception
+
+    async def retry_request(self, request, response_model=None, span=None):
+        max_retries = request.opts.get("retry")
+        self.retry_policy.record_request()
+        start = time.monotonic()
+        if self.metrics is not None:
+            self.metrics.on_request_start(request)
+        attempt = 0
+        while True:
+            body, exception = await self.attempt_request(request, attempt, span)
+            if exception is None or not self.retry_policy.should_retry(request, exception, attempt, max_retries):
+                break
+            attempt += 1
+            delay = self.retry_policy.backoff(attempt)
+            if self.metrics is not None:
+                self.metrics.on_retry(request, attempt, delay, exception)
+            self.log_config.log(logging.DEBUG, "Retry needed", action=request.action, attempt=attempt,
+                                backoff=round(delay, 3), exception=exception)
+            await asyncio.sleep(delay)
+        if exception:
+            self.log_config.log(logging.ERROR, "Request failed", error_code=exception.error_code,
+                                error_msg=exception.error_msg, action=request.action, version=self.api_version)
+            if self.metrics is not None:
+                self.metrics.on_error(request, exception, attempt, time.monotonic() - start)
+            if span is not None:
+                self.tracing.record_result(span, exception, attempt)
+            raise exception
+        self.log_config.log(logging.DEBUG, "Response received", action=request.action, body=body)
+        if span is not None:
+            self.tracing.record_result(span, retries=attempt)
+        return self.finish_request(request, body, response_model, attempt, start)
+
+    async def execute_one(self, request, response_model=None):
+        try:
+            body = await self.process_common_request(request, response_model)
+        except Exception as e:
+            return BatchResult(request, exception=e)
+        return BatchResult(request, body=body)
+
+    async def execute_many(self, common_requests, concurrency: int=None, response_model=None):
+        """
+        并发执行多个CommonRequest
+        单个请求失败不会中断其他请求，结果顺序与传入顺序一致
+        :param common_requests: CommonRequest的可迭代对象
+        :param concurrency: 最大并发数，默认为pool_maxsize
+        :param response_model: 响应类，为None时返回原始dict
+        :return: List[BatchResult]
+        """
+        common_requests = list(common_requests)
+        results = [None] * len(common_requests)
+        pending = iter(enumerate(common_requests))
+
+        async def worker():
+            for i, request in pending:
+                results[i] = await self.execute_one(request, response_model)
+
+        concurrency = concurrency or self.pool_maxsize
+        await asyncio.gather(*[worker() for _ in range(min(concurrency, len(common_requests)))])
+        return results
+
+    async def execute_many_with_retries(self, common_requests, concurrency: int=None, rounds: int=1,
+                                        should_retry=None):
+        results = await self.execute_many(common_requests, concurrency)
+        for _ in range(rounds):
+            failed = self.failed_indexes(results, should_retry)
+            if not failed:
+                break
+            self.log_config.log(logging.DEBUG, "Retry failed requests", action=results[failed[0]].request.action,
+                                indexes=failed)
+            retried = await self.execute_many([results[i].request for i in failed], concurrency)
+            for i, result in zip(failed, retried):
+                results[i] = result
+        return results
+
+    async def fetch_pages(self, action, params, pages, page_size, opts, concurrency=None, page_retries=1):
+        common_requests = [CommonRequest(action, dict(params, page=page, page_size=page_size), opts) for page in pages]
+        results = await self.execute_many_with_retries(common_requests, concurrency, page_retries)
+        return [result.result() for result in results]
+
+    async def submit_chunks(self, action, key, chunks, opts, concurrency=None, chunk_retries=1):
+        common_requests = [CommonRequest(action, {key: chunk}, opts) for chunk in chunks]
+        return await self.execute_many_with_retries(common_requests, concurrency, chunk_retries,
+                                                    self.is_retryable_result)
+
+    async def bulk_create_knowledge(self, knowledge_items, chunk_size: int=100, max_chunk_bytes: int=1024 * 1024,
+                                    concurrency: int=None, chunk_retries: int=1, **kwargs):
+        opts = self.opts_create(kwargs)
+        model = KnowledgeBatchCreate if opts["response_format"] == "model" else None
+        opts["response_format"] = "dict"
+        chunks = list(chunk_items(knowledge_items, chunk_size, max_chunk_bytes, self.codec))
+        results = await self.submit_chunks("/qa/knowledge-items/batch-create", "knowledge_items", chunks, opts,
+                                           concurrency, chunk_retries)
+        return self.merge_chunk_results(results, "knowledge_items", "knowledge_related_items", model)
+
+    async def bulk_mining_upload(self, queries, chunk_size: int=1000, concurrency: int=None, checkpoint_path: str=None,
+                                 dedupe: bool=True, chunk_retries: int=1, **kwargs):
+        opts = self.opts_create(kwargs)
+        model = MiningUpload if opts["response_format"] == "model" else None
+        opts["response_format"] = "dict"
+        concurrency = concurrency or self.pool_maxsize
+        checkpoint = Checkpoint(checkpoint_path, chunk_size)
+        query_filter = QueryFilter(dedupe)
+        chunks = enumerate(chunk_items(query_filter.filter(queries), chunk_size))
+        for batch in batched(chunks, concurrency):
+            batch = [(index, chunk) for index, chunk in batch if not checkpoint.is_done(index)]
+            if not batch:
+                continue
+            results = await self.submit_chunks("/nlp/sentence/mining/upload", "queries",
+                                               [chunk for _, chunk in batch], opts, concurrency, chunk_retries)
+            for (index, _), result in zip(batch, results):
+                if result.ok:
+                    checkpoint.mark_done(index, result.body or {})
+            checkpoint.save()
+            for result in results:
+                result.result()
+        return self.parse_response(self.mining_upload_counts(checkpoint, query_filter), model)
+
+    async def fetch_all_pages(self, action: str, page_size: int=100, concurrency: int=None, params: dict=None,
+                              page_retries: int=1, **kwargs):
+        if action not in PAGINATED_ACTIONS:
+            raise ClientException("SDK_INVALID_PARAMS", "Unsupported paginated action: {}".format(action))
+        params = params or {}
+        opts = self.opts_create(kwargs)
+        model = item_model(action) if opts["response_format"] == "model" else None
+        opts["response_format"] = "dict"
+        body = await self.fetch_page(action, params, 1, page_size, opts)
+        bodies = [body]
+        page_count = (body or {}).get("page_count")
+        if page_count is not None:
+            bodies += await self.fetch_pages(action, params, range(2, page_count + 1), page_size, opts, concurrency,
+                                             page_retries)
+        else:
+            page = 1
+            while has_next_page(body, page_items(action, body), page, page_size):
+                page += 1
+                body = await self.fetch_page(action, params, page, page_size, opts)
+                bodies.append(body)
+        return [self.parse_response(item, model) for body in bodies for item in page_items(action, body)]
+
+    async def iter_pages(self, action, params, page_size, opts, prefetch=True, first_page=None):
+        """
+        遍历分页api的所有页，返回异步迭代器：
+            async for item in client.iter_knowledge_items(page_size=100):
+                ...
+        prefetch为True时，消费当前页的同时并发请求下一页
+        """
+        model = item_model(action) if (opts.get("response_format") or self.response_format) == "model" else None
+        opts = dict(opts, response_format="dict")
+        task = None
+        try:
+            page = 1
+            body = first_page if first_page is not None else \
+                await self.fetch_page(action, params, page, page_size, opts)
+            while True:
+                items = page_items(action, body)
+                has_next = bool(items) and has_next_page(body, items, page, page_size)
+                if has_next and prefetch:
+                    task = asyncio.ensure_future(self.fetch_page(action, params, page + 1, page_size, opts))
+                for item in items:
+                    yield self.parse_response(item, model)
+                if not has_next:
+                    return
+                page += 1
+                if task is not None:
+                    body = await task
+                    task = None
+                else:
+                    body = await self.fetch_page(action, params, page, page_size, opts)
+        finally:
+            if task is not None:
+                task.cancel()
+
+    async def close(self):
+        self.release()
+        await self._http.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
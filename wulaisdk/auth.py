@@ -0,0 +1,116 @@
+import os
+import sys
+import time
+import weakref
+import hashlib
+import binascii
+import threading
+
+import requests
+
+
+_nonce_sources = weakref.WeakSet()
+
+
+def _reset_nonce_sources():
+    for source in list(_nonce_sources):
+        source.reset()
+
+
+class NonceSource:
+    """
+    随机nonce生成器
+    每次从os.urandom批量读取随机字节，按32位十六进制字符串切分，线程安全
+    fork出的子进程（如gunicorn、uwsgi的worker）会丢弃从父进程复制来的nonce并重新读取，避免多个进程使用相同的nonce
+    """
+
+    def __init__(self, batch_size: int=256):
+        """
+        :param batch_size: 每批生成的nonce数量
+        """
+        self.batch_size = batch_size
+        self._nonces = []
+        self._lock = threading.Lock()
+        _nonce_sources.add(self)
+
+    def reset(self):
+        """
+        fork后在子进程中调用，此时子进程只有一个线程
+        """
+        self._nonces = []
+        self._lock = threading.Lock()
+
+    def refill(self):
+        raw = binascii.hexlify(os.urandom(16 * self.batch_size)).decode("ascii")
+        self._nonces = [raw[i:i + 32] for i in range(0, len(raw), 32)]
+
+    def next(self):
+        with self._lock:
+            if not self._nonces:
+                self.refill()
+            return self._nonces.pop()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_nonce_sources)
+
+
+def make_user_agent(api_version, sdk_version):
+    py_version = "{}.{}.{}".format(sys.version_info.major, sys.version_info.minor, sys.version_info.micro)
+    return "wulai-openapi-sdk-python/{}-{} python/{} requests/{}".format(
+        api_version, sdk_version, py_version, requests.__version__)
+
+
+class Signer:
+    """
+    请求签名
+    pubkey、User-Agent等固定header在创建时生成一次，每次请求只计算nonce、timestamp及sign
+    sign = sha1(nonce + timestamp + secret)
+    """
+
+    def __init__(self, pubkey: str, secret: str, user_agent: str=None, nonce_source: NonceSource=None):
+        """
+        :param pubkey:
+        :param secret:
+        :param user_agent: 为None时headers()中不包含User-Agent
+        :param nonce_source: NonceSource，默认每个Signer独立一个
+        """
+        self.pubkey = pubkey
+        self.secret = secret
+        self.user_agent = user_agent
+        self.nonce_source = nonce_source or NonceSource()
+        self._secret = secret.encode("utf-8")
+        self._static_headers = {"Api-Auth-pubkey": pubkey}
+        if user_agent is not None:
+            self._static_headers["User-Agent"] = user_agent
+        self._timestamp = (None, None)
+
+    def timestamp(self):
+        second = int(time.time())
+        cached_second, timestamp = self._timestamp
+        if second != cached_second:
+            timestamp = str(second)
+            self._timestamp = (second, timestamp)
+        return timestamp
+
+    def auth_headers(self):
+        """
+        :return: Api-Auth-* headers
+        """
+        nonce = self.nonce_source.next()
+        timestamp = self.timestamp()
+        sign = hashlib.sha1((nonce + timestamp).encode("ascii") + self._secret).hexdigest()
+        return {
+            "Api-Auth-pubkey": self.pubkey,
+            "Api-Auth-sign": sign,
+            "Api-Auth-nonce": nonce,
+            "Api-Auth-timestamp": timestamp,
+        }
+
+    def headers(self):
+        """
+        :return: User-Agent及Api-Auth-* headers
+        """
+        headers = self._static_headers.copy()
+        headers.update(self.auth_headers())
+        return headers
@@ -0,0 +1,28 @@
+class BatchResult:
+    """
+    execute_many中单个请求的执行结果
+    ok为True时body为响应结果，否则exception为请求抛出的异常
+    """
+
+    def __init__(self, request, body=None, exception=None):
+        self.request = request
+        self.body = body
+        self.exception = exception
+
+    @property
+    def ok(self):
+        return self.exception is None
+
+    def result(self):
+        """
+        返回响应结果，请求失败时抛出对应异常
+        :return:
+        """
+        if self.exception is not None:
+            raise self.exception
+        return self.body
+
+    def __repr__(self):
+        if self.ok:
+            return "<BatchResult {} ok>".format(self.request.action)
+        return "<BatchResult {} {}>".format(self.request.action, self.exception)
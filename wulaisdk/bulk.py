@@ -0,0 +1,137 @@
+import os
+import json
+
+from wulaisdk.codec import JSONCodec
+from wulaisdk.exceptions import ClientException
+
+
+def chunk_items(items, max_items: int, max_bytes: int=None, codec=None):
+    """
+    按数量及编码后的大小切分列表，保持原顺序
+    单个元素超过max_bytes时独占一块
+    :param items: 可迭代对象
+    :param max_items: 每块的最大元素数
+    :param max_bytes: 每块编码后的最大字节数（近似值，不含外层key），为None时不限制
+    :param codec: 计算大小使用的codec，默认JSONCodec
+    :return: iterator of list
+    """
+    codec = codec or JSONCodec()
+    chunk, size = [], 0
+    for item in items:
+        item_size = len(codec.dumps(item)) + 1 if max_bytes else 0
+        if chunk and (len(chunk) >= max_items or (max_bytes and size + item_size > max_bytes)):
+            yield chunk
+            chunk, size = [], 0
+        chunk.append(item)
+        size += item_size
+    if chunk:
+        yield chunk
+
+
+def merge_list_bodies(bodies, key):
+    """
+    按顺序拼接多个响应体中的列表
+    :param bodies: 响应体dict列表
+    :param key: 列表的key
+    :return: dict
+    """
+    return {key: [item for body in bodies for item in (body or {}).get(key) or []]}
+
+
+def batched(iterable, n: int):
+    """
+    :return: 每次返回n个元素的列表，最后一个可能不足n个
+    """
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) >= n:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class QueryFilter:
+    """
+    待上传语料的预处理：去掉首尾空白及空行，dedupe为True时在本地去重
+    可直接传入文件对象，按行读取
+    """
+
+    def __init__(self, dedupe: bool=True):
+        self.dedupe = dedupe
+        self.duplicated_count = 0
+        self._seen = set()
+
+    def filter(self, queries):
+        for query in queries:
+            query = query.strip()
+            if not query:
+                continue
+            if self.dedupe:
+                if query in self._seen:
+                    self.duplicated_count += 1
+                    continue
+                self._seen.add(query)
+            yield query
+
+
+class Checkpoint:
+    """
+    分块上传的进度，记录已完成的块及其累计结果
+    path不为None时保存为json文件，中断后以相同的输入及chunk_size重新上传会跳过已完成的块
+    """
+
+    def __init__(self, path: str=None, chunk_size: int=None):
+        """
+        :param path: 进度文件路径，为None时只在内存中记录
+        :param chunk_size: 与进度文件中的不一致时抛出异常，避免分块错位
+        """
+        self.path = path
+        self.chunk_size = chunk_size
+        self.completed = 0
+        self.done = set()
+        self.counts = {}
+        self.load()
+
+    def load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("chunk_size") != self.chunk_size:
+            raise ClientException("SDK_INVALID_PARAMS", "Checkpoint chunk_size {} does not match {}".format(
+                state.get("chunk_size"), self.chunk_size))
+        self.completed = state.get("completed", 0)
+        self.done = set(state.get("done", []))
+        self.counts = state.get("counts", {})
+
+    def save(self):
+        if self.path is None:
+            return
+        state = {
+            "chunk_size": self.chunk_size,
+            "completed": self.completed,
+            "done": sorted(self.done),
+            "counts": self.counts,
+        }
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.path)
+
+    def is_done(self, index: int):
+        return index < self.completed or index in self.done
+
+    def mark_done(self, index: int, counts: dict):
+        """
+        :param index: 块的序号
+        :param counts: 该块结果中需要累加的计数
+        """
+        self.done.add(index)
+        while self.completed in self.done:
+            self.done.remove(self.completed)
+            self.completed += 1
+        for key, value in counts.items():
+            if isinstance(value, int):
+                self.counts[key] = self.counts.get(key, 0) + value
@@ -0,0 +1,176 @@
+import json
+import time
+import uuid
+import threading
+
+from collections import OrderedDict
+
+from wulaisdk.actions import CACHEABLE_ACTIONS, CACHE_INVALIDATIONS
+
+
+class BaseCache:
+    """
+    缓存后端接口
+    进程外缓存（如redis、memcached）实现get/set/delete/clear即可，value为可json序列化的dict
+    """
+
+    def get(self, key):
+        """
+        :param key: str
+        :return: 缓存值，未命中时返回None
+        """
+        raise NotImplementedError
+
+    def set(self, key, value, ttl):
+        """
+        :param key: str
+        :param value: dict
+        :param ttl: 过期时间（秒）
+        :return:
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+
+class LRUCache(BaseCache):
+    """
+    进程内LRU缓存，线程安全
+    value序列化为json保存，每次get返回新的对象，调用方修改返回值不影响缓存
+    """
+
+    def __init__(self, maxsize: int=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()  # key: (expire_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[0] <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return json.loads(item[1])
+
+    def set(self, key, value, ttl):
+        value = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ResponseCache:
+    """
+    只读api的响应缓存
+    缓存key由action、版本号及params组成，通过同一个client调用写操作（create_*/update_*/delete_*）成功后，
+    对应只读api的缓存自动失效。失效时为action生成新的版本号（uuid）并写入缓存后端，旧的缓存不再被命中，到期后自然淘汰；
+    多个进程共用进程外缓存时，一个进程的写操作同样使其他进程的缓存失效。
+    缓存key在发出请求前确定，请求期间发生的写操作会使这次的响应写入旧版本，不会被命中。
+    """
+
+    def __init__(self, backend: BaseCache=None, ttl: float=60, action_ttls: dict=None,
+                 actions=CACHEABLE_ACTIONS, invalidations: dict=None, prefix: str="wulaisdk:",
+                 version_ttl: float=86400):
+        """
+        :param backend: 缓存后端，默认LRUCache()
+        :param ttl: 默认过期时间（秒）
+        :param action_ttls: 按api设置过期时间，如{"/qa/knowledge-tags/list": 600}，可包含actions以外的只读api
+        :param actions: 默认缓存的api
+        :param invalidations: 写操作与需要失效的只读api的对应关系，默认CACHE_INVALIDATIONS
+        :param prefix: 缓存key前缀，多个client共用进程外缓存时用于区分机器人
+        :param version_ttl: 版本号的过期时间（秒），应大于各api的过期时间。版本号过期或被淘汰时重新生成，只会导致缓存未命中
+        """
+        self.backend = backend if backend is not None else LRUCache()
+        self.ttls = {action: ttl for action in actions}
+        self.ttls.update(action_ttls or {})
+        self.invalidations = CACHE_INVALIDATIONS if invalidations is None else invalidations
+        self.prefix = prefix
+        self.version_ttl = version_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def applies(self, action):
+        return self.ttls.get(action, 0) > 0
+
+    def version_key(self, action):
+        return "{}version|{}".format(self.prefix, action)
+
+    def bump_version(self, action):
+        version = uuid.uuid4().hex
+        self.backend.set(self.version_key(action), {"version": version}, self.version_ttl)
+        return version
+
+    def get_version(self, action):
+        item = self.backend.get(self.version_key(action))
+        if item is None:
+            return self.bump_version(action)
+        return item["version"]
+
+    def make_key(self, request):
+        """
+        在发出请求前调用，读取action当前的版本号
+        :param request: CommonRequest
+        :return: str
+        """
+        params = json.dumps(request.params, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        return "{}{}|{}|{}".format(self.prefix, request.action, self.get_version(request.action), params)
+
+    def get(self, key):
+        """
+        :param key: make_key的返回值
+        :return: 响应体，未命中时返回None
+        """
+        body = self.backend.get(key)
+        with self._lock:
+            if body is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return body
+
+    def set(self, key, action, body):
+        """
+        :param key: 发出请求前make_key的返回值
+        :param action:
+        :param body: dict
+        :return:
+        """
+        if body is not None:
+            self.backend.set(key, body, self.ttls[action])
+
+    def invalidate(self, action):
+        """
+        写操作成功后调用，使相关只读api的缓存失效
+        :param action: 写操作的action
+        :return:
+        """
+        for read_action in self.invalidations.get(action, ()):
+            self.bump_version(read_action)
+
+    def stats(self):
+        """
+        :return: {"hits": 命中次数, "misses": 未命中次数}
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,167 @@
+import time
+import threading
+
+from collections import deque
+
+from wulaisdk.exceptions import ClientException, ServerException, ERR_INFO
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    熔断器
+    closed: 正常放行，统计最近window_size次调用的失败率及慢调用率，超过阈值时打开熔断
+    open: 直接拒绝请求，open_duration秒后进入half_open
+    half_open: 放行half_open_max_calls次试探请求，全部完成后按阈值决定关闭或重新打开
+    """
+
+    def __init__(self, failure_rate_threshold: float=0.5, slow_call_rate_threshold: float=None,
+                 slow_call_duration: float=3.0, window_size: int=20, min_calls: int=10,
+                 open_duration: float=30.0, half_open_max_calls: int=3):
+        """
+        :param failure_rate_threshold: 失败率阈值
+        :param slow_call_rate_threshold: 慢调用率阈值，默认None即不按慢调用熔断
+        :param slow_call_duration: 超过该耗时（秒）的调用记为慢调用
+        :param window_size: 统计最近多少次调用
+        :param min_calls: 调用次数达到min_calls后才开始计算失败率
+        :param open_duration: 熔断持续时间（秒）
+        :param half_open_max_calls: half_open状态下的试探请求数
+        """
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_max_calls = half_open_max_calls
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._half_open_permits = 0
+        self._calls = deque(maxlen=window_size)  # (failed, slow)
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def _refresh_state(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_duration:
+            self._transition(HALF_OPEN)
+
+    def _transition(self, state):
+        self._state = state
+        self._calls = deque(maxlen=self.window_size if state == CLOSED else self.half_open_max_calls)
+        self._half_open_permits = 0
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+
+    def allow_request(self):
+        with self._lock:
+            self._refresh_state()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._half_open_permits < self.half_open_max_calls:
+                self._half_open_permits += 1
+                return True
+            return False
+
+    def release(self):
+        """
+        归还allow_request获取的试探名额（请求最终未发出时调用）
+        :return:
+        """
+        with self._lock:
+            if self._state == HALF_OPEN and self._half_open_permits > 0:
+                self._half_open_permits -= 1
+
+    def failure_rate(self):
+        return sum(1 for failed, _ in self._calls if failed) / len(self._calls)
+
+    def too_many_slow_calls(self):
+        if self.slow_call_rate_threshold is None:
+            return False
+        return sum(1 for _, slow in self._calls if slow) / len(self._calls) >= self.slow_call_rate_threshold
+
+    def record(self, failed: bool, duration: float):
+        """
+        记录一次调用结果
+        :param failed: 是否失败
+        :param duration: 耗时（秒）
+        :return:
+        """
+        with self._lock:
+            if self._state == OPEN:
+                return
+            self._calls.append((failed, duration >= self.slow_call_duration))
+            min_calls = self.min_calls if self._state == CLOSED else self.half_open_max_calls
+            if len(self._calls) < min_calls:
+                return
+            if self.failure_rate() >= self.failure_rate_threshold or self.too_many_slow_calls():
+                self._transition(OPEN)
+            elif self._state == HALF_OPEN:
+                self._transition(CLOSED)
+
+
+class CircuitBreakers:
+    """
+    client使用的熔断器集合，按endpoint及(endpoint, action)分别熔断
+    任意一个熔断器打开时，请求直接抛出ClientException("SDK_CIRCUIT_OPEN")
+    参数同CircuitBreaker。慢调用只按action统计，endpoint的熔断器只按失败率熔断，
+    避免批量导入等本身较慢的api打开endpoint的熔断器，拒绝其他api的请求
+    """
+
+    def __init__(self, **config):
+        self.config = config
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        :param key: endpoint或(endpoint, action)
+        :return: CircuitBreaker
+        """
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            config = self.config if isinstance(key, tuple) else dict(self.config, slow_call_rate_threshold=None)
+            with self._lock:
+                breaker = self._breakers.setdefault(key, CircuitBreaker(**config))
+        return breaker
+
+    def acquire(self, endpoint, action):
+        """
+        :param endpoint:
+        :param action:
+        :return: 本次请求需要记录结果的熔断器
+        """
+        breakers = (self.get(endpoint), self.get((endpoint, action)))
+        for i, breaker in enumerate(breakers):
+            if not breaker.allow_request():
+                for acquired in breakers[:i]:
+                    acquired.release()
+                raise ClientException("SDK_CIRCUIT_OPEN", ERR_INFO["SDK_CIRCUIT_OPEN"].format(endpoint + action))
+        return breakers
+
+    @staticmethod
+    def is_failure(exception):
+        if isinstance(exception, ServerException):
+            return exception.http_status_code >= 500
+        if isinstance(exception, ClientException):
+            return exception.error_code in ("SDK_HTTP_ERROR", "SDK_SERVER_UNREACHABLE", "SDK_RESPONSE_ERROR")
+        return exception is not None
+
+    def record(self, breakers, exception, duration):
+        failed = self.is_failure(exception)
+        for breaker in breakers:
+            breaker.record(failed, duration)
+
+    def states(self):
+        """
+        :return: {key: state}
+        """
+        return {key: breaker.state for key, breaker in list(self._breakers.items())}
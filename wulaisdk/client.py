@@ -1,14 +1,29 @@
 import time
-import uuid
-import hashlib
 import logging
-import sys
-import requests
+import threading
 
-from wulaisdk.http import BaseRequest
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait, FIRST_COMPLETED
+
+from wulaisdk.http import TRANSPORTS
+from wulaisdk.auth import Signer, make_user_agent
+from wulaisdk.codec import JSONCodec, get_codec
+from wulaisdk.compression import CompressionPolicy
 from wulaisdk import http_codes
 from wulaisdk.request import CommonRequest
-from wulaisdk.exceptions import ServerException, ClientException, ERR_INFO
+from wulaisdk.batch import BatchResult
+from wulaisdk.retry import RetryPolicy
+from wulaisdk.circuit_breaker import CircuitBreakers
+from wulaisdk.hedge import HedgePolicy
+from wulaisdk.singleflight import SingleFlight
+from wulaisdk.cache import ResponseCache
+from wulaisdk.tracing import TracingPolicy
+from wulaisdk.log import LogConfig
+from wulaisdk.ratelimit import TokenBucket
+from wulaisdk.metrics import MetricsHook, ResponseTiming
+from wulaisdk.response.slots import slotted
+from wulaisdk.pagination import PAGINATED_ACTIONS, page_items, item_model, has_next_page
+from wulaisdk.bulk import chunk_items, merge_list_bodies, batched, QueryFilter, Checkpoint
+from wulaisdk.exceptions import ServerException, ClientException, BulkPartialFailure, ERR_INFO
 
 from requests.exceptions import ConnectionError, ConnectTimeout
 
@@ -32,89 +47,136 @@ from wulaisdk.response.category_task import Scenes, CreateScene, UpdateScene, In
 from wulaisdk.response.category_config import UpdateConfig
 
 
-DEBUG = False
 SDK_VERSION = "1.1.9"
-
-logger = logging.getLogger(__name__)
-formatter = logging.Formatter('%(asctime)s %(process)d %(thread)d %(levelname)s %(message)s')
-handler = logging.StreamHandler()
-handler.setFormatter(formatter)
-logger.addHandler(handler)
+# 响应格式：model返回响应类，dict返回解析后的dict，raw返回响应的bytes
+RESPONSE_FORMATS = ("model", "dict", "raw")
 
 
 class WulaiClient:
     def __init__(self, pubkey: str, secret: str, endpoint: str="https://openapi.wul.ai",
                  api_version: str="v2", debug: bool=False, pool=None, pool_connections: int=10, pool_maxsize: int=10,
-                 max_retries: int=3, global_timeout=5):
+                 max_retries: int=3, global_timeout=5, transport: str="requests", retry_policy: RetryPolicy=None,
+                 circuit_breakers: CircuitBreakers=None, hedge_policy: HedgePolicy=None,
+                 single_flight: SingleFlight=None, response_cache: ResponseCache=None, lazy_parsing: bool=False,
+                 compact_models: bool=False, response_format: str="model", codec=None,
+                 compression: CompressionPolicy=None, metrics: MetricsHook=None,
+                 tracing: TracingPolicy=None, log_config: LogConfig=None, rate_limiter: TokenBucket=None):
         """
         client
         :param pubkey:
         :param secret:
         :param endpoint:
         :param api_version:
-        :param debug:
+        :param debug: Log DEBUG records of this client. Ignored when log_config is passed in.
         :param pool: connection pool. Each client instance has its own pool by default.
         Also you could create one on 'connection_pool_init' method and pass in arguments if you wanna a global pool.
         :param pool_connections:
         :param pool_maxsize:
-        :param max_retries:
+        :param max_retries: Connection retries of the underlying pool.
         :param global_timeout: Basic timeout setting for each api and could be reset in specific api. Default: 5 seconds.
+        :param transport: "requests"(default) or "http2". Ignored when pool is passed in.
+        :param retry_policy: RetryPolicy. Backoff, retryable errors and retry budget of api calls. Default: RetryPolicy()
+        :param circuit_breakers: CircuitBreakers. Opt-in circuit breakers keyed by endpoint and by action.
+        :param hedge_policy: HedgePolicy. Opt-in hedged requests for latency-critical apis.
+        :param single_flight: SingleFlight. Opt-in coalescing of identical concurrent read-only requests.
+        :param response_cache: ResponseCache. Opt-in response cache of read-only apis.
+        :param lazy_parsing: Parse nested response models on first attribute access instead of eagerly.
+        :param compact_models: Return __slots__ variants of response models to reduce memory footprint.
+        :param response_format: "model"(default), "dict" or "raw"(response bytes). Could be reset in specific api.
+        :param codec: JSON codec for request and response bodies: "json", "orjson"(falls back to json when orjson
+        is not installed) or an object with dumps/loads. Default: None, the transport's builtin json is used.
+        :param compression: CompressionPolicy. Opt-in gzip/deflate compression of large request bodies of bulk apis.
+        :param metrics: MetricsHook. Opt-in per request timing and retry hooks, e.g. MetricsCollector().
+        :param tracing: TracingPolicy. Opt-in tracing spans per api call and per attempt, and trace headers injection.
+        :param log_config: LogConfig. Logger, handlers and payload limit of this client. Default: LogConfig(debug)
+        :param rate_limiter: TokenBucket. Opt-in client side rate limit of http requests, retries included.
         """
         self.pubkey = pubkey
         self.secret = secret
         self.endpoint = endpoint
         self.api_version = api_version
+        self.signer = Signer(pubkey, secret, make_user_agent(api_version, SDK_VERSION))
         self.pool_connections = pool_connections
         self.pool_maxsize = pool_maxsize
         self.max_retries = max_retries
         self.global_timeout = global_timeout
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breakers = circuit_breakers
+        self.hedge_policy = hedge_policy
+        self._hedge_executor = None
+        self._primary_executor = None
+        self._primary_slots = None
+        self._executor_lock = threading.Lock()
+        self.single_flight = single_flight
+        self.response_cache = response_cache
+        self.lazy_parsing = lazy_parsing
+        self.compact_models = compact_models
+        self.response_format = self.check_response_format(response_format)
+        self.codec = get_codec(codec)
+        self.compression = compression
+        self.metrics = metrics
+        self.tracing = tracing
+        self.log_config = log_config or LogConfig(debug)
+        self.rate_limiter = rate_limiter
+        self.logger = self.log_config.logger
         self._http = pool or self.connection_pool_init(self.endpoint, self.pool_connections, self.pool_maxsize,
-                                                       self.max_retries)
-        global DEBUG
-        DEBUG = debug
+                                                       self.max_retries, transport)
         self.prepare_request()
 
     def prepare_request(self):
         self.check_api_version()
-        self.logger_level_init()
 
     @staticmethod
-    def connection_pool_init(endpoint, pool_connections, pool_maxsize, max_retries):
-        pool = BaseRequest(endpoint=endpoint, pool_connections=pool_connections,
-                           pool_maxsize=pool_maxsize, max_retries=max_retries)
+    def connection_pool_init(endpoint, pool_connections, pool_maxsize, max_retries, transport="requests"):
+        if transport not in TRANSPORTS:
+            raise ClientException("SDK_INVALID_PARAMS", "Unsupported transport: {}".format(transport))
+        pool = TRANSPORTS[transport](endpoint=endpoint, pool_connections=pool_connections,
+                                     pool_maxsize=pool_maxsize, max_retries=max_retries)
         return pool
 
-    @staticmethod
-    def logger_level_init():
-        global logger
-        if DEBUG:
-            logger.setLevel(logging.DEBUG)
-        else:
-            logger.setLevel(logging.ERROR)
+    def release(self):
+        """
+        释放client自身的资源（对冲请求的线程池），不关闭连接池，用于多个client共用连接池时
+        :return:
+        """
+        with self._executor_lock:
+            for executor in (self._hedge_executor, self._primary_executor):
+                if executor is not None:
+                    executor.shutdown(wait=False)
+            self._hedge_executor = None
+            self._primary_executor = None
+            self._primary_slots = None
 
-    @staticmethod
-    def add_logger_handler(log_handler):
-        global logger
-        logger.addHandler(log_handler)
+    def close(self):
+        """
+        关闭连接池
+        :return:
+        """
+        self.release()
+        self._http.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def add_logger_handler(self, log_handler):
+        """
+        给该client的logger添加handler，不影响其他client
+        :param log_handler: logging.Handler
+        :return:
+        """
+        self.log_config.add_handler(log_handler)
 
     def check_api_version(self):
         if not self.api_version.startswith("v"):
             raise ClientException("SDK_INVALID_API_VERSION", ERR_INFO["SDK_INVALID_API_VERSION"])
 
     def make_authentication(self, pubkey, secret):
-        headers = {}
-        timestamp = str(int(time.time()))
-        nonce = uuid.uuid4().hex
-        sign = hashlib.sha1((nonce + timestamp + secret).encode("utf-8")).hexdigest()
-        data = {
-            "pubkey": pubkey,
-            "sign": sign,
-            "nonce": nonce,
-            "timestamp": timestamp
-        }
-        for k, v in data.items():
-            headers["Api-Auth-" + k] = v
-        return headers
+        if pubkey == self.signer.pubkey and secret == self.signer.secret:
+            return self.signer.auth_headers()
+        return Signer(pubkey, secret).auth_headers()
 
     def check_request(self, request):
         if not isinstance(request, CommonRequest):
@@ -126,28 +188,71 @@ class WulaiClient:
         :param request:
         :return:
         """
-        py_version = f"{sys.version_info.major}.{sys.version_info.minor}.{sys.version_info.micro}"
-        requests_version = requests.__version__
-        request.add_headers(
-            "User-Agent",
-            f"wulai-openapi-sdk-python/{self.api_version}-{SDK_VERSION} python/{py_version} requests/{requests_version}"
-        )
+        request.add_headers("User-Agent", self.signer.user_agent)
 
     def get_url(self, request):
         url = self.endpoint + "/" + self.api_version + request.action
         return url
 
-    def response_wrapper(self, response):
+    @staticmethod
+    def check_response_format(response_format):
+        if response_format not in RESPONSE_FORMATS:
+            raise ClientException("SDK_INVALID_PARAMS", "Unsupported response_format: {}".format(response_format))
+        return response_format
+
+    def get_response_format(self, request):
+        """
+        :param request: CommonRequest
+        :return: opts中的response_format，未设置时为client的response_format
+        """
+        response_format = request.opts.get("response_format")
+        if response_format is None:
+            return self.response_format
+        return self.check_response_format(response_format)
+
+    def encode_body(self, method, request):
+        """
+        设置codec或需要压缩时POST请求体编码为bytes，否则由传输层编码
+        压缩后的请求体设置Content-Encoding
+        :param method:
+        :param request: CommonRequest
+        :return: dict或bytes
+        """
+        if method != "POST":
+            return request.params
+        compress = self.compression is not None and self.compression.applies(request.action)
+        if self.codec is None and not compress:
+            return request.params
+        body = (self.codec or JSONCodec()).dumps(request.params)
+        if compress:
+            body, encoding = self.compression.compress(body)
+            if encoding is not None:
+                request.add_headers("Content-Encoding", encoding)
+        return body
+
+    def decode_body(self, response):
+        if self.codec is None:
+            return response.json()
+        return self.codec.loads(response.content)
+
+    def response_wrapper(self, response, raw=False):
+        """
+        :param response:
+        :param raw: 为True时直接返回响应的bytes，不解析json
+        :return: (body, exception)
+        """
         js = None
         exception = None
         if response is not None and response.status_code == http_codes.OK:
+            if raw:
+                return response.content, exception
             try:
-                js = response.json()
+                js = self.decode_body(response)
             except Exception:
                 raise ClientException("SDK_RESPONSE_ERROR", "Please retry")
         elif response is not None and response.status_code >= http_codes.PARAMS_ERROR:
             try:
-                err_msg = response.json()["message"]
+                err_msg = self.decode_body(response)["message"]
             except Exception:
                 err_msg = ""
             if response.status_code == 400:
@@ -167,69 +272,506 @@ class WulaiClient:
                                             response.status_code)
         return js, exception
 
-    def handle_single_request(self, request):
+    def prepare_single_request(self, request):
+        """
+        签名、补全headers，返回实际请求所需的method、url、timeout及请求体
+        :param request:
+        :return:
+        """
         self.check_request(request)
-        self.add_user_agent(request)
         url = self.get_url(request)
-        auth_headers = self.make_authentication(self.pubkey, self.secret)
-        request.update_headers(auth_headers)
+        request.update_headers(self.signer.headers())
 
-        method = request.opts.get("method", "POST")
+        method = request.opts.get("method", "POST").upper()
         timeout = request.opts.get("timeout", 3)
-        logger.debug("Request received. Action: {}. Endpoint: {}. Params: {}. Opts: {}".format(
-            request.action, self.endpoint, request.params, request.opts))
+        self.log_config.log(logging.DEBUG, "Request received", action=request.action, endpoint=self.endpoint,
+                            params=request.params, opts=request.opts)
+        if method not in ("POST", "GET"):
+            self.log_config.log(logging.ERROR, "SDK_METHOD_NOT_ALLOW", error_msg=ERR_INFO["SDK_METHOD_NOT_ALLOW"],
+                                method=method)
+            raise ClientException("SDK_METHOD_NOT_ALLOW", ERR_INFO["SDK_METHOD_NOT_ALLOW"])
+        return method, url, timeout, self.encode_body(method, request)
 
+    @staticmethod
+    def response_ttfb(response):
         try:
-            if method.upper() == "POST":
-                resp = self._http.post(url, request.params, request.headers, timeout)
-            elif method.upper() == "GET":
-                resp = self._http.get(url, request.params, request.headers, timeout)
-            else:
-                logger.error("SDK_METHOD_NOT_ALLOW: {}. method: {}".format(
-                    ERR_INFO["SDK_METHOD_NOT_ALLOW"], method.upper()))
-                raise ClientException("SDK_METHOD_NOT_ALLOW", ERR_INFO["SDK_METHOD_NOT_ALLOW"])
-        except IOError as e:
-            logger.error("HttpError occurred. Action:{} Version:{} ClientException:{}".format(
-                request.action, self.api_version, str(e)))
-            raise ClientException("SDK_HTTP_ERROR", str(e))
-        except (ConnectTimeout, ConnectionError) as e:
-            logger.error("HttpError occurred. Action:{} Version:{} ClientException:{}".format(
-                request.action, self.api_version, str(e)))
-            raise ClientException("SDK_SERVER_UNREACHABLE", str(e))
-        return self.response_wrapper(resp)
-
-    def process_common_request(self, request):
-        retries = request.opts.get("retry", 0)
+            return response.elapsed.total_seconds()
+        except Exception:
+            return None
+
+    def record_response(self, request, response, start, received):
+        """
+        :param request: CommonRequest
+        :param response: 传输层的响应
+        :param start: 发出请求的时间
+        :param received: 读取完响应体的时间
+        """
+        timing = ResponseTiming(status_code=response.status_code, ttfb=self.response_ttfb(response),
+                                duration=received - start, decode_time=time.monotonic() - received,
+                                response_size=len(response.content or b""))
+        self.metrics.on_response(request, timing)
+
+    def handle_http_error(self, request, error_code, e):
+        self.log_config.log(logging.ERROR, "HttpError occurred", action=request.action, version=self.api_version,
+                            exception=e)
+        return ClientException(error_code, str(e))
+
+    def acquire_circuit_breakers(self, request):
+        if self.circuit_breakers is None:
+            return ()
+        return self.circuit_breakers.acquire(self.endpoint, request.action)
+
+    def release_circuit_breakers(self, breakers):
+        for breaker in breakers:
+            breaker.release()
+
+    def record_circuit_breakers(self, breakers, exception, duration):
+        if breakers:
+            self.circuit_breakers.record(breakers, exception, duration)
+
+    def handle_single_request(self, request):
+        method, url, timeout, data = self.prepare_single_request(request)
+        breakers = self.acquire_circuit_breakers(request)
+        start = time.monotonic()
+        exception = None
+        try:
+            try:
+                resp = self._http.send(method, url, data, request.headers, timeout)
+            except (ConnectTimeout, ConnectionError) as e:
+                exception = self.handle_http_error(request, "SDK_SERVER_UNREACHABLE", e)
+                raise exception
+            except IOError as e:
+                exception = self.handle_http_error(request, "SDK_HTTP_ERROR", e)
+                raise exception
+            received = time.monotonic()
+            body, exception = self.response_wrapper(resp, self.get_response_format(request) == "raw")
+            if self.metrics is not None:
+                self.record_response(request, resp, start, received)
+        except BaseException as e:
+            # 解析响应出错等任何异常都记为失败，避免半开状态的探测请求出错后熔断器被关闭
+            exception = exception or e
+            raise
+        finally:
+            self.record_circuit_breakers(breakers, exception, time.monotonic() - start)
+        return body, exception
+
+    def timed_single_request(self, request):
+        start = time.monotonic()
+        body, exception = self.handle_single_request(request)
+        if exception is None:
+            self.hedge_policy.record_latency(request.action, time.monotonic() - start)
+        return body, exception
+
+    @staticmethod
+    def hedge_outcome(future):
+        try:
+            return future.result()
+        except ClientException as e:
+            return None, e
+
+    def get_hedge_executor(self):
+        with self._executor_lock:
+            if self._hedge_executor is None:
+                self._hedge_executor = ThreadPoolExecutor(
+                    max_workers=self.hedge_policy.max_workers or self.pool_maxsize * 2)
+            return self._hedge_executor
+
+    def get_primary_executor(self):
+        """
+        首个请求的线程池与占用计数，二者大小相同，取得计数后提交的任务不会排队
+        :return: (executor, slots)
+        """
+        with self._executor_lock:
+            if self._primary_executor is None:
+                max_primaries = self.hedge_policy.max_primaries or self.pool_maxsize * 2
+                self._primary_executor = ThreadPoolExecutor(max_workers=max_primaries)
+                self._primary_slots = threading.BoundedSemaphore(max_primaries)
+            return self._primary_executor, self._primary_slots
+
+    def start_primary_request(self, request):
+        """
+        在首个请求的线程池中立即发出请求，对冲等待时间从请求实际发出时开始计算
+        调用方线程需要在对冲请求先返回时提前返回，因此不能由它自己执行首个请求
+        :param request:
+        :return: Future，线程池已满时返回None
+        """
+        executor, slots = self.get_primary_executor()
+        if not slots.acquire(blocking=False):
+            return None
+
+        def run():
+            try:
+                return self.timed_single_request(request)
+            finally:
+                slots.release()
+
+        try:
+            return executor.submit(run)
+        except RuntimeError:
+            # release后线程池已关闭
+            slots.release()
+            return None
+
+    def can_send_hedge(self, request):
+        """
+        对冲请求同样消耗限流令牌，对冲预算不足或没有可用令牌时不发出对冲请求，也不等待令牌
+        :param request:
+        :return:
+        """
+        if not self.hedge_policy.can_hedge():
+            return False
+        if self.rate_limiter is not None and not self.rate_limiter.try_acquire():
+            return False
+        return True
+
+    def handle_hedged_request(self, request):
+        """
+        对冲请求：首个请求超过对冲等待时间未返回时，再发出一个相同的请求，先成功返回的结果生效
+        同步client无法中断已发出的请求，落后的请求结果会被丢弃
+        :param request:
+        :return:
+        """
+        delay = self.hedge_policy.get_delay(request.action)
+        if delay is None:
+            return self.timed_single_request(request)
+        primary = self.start_primary_request(request.copy())
+        if primary is None:
+            self.log_config.log(logging.DEBUG, "Hedge skipped", action=request.action, reason="primary pool full")
+            return self.timed_single_request(request)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        if not self.can_send_hedge(request):
+            self.log_config.log(logging.DEBUG, "Hedge skipped", action=request.action, reason="budget or rate limit")
+            return self.hedge_outcome(primary)
+        self.hedge_policy.record_hedge(request.action)
+        self.log_config.log(logging.DEBUG, "Hedged request sent", action=request.action, delay=round(delay, 3))
+        hedge = self.get_hedge_executor().submit(self.timed_single_request, request.copy())
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                body, exception = self.hedge_outcome(future)
+                if exception is None:
+                    if future is hedge:
+                        self.hedge_policy.record_hedge_win(request.action)
+                    for loser in pending:
+                        loser.cancel()
+                    return body, exception
+        return self.hedge_outcome(primary)
+
+    def handle_request(self, request):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        if self.hedge_policy is not None and self.hedge_policy.applies(request.action):
+            return self.handle_hedged_request(request)
+        return self.handle_single_request(request)
+
+    def parse_response(self, body, response_model=None, response_format="model"):
+        """
+        将响应体转换为对应的响应类
+        :param body: dict
+        :param response_model: BaseModel子类，为None时直接返回dict
+        :param response_format: 不为"model"时直接返回body
+        :return:
+        """
+        if response_model is None or response_format != "model":
+            return body
+        if self.compact_models:
+            return slotted(response_model).from_dict(body)
+        return response_model.from_dict(body, self.lazy_parsing)
+
+    def get_cached_response(self, request):
+        """
+        :param request: CommonRequest
+        :return: 缓存的响应体，未启用缓存或未命中时返回None
+        """
+        if self.response_cache is None or not self.response_cache.applies(request.action):
+            return None
+        if self.get_response_format(request) == "raw":
+            return None
+        request.cache_key = self.response_cache.make_key(request)
+        body = self.response_cache.get(request.cache_key)
+        if body is not None:
+            self.log_config.log(logging.DEBUG, "Response cache hit", action=request.action)
+        return body
+
+    def cache_response(self, request, body):
+        """
+        只读api写入缓存，写操作使相关缓存失效
+        :param request: CommonRequest
+        :param body: dict
+        :return:
+        """
+        if self.response_cache is None:
+            return
+        if self.response_cache.applies(request.action):
+            if isinstance(body, dict) and request.cache_key is not None:
+                self.response_cache.set(request.cache_key, request.action, body)
+        else:
+            self.response_cache.invalidate(request.action)
+
+    def finish_request(self, request, body, response_model, retries, start):
+        """
+        写入缓存并转换为响应类
+        :param request: CommonRequest
+        :param body: 响应体
+        :param response_model:
+        :param retries: 重试次数
+        :param start: 开始请求的时间
+        :return:
+        """
+        self.cache_response(request, body)
+        response_format = self.get_response_format(request)
+        if self.metrics is None:
+            return self.parse_response(body, response_model, response_format)
+        parse_start = time.monotonic()
+        result = self.parse_response(body, response_model, response_format)
+        end = time.monotonic()
+        self.metrics.on_request_end(request, retries, end - start, end - parse_start)
+        return result
+
+    def process_common_request(self, request, response_model=None):
+        """
+        发起请求，按照retry_policy进行重试，opts中的retry可覆盖最大重试次数
+        :param request: CommonRequest
+        :param response_model: 响应类，为None时返回原始dict
+        :return:
+        """
+        body = self.get_cached_response(request)
+        if body is not None:
+            return self.parse_response(body, response_model, self.get_response_format(request))
+        if self.single_flight is not None and self.single_flight.applies(request.action):
+            key = self.single_flight.make_key(request, response_model)
+            return self.single_flight.do(key, lambda: self.process_request_with_retry(request, response_model))
+        return self.process_request_with_retry(request, response_model)
+
+    def process_request_with_retry(self, request, response_model=None):
+        if self.tracing is None:
+            return self.retry_request(request, response_model)
+        with self.tracing.request_span(request, self.api_version) as span:
+            return self.retry_request(request, response_model, span)
+
+    def attempt_request(self, request, attempt, span=None):
+        """
+        span不为None时每次http请求在子span中执行
+        """
+        if span is None:
+            try:
+                return self.handle_request(request)
+            except ClientException as e:
+                return None, e
+        with self.tracing.attempt_span(request, attempt) as attempt_span:
+            try:
+                body, exception = self.handle_request(request)
+            except ClientException as e:
+                body, exception = None, e
+            self.tracing.record_result(attempt_span, exception)
+        return body, exception
+
+    def retry_request(self, request, response_model=None, span=None):
+        """
+        按照retry_policy重试，span为启用链路追踪时api调用的span
+        """
+        max_retries = request.opts.get("retry")
+        self.retry_policy.record_request()
+        start = time.monotonic()
+        if self.metrics is not None:
+            self.metrics.on_request_start(request)
+        attempt = 0
         while True:
-            body, exception = self.handle_single_request(request)
-            if body is not None:
-                retries = -1
-            else:
-                retries -= 1
-                logger.debug("Retry needed. Action: {}. Number of remaining retries: {}".format(
-                    request.action, retries))
-            if retries <= 0:
+            body, exception = self.attempt_request(request, attempt, span)
+            if exception is None or not self.retry_policy.should_retry(request, exception, attempt, max_retries):
                 break
+            attempt += 1
+            delay = self.retry_policy.backoff(attempt)
+            if self.metrics is not None:
+                self.metrics.on_retry(request, attempt, delay, exception)
+            self.log_config.log(logging.DEBUG, "Retry needed", action=request.action, attempt=attempt,
+                                backoff=round(delay, 3), exception=exception)
+            time.sleep(delay)
         if exception:
-            logger.error("{}:{}. Action:{} Version:{} Exception:".format(
-                exception.error_code, exception.error_msg, request.action, self.api_version))
+            self.log_config.log(logging.ERROR, "Request failed", error_code=exception.error_code,
+                                error_msg=exception.error_msg, action=request.action, version=self.api_version)
+            if self.metrics is not None:
+                self.metrics.on_error(request, exception, attempt, time.monotonic() - start)
+            if span is not None:
+                self.tracing.record_result(span, exception, attempt)
             raise exception
-        logger.debug("Response received. Action: {}. Response-body: {}".format(request.action, body))
-        return body
+        self.log_config.log(logging.DEBUG, "Response received", action=request.action, body=body)
+        if span is not None:
+            self.tracing.record_result(span, retries=attempt)
+        return self.finish_request(request, body, response_model, attempt, start)
+
+    def fetch_page(self, action, params, page, page_size, opts):
+        """
+        请求分页api的某一页
+        :return: 响应体dict
+        """
+        page_params = dict(params, page=page, page_size=page_size)
+        return self.process_common_request(CommonRequest(action, page_params, opts))
+
+    def iter_pages(self, action, params, page_size, opts, prefetch=True, first_page=None):
+        """
+        遍历分页api的所有页，逐个返回列表元素
+        prefetch为True时，消费当前页的同时在后台线程请求下一页
+        :param action: 分页api，见wulaisdk/pagination.py中的PAGINATED_ACTIONS
+        :param params: 除page及page_size外的请求参数
+        :param page_size:
+        :param opts:
+        :param prefetch:
+        :param first_page: 已获取的第一页响应体dict，不为None时不再请求第一页
+        :return: iterator
+        """
+        model = item_model(action) if (opts.get("response_format") or self.response_format) == "model" else None
+        opts = dict(opts, response_format="dict")
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            page = 1
+            body = first_page if first_page is not None else \
+                self.fetch_page(action, params, page, page_size, opts)
+            while True:
+                items = page_items(action, body)
+                has_next = bool(items) and has_next_page(body, items, page, page_size)
+                future = None
+                if has_next and executor is not None:
+                    future = executor.submit(self.fetch_page, action, params, page + 1, page_size, opts)
+                for item in items:
+                    yield self.parse_response(item, model)
+                if not has_next:
+                    return
+                page += 1
+                if future is not None:
+                    body = future.result()
+                else:
+                    body = self.fetch_page(action, params, page, page_size, opts)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+
+    def fetch_pages(self, action, params, pages, page_size, opts, concurrency=None, page_retries=1):
+        """
+        并发请求分页api的多个页，失败的页再整体重试page_retries轮
+        :return: 响应体列表，顺序与pages一致
+        """
+        common_requests = [CommonRequest(action, dict(params, page=page, page_size=page_size), opts) for page in pages]
+        results = self.execute_many_with_retries(common_requests, concurrency, page_retries)
+        return [result.result() for result in results]
+
+    def fetch_all_pages(self, action: str, page_size: int=100, concurrency: int=None, params: dict=None,
+                        page_retries: int=1, **kwargs):
+        """
+        并发获取分页api的所有页
+        请求第一页得到page_count后，其余页在连接池上并发请求，结果按页码顺序拼接。
+        响应体中没有page_count时逐页请求。
+        :param action: 分页api，如"/qa/knowledge-items/list"，见wulaisdk/pagination.py中的PAGINATED_ACTIONS
+        :param page_size: int (每页的数量)
+        :param concurrency: int (最大并发数，默认为pool_maxsize)
+        :param params: dict (除page及page_size外的请求参数)
+        :param page_retries: int (请求失败的页在所有页请求完成后的重试轮数)
+        :param kwargs:
+        :return: list (列表元素的响应类)
+        """
+        if action not in PAGINATED_ACTIONS:
+            raise ClientException("SDK_INVALID_PARAMS", "Unsupported paginated action: {}".format(action))
+        params = params or {}
+        opts = self.opts_create(kwargs)
+        model = item_model(action) if opts["response_format"] == "model" else None
+        opts["response_format"] = "dict"
+        body = self.fetch_page(action, params, 1, page_size, opts)
+        bodies = [body]
+        page_count = (body or {}).get("page_count")
+        if page_count is not None:
+            bodies += self.fetch_pages(action, params, range(2, page_count + 1), page_size, opts, concurrency,
+                                       page_retries)
+        else:
+            page = 1
+            while has_next_page(body, page_items(action, body), page, page_size):
+                page += 1
+                body = self.fetch_page(action, params, page, page_size, opts)
+                bodies.append(body)
+        return [self.parse_response(item, model) for body in bodies for item in page_items(action, body)]
+
+    def submit_chunks(self, action, key, chunks, opts, concurrency=None, chunk_retries=1):
+        """
+        每块作为一个请求并发提交，失败的块在所有块完成后单独重试chunk_retries轮
+        只重试retry_policy认为可安全重试的失败（非幂等api只重试服务端未处理的请求），避免重复写入
+        :param action: api
+        :param key: 请求参数中列表的key
+        :param chunks: 列表的分块
+        :param opts:
+        :param concurrency:
+        :param chunk_retries:
+        :return: List[BatchResult]，顺序与chunks一致
+        """
+        common_requests = [CommonRequest(action, {key: chunk}, opts) for chunk in chunks]
+        return self.execute_many_with_retries(common_requests, concurrency, chunk_retries, self.is_retryable_result)
+
+    def is_retryable_result(self, result):
+        return self.retry_policy.is_retryable(result.request, result.exception)
+
+    def execute_one(self, request, response_model=None):
+        try:
+            body = self.process_common_request(request, response_model)
+        except Exception as e:
+            return BatchResult(request, exception=e)
+        return BatchResult(request, body=body)
+
+    def execute_many(self, common_requests, concurrency: int=None, response_model=None):
+        """
+        并发执行多个CommonRequest
+        单个请求失败不会中断其他请求，结果顺序与传入顺序一致
+        :param common_requests: CommonRequest的可迭代对象
+        :param concurrency: 最大并发数，默认为pool_maxsize。超过pool_maxsize时，多出的连接用完即关闭，无法复用
+        :param response_model: 响应类，为None时返回原始dict
+        :return: List[BatchResult]
+        """
+        concurrency = concurrency or self.pool_maxsize
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(lambda request: self.execute_one(request, response_model), common_requests))
+
+    def execute_many_with_retries(self, common_requests, concurrency: int=None, rounds: int=1, should_retry=None):
+        """
+        并发执行多个CommonRequest，失败的请求在所有请求完成后再单独重试rounds轮
+        :param common_requests: CommonRequest列表
+        :param concurrency: 最大并发数，默认为pool_maxsize
+        :param rounds: 重试轮数
+        :param should_retry: should_retry(BatchResult) -> bool，为None时重试所有失败的请求
+        :return: List[BatchResult]，顺序与common_requests一致
+        """
+        results = self.execute_many(common_requests, concurrency)
+        for _ in range(rounds):
+            failed = self.failed_indexes(results, should_retry)
+            if not failed:
+                break
+            self.log_config.log(logging.DEBUG, "Retry failed requests", action=results[failed[0]].request.action,
+                                indexes=failed)
+            retried = self.execute_many([results[i].request for i in failed], concurrency)
+            for i, result in zip(failed, retried):
+                results[i] = result
+        return results
+
+    @staticmethod
+    def failed_indexes(results, should_retry=None):
+        return [i for i, result in enumerate(results)
+                if not result.ok and (should_retry is None or should_retry(result))]
 
     def opts_create(self, opt_config: dict):
         """
         基础配置，opt_config中主要包含：
         method【str】：请求方法，默认"POST"，暂时只支持"GET"和"POST"
-        retry【int】：重试次数，默认2
+        retry【int】：最大重试次数，默认使用retry_policy.max_retries
         timeout【int】：超时时间，默认global_timeout
+        response_format【str】：返回格式，"model"返回响应类，"dict"返回dict，"raw"返回响应的bytes，默认为client的response_format
         :param opt_config:
         :return:
         """
         opts = {
             "method": opt_config.get("method", "POST"),
-            "retry": opt_config.get("retry", 2),
-            "timeout": opt_config.get("timeout", self.global_timeout)
+            "retry": opt_config.get("retry"),
+            "timeout": opt_config.get("timeout", self.global_timeout),
+            "response_format": opt_config.get("response_format", self.response_format),
         }
         return opts
 
@@ -319,8 +861,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/user/user-attribute/pair/list", params, opts)
-        body = self.process_common_request(request)
-        return UserUserAttribute.from_dict(body)
+        return self.process_common_request(request, UserUserAttribute)
 
     def user_attributes(self, page: int, page_size: int, filter: dict=None, **kwargs):
         """
@@ -346,8 +887,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/user-attribute/list", params, opts)
-        body = self.process_common_request(request)
-        return UserAttributes.from_dict(body)
+        return self.process_common_request(request, UserAttributes)
 
     def get_user(self, user_id: str, **kwargs):
         """
@@ -363,8 +903,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/user/get", params, opts)
-        body = self.process_common_request(request)
-        return GetUser.from_dict(body)
+        return self.process_common_request(request, GetUser)
 
     def update_user(self, user_id: str, avatar_url: str=None, nickname: str=None, **kwargs):
         """
@@ -434,8 +973,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/bot-response", params, opts)
-        body = self.process_common_request(request)
-        return BotResponse.from_dict(body)
+        return self.process_common_request(request, BotResponse)
 
     def get_keyword_bot_response(self, user_id: str, msg_body: dict, extra: str="", **kwargs):
         """
@@ -484,8 +1022,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/bot-response/keyword", params, opts)
-        body = self.process_common_request(request)
-        return KeywordBotResponse.from_dict(body)
+        return self.process_common_request(request, KeywordBotResponse)
 
     def get_qa_bot_response(self, user_id: str, msg_body: dict, extra: str="", **kwargs):
         """
@@ -534,8 +1071,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/bot-response/qa", params, opts)
-        body = self.process_common_request(request)
-        return QABotResponse.from_dict(body)
+        return self.process_common_request(request, QABotResponse)
 
     def get_task_bot_response(self, user_id: str, msg_body: dict, extra: str="", **kwargs):
         """
@@ -584,8 +1120,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/bot-response/task", params, opts)
-        body = self.process_common_request(request)
-        return TaskBotResponse.from_dict(body)
+        return self.process_common_request(request, TaskBotResponse)
 
     def sync_message(self, user_id: str, msg_body: dict, msg_ts: str, extra: str="",
                      answer_id: int=None, bot: dict=None, **kwargs):
@@ -709,8 +1244,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/sync", params, opts)
-        body = self.process_common_request(request)
-        return SyncMessage.from_dict(body)
+        return self.process_common_request(request, SyncMessage)
 
     def receive_message(self, user_id: str, msg_body: dict, third_msg_id: str="", extra: str="", **kwargs):
         """
@@ -761,8 +1295,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/receive", params, opts)
-        body = self.process_common_request(request)
-        return ReceiveMessage.from_dict(body)
+        return self.process_common_request(request, ReceiveMessage)
 
     def get_message_history(self, user_id: str, num: int, direction: str="BACKWARD", msg_id: str="", **kwargs):
         """
@@ -785,8 +1318,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/history", params, opts)
-        body = self.process_common_request(request)
-        return HistoryMessage.from_dict(body)
+        return self.process_common_request(request, HistoryMessage)
 
     def send_message(self, user_id: str, msg_body: dict, quick_reply: list=None,
                      similar_response: list=None, extra: str=None, **kwargs):
@@ -916,8 +1448,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/send", params, opts)
-        body = self.process_common_request(request)
-        return SendMessage.from_dict(body)
+        return self.process_common_request(request, SendMessage)
 
     def get_user_suggestion(self, user_id: str, query: str, **kwargs):
         """
@@ -935,8 +1466,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/msg/user-suggestion/get", params, opts)
-        body = self.process_common_request(request)
-        return GetUserSuggestion.from_dict(body)
+        return self.process_common_request(request, GetUserSuggestion)
 
     # 知识点类
     def create_knowledge(self, knowledge_tag_knowledge: dict, **kwargs):
@@ -964,8 +1494,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/knowledge-tag-knowledge/create", params, opts)
-        body = self.process_common_request(request)
-        return KnowledgeCreate.from_dict(body)
+        return self.process_common_request(request, KnowledgeCreate)
 
     def update_knowledge(self, knowledge: dict, **kwargs):
         """
@@ -988,8 +1517,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/knowledge/update", params, opts)
-        body = self.process_common_request(request)
-        return KnowledgeUpdate.from_dict(body)
+        return self.process_common_request(request, KnowledgeUpdate)
 
     def delete_knowledge(self, knowledge_id: int, **kwargs):
         """
@@ -1033,8 +1561,24 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/knowledge-items/list", params, opts)
-        body = self.process_common_request(request)
-        return KnowledgeItems.from_dict(body)
+        return self.process_common_request(request, KnowledgeItems)
+
+    def iter_knowledge_items(self, page_size: int=100, knowledge_filter=None, prefetch: bool=True, **kwargs):
+        """
+        查询知识点列表（遍历所有页）
+        逐页请求并逐个返回知识点(KnowledgeItem)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param knowledge_filter: dict (过滤条件，同knowledge_items)
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {
+            "filter": knowledge_filter,
+        }
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/qa/knowledge-items/list", params, page_size, opts, prefetch)
 
     def batch_create_knowledge(self, knowledge_items: list, **kwargs):
         """
@@ -1092,8 +1636,48 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/knowledge-items/batch-create", params, opts)
-        body = self.process_common_request(request)
-        return KnowledgeBatchCreate.from_dict(body)
+        return self.process_common_request(request, KnowledgeBatchCreate)
+
+    def bulk_create_knowledge(self, knowledge_items, chunk_size: int=100, max_chunk_bytes: int=1024 * 1024,
+                              concurrency: int=None, chunk_retries: int=1, **kwargs):
+        """
+        分块批量添加知识点
+        knowledge_items按数量及大小切分后，每块调用一次批量添加知识点api，各块在连接池上并发提交，
+        失败的块单独重试，结果按输入顺序合并。
+        有块最终失败时抛出BulkPartialFailure，其中包含成功的块合并后的结果及失败的块，只需重新提交failed_items。
+        :param knowledge_items: 知识点的可迭代对象，格式见batch_create_knowledge
+        :param chunk_size: int (每块的最大知识点数)
+        :param max_chunk_bytes: int (每块请求体的最大字节数)
+        :param concurrency: int (最大并发数，默认为pool_maxsize)
+        :param chunk_retries: int (失败的块在所有块提交完成后的重试轮数)
+        :param kwargs:
+        :return: KnowledgeBatchCreate，knowledge_related_items与knowledge_items顺序一致
+        """
+        opts = self.opts_create(kwargs)
+        model = KnowledgeBatchCreate if opts["response_format"] == "model" else None
+        opts["response_format"] = "dict"
+        chunks = list(chunk_items(knowledge_items, chunk_size, max_chunk_bytes, self.codec))
+        results = self.submit_chunks("/qa/knowledge-items/batch-create", "knowledge_items", chunks, opts,
+                                     concurrency, chunk_retries)
+        return self.merge_chunk_results(results, "knowledge_items", "knowledge_related_items", model)
+
+    def merge_chunk_results(self, results, key, result_key, model=None):
+        """
+        合并submit_chunks的结果，有块失败时抛出BulkPartialFailure，保留成功的块的结果
+        :param results: List[BatchResult]
+        :param key: 请求参数中列表的key
+        :param result_key: 响应体中列表的key
+        :param model: 响应类
+        :return:
+        """
+        body = merge_list_bodies([result.body for result in results if result.ok], result_key)
+        failed = [(i, result.request.params[key], result.exception) for i, result in enumerate(results)
+                  if not result.ok]
+        if failed:
+            self.log_config.log(logging.ERROR, "Chunks failed", action=results[0].request.action,
+                                chunks=[i for i, _, _ in failed])
+            raise BulkPartialFailure(self.parse_response(body, model), failed)
+        return self.parse_response(body, model)
 
     def create_knowledge_tag(self, knowledge_tag: dict, **kwargs):
         """
@@ -1113,8 +1697,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/knowledge-tag/create", params, opts)
-        body = self.process_common_request(request)
-        return KnowledgeTagCreate.from_dict(body)
+        return self.process_common_request(request, KnowledgeTagCreate)
 
     def update_knowledge_tag(self, knowledge_tag: dict, **kwargs):
         """
@@ -1133,8 +1716,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/knowledge-tag/update", params, opts)
-        body = self.process_common_request(request)
-        return KnowledgeTagUpdate.from_dict(body)
+        return self.process_common_request(request, KnowledgeTagUpdate)
 
     def delete_knowledge_tag(self, knowledge_tag_id: int, **kwargs):
         """
@@ -1169,8 +1751,24 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/knowledge-tags/list", params, opts)
-        body = self.process_common_request(request)
-        return KnowledgeTags.from_dict(body)
+        return self.process_common_request(request, KnowledgeTags)
+
+    def iter_knowledge_tags(self, page_size: int=100, parent_k_tag_id: str=None, prefetch: bool=True, **kwargs):
+        """
+        查询知识点分类列表（遍历所有页）
+        逐页请求并逐个返回知识点分类(KnowledgeTag)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param parent_k_tag_id: str (父级知识点分类ID)
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {
+            "parent_k_tag_id": parent_k_tag_id,
+        }
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/qa/knowledge-tags/list", params, page_size, opts, prefetch)
 
     def create_similar_question(self, similar_question: dict, **kwargs):
         """
@@ -1191,8 +1789,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/similar-question/create", params, opts)
-        body = self.process_common_request(request)
-        return SimilarQuestionCreate.from_dict(body)
+        return self.process_common_request(request, SimilarQuestionCreate)
 
     def update_similar_question(self, similar_question: dict, **kwargs):
         """
@@ -1213,8 +1810,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/similar-question/update", params, opts)
-        body = self.process_common_request(request)
-        return SimilarQuestionUpdate.from_dict(body)
+        return self.process_common_request(request, SimilarQuestionUpdate)
 
     def delete_similar_question(self, similar_id: str, **kwargs):
         """
@@ -1252,8 +1848,27 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/similar-question/list", params, opts)
-        body = self.process_common_request(request)
-        return SimilarQuestions.from_dict(body)
+        return self.process_common_request(request, SimilarQuestions)
+
+    def iter_similar_questions(self, page_size: int=100, knowledge_id: str=None, similar_question_id: str=None,
+                               prefetch: bool=True, **kwargs):
+        """
+        查询相似问列表（遍历所有页）
+        逐页请求并逐个返回相似问(SimilarQuestion)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param knowledge_id: str (知识点id)
+        :param similar_question_id: str (相似问id)
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {
+            "knowledge_id": knowledge_id,
+            "similar_question_id": similar_question_id,
+        }
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/qa/similar-question/list", params, page_size, opts, prefetch)
 
     def create_user_attribute_group_items(self, user_attribute_group_item: dict, **kwargs):
         """
@@ -1290,8 +1905,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/user-attribute-group-items/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateUserAttributeGroup.from_dict(body)
+        return self.process_common_request(request, CreateUserAttributeGroup)
 
     def update_user_attribute_group_items(self, user_attribute_group_item: dict, **kwargs):
         """
@@ -1330,8 +1944,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/user-attribute-group-items/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateUserAttributeGroup.from_dict(body)
+        return self.process_common_request(request, UpdateUserAttributeGroup)
 
     def user_attribute_group_items(self, page: int, page_size: int, **kwargs):
         """
@@ -1351,8 +1964,21 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/user-attribute-group-items/list", params, opts)
-        body = self.process_common_request(request)
-        return UpdateUserAttributeGroupItems.from_dict(body)
+        return self.process_common_request(request, UpdateUserAttributeGroupItems)
+
+    def iter_user_attribute_group_items(self, page_size: int=100, prefetch: bool=True, **kwargs):
+        """
+        查询属性组列表（遍历所有页）
+        逐页请求并逐个返回属性组(UserAttributeGroupItem)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {}
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/qa/user-attribute-group-items/list", params, page_size, opts, prefetch)
 
     def create_user_attribute_group_answer(self, user_attribute_group_answer: dict, **kwargs):
         """
@@ -1382,8 +2008,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/user-attribute-group-answer/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateUserAttributeGroupAnswer.from_dict(body)
+        return self.process_common_request(request, CreateUserAttributeGroupAnswer)
 
     def update_user_attribute_group_answer(self, user_attribute_group_answer: dict, **kwargs):
         """
@@ -1412,8 +2037,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/user-attribute-group-answer/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateUserAttributeGroupAnswer.from_dict(body)
+        return self.process_common_request(request, UpdateUserAttributeGroupAnswer)
 
     def user_attribute_group_answers(self, page: int, page_size: int, kn_filter: dict=None, **kwargs):
         """
@@ -1439,8 +2063,25 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/qa/user-attribute-group-answers/list", params, opts)
-        body = self.process_common_request(request)
-        return UserAttributeGroupAnswers.from_dict(body)
+        return self.process_common_request(request, UserAttributeGroupAnswers)
+
+    def iter_user_attribute_group_answers(self, page_size: int=100, kn_filter: dict=None, prefetch: bool=True,
+                                          **kwargs):
+        """
+        查询属性组回复列表（遍历所有页）
+        逐页请求并逐个返回属性组回复(UserAttributeGroupAnswer)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param kn_filter: dict (过滤条件，同user_attribute_group_answers)
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {
+            "filter": kn_filter,
+        }
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/qa/user-attribute-group-answers/list", params, page_size, opts, prefetch)
 
     def delete_user_attribute_group_answer(self, uaga_id: dict, **kwargs):
         """
@@ -1516,8 +2157,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/stats/qa/satisfaction/daily/knowledge/list", params, opts)
-        body = self.process_common_request(request)
-        return StatsQASatisfactionKnowledgeDaily.from_dict(body)
+        return self.process_common_request(request, StatsQASatisfactionKnowledgeDaily)
 
     def stats_qa_recall_daily(self, start_date: str, end_date: str, **kwargs):
         """
@@ -1536,8 +2176,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/stats/qa/recall/daily/list", params, opts)
-        body = self.process_common_request(request)
-        return StatsQARecallDaily.from_dict(body)
+        return self.process_common_request(request, StatsQARecallDaily)
 
     def stats_qa_recall_daily_knowledges(
             self, start_date: str, end_date: str, page: int, page_size: int, **kwargs
@@ -1562,8 +2201,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/stats/qa/recall/daily/knowledge/list", params, opts)
-        body = self.process_common_request(request)
-        return StatasQARecallDailyKnowledges.from_dict(body)
+        return self.process_common_request(request, StatasQARecallDailyKnowledges)
 
     # 词库管理类
     def dictionary_entities(self, page: int, page_size: int, **kwargs):
@@ -1582,8 +2220,21 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/entity/list", params, opts)
-        body = self.process_common_request(request)
-        return DictionaryEntities.from_dict(body)
+        return self.process_common_request(request, DictionaryEntities)
+
+    def iter_dictionary_entities(self, page_size: int=100, prefetch: bool=True, **kwargs):
+        """
+        查询全部实体概要（遍历所有页）
+        逐页请求并逐个返回实体概要(Entity)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {}
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/dictionary/entity/list", params, page_size, opts, prefetch)
 
     def dictionary_terms(self, page: int, page_size: int, **kwargs):
         """
@@ -1601,8 +2252,21 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/term/list", params, opts)
-        body = self.process_common_request(request)
-        return DictionaryTerms.from_dict(body)
+        return self.process_common_request(request, DictionaryTerms)
+
+    def iter_dictionary_terms(self, page_size: int=100, prefetch: bool=True, **kwargs):
+        """
+        查询专有词汇列表（遍历所有页）
+        逐页请求并逐个返回专有词汇(TermItem)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {}
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/dictionary/term/list", params, page_size, opts, prefetch)
 
     def create_dictionary_term(self, term_item: dict, **kwargs):
         """
@@ -1625,8 +2289,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/term/create", params, opts)
-        body = self.process_common_request(request)
-        return DictionaryTerm.from_dict(body)
+        return self.process_common_request(request, DictionaryTerm)
 
     def update_dictionary_term(self, term_item: dict, **kwargs):
         """
@@ -1651,8 +2314,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/term/update", params, opts)
-        body = self.process_common_request(request)
-        return DictionaryTerm.from_dict(body)
+        return self.process_common_request(request, DictionaryTerm)
 
     def delete_dictionary_term(self, term_id: str, **kwargs):
         """
@@ -1685,8 +2347,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/entity/get", params, opts)
-        body = self.process_common_request(request)
-        return DictionaryEntity.from_dict(body)
+        return self.process_common_request(request, DictionaryEntity)
 
     def create_dictionary_entity_enumeration(self, enum_entity: dict, **kwargs):
         """
@@ -1707,8 +2368,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/entity/enumeration/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateEnumEntity.from_dict(body)
+        return self.process_common_request(request, CreateEnumEntity)
 
     def create_dictionary_entity_enumeration_value(self, entity_id: int, value: dict, **kwargs):
         """
@@ -1731,8 +2391,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/entity/enumeration/value/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateEnumEntityValue.from_dict(body)
+        return self.process_common_request(request, CreateEnumEntityValue)
 
     def delete_dictionary_entity_enumeration_value(self, entity_id: int, value: dict, **kwargs):
         """
@@ -1780,8 +2439,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/entity/intent/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateIntentEntity.from_dict(body)
+        return self.process_common_request(request, CreateIntentEntity)
 
     def create_dictionary_entity_intent_value(self, entity_id: int, synonyms: list, **kwargs):
         """
@@ -1799,8 +2457,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/dictionary/entity/intent/value/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateIntentEntityValue.from_dict(body)
+        return self.process_common_request(request, CreateIntentEntityValue)
 
     def delete_dictionary_entity_intent_value(self, entity_id: int, synonyms: list, **kwargs):
         """
@@ -1853,8 +2510,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/nlp/entities/extract", params, opts)
-        body = self.process_common_request(request)
-        return EntityExtract.from_dict(body)
+        return self.process_common_request(request, EntityExtract)
 
     def tokenize(self, query: str, **kwargs):
         """
@@ -1870,8 +2526,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/nlp/tokenize", params, opts)
-        body = self.process_common_request(request)
-        return Tokenize.from_dict(body)
+        return self.process_common_request(request, Tokenize)
 
     def mining_upload(self, queries: list, **kwargs):
         """
@@ -1889,8 +2544,50 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/nlp/sentence/mining/upload", params, opts)
-        body = self.process_common_request(request)
-        return MiningUpload.from_dict(body)
+        return self.process_common_request(request, MiningUpload)
+
+    def bulk_mining_upload(self, queries, chunk_size: int=1000, concurrency: int=None, checkpoint_path: str=None,
+                           dedupe: bool=True, chunk_retries: int=1, **kwargs):
+        """
+        分块上传待聚类语料
+        从可迭代对象（如按行读取的文件对象）中流式读取语料，本地去重后按chunk_size分块，每次并发提交concurrency块，
+        每批完成后将进度写入checkpoint_path。中断后以相同的输入及参数重新调用，会跳过已完成的块并继续累计结果。
+        发起一次聚类的语料总上限为5万条，超出部分会被服务端截取。
+        :param queries: 语料的可迭代对象，每条去掉首尾空白，空行会被忽略
+        :param chunk_size: int (每块的语料数，单次上传上限为1000)
+        :param concurrency: int (最大并发数，默认为pool_maxsize)
+        :param checkpoint_path: str (进度文件路径，为None时不保存进度)
+        :param dedupe: bool (是否在本地去重，本地去重的条数计入duplicated_count)
+        :param chunk_retries: int (失败的块在同批其他块完成后的重试轮数)
+        :param kwargs:
+        :return: MiningUpload，各块结果的累计
+        """
+        opts = self.opts_create(kwargs)
+        model = MiningUpload if opts["response_format"] == "model" else None
+        opts["response_format"] = "dict"
+        concurrency = concurrency or self.pool_maxsize
+        checkpoint = Checkpoint(checkpoint_path, chunk_size)
+        query_filter = QueryFilter(dedupe)
+        chunks = enumerate(chunk_items(query_filter.filter(queries), chunk_size))
+        for batch in batched(chunks, concurrency):
+            batch = [(index, chunk) for index, chunk in batch if not checkpoint.is_done(index)]
+            if not batch:
+                continue
+            results = self.submit_chunks("/nlp/sentence/mining/upload", "queries", [chunk for _, chunk in batch],
+                                         opts, concurrency, chunk_retries)
+            for (index, _), result in zip(batch, results):
+                if result.ok:
+                    checkpoint.mark_done(index, result.body or {})
+            checkpoint.save()
+            for result in results:
+                result.result()
+        return self.parse_response(self.mining_upload_counts(checkpoint, query_filter), model)
+
+    @staticmethod
+    def mining_upload_counts(checkpoint, query_filter):
+        counts = {key: checkpoint.counts.get(key, 0) for key in ("succeeded_count", "failed_count", "duplicated_count")}
+        counts["duplicated_count"] += query_filter.duplicated_count
+        return counts
 
     def mining_empty(self, **kwargs):
         """
@@ -1919,8 +2616,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/nlp/sentence/mining/execute", params, opts)
-        body = self.process_common_request(request)
-        return MiningExecute.from_dict(body)
+        return self.process_common_request(request, MiningExecute)
 
     def mining_result(self, page: int, page_size: int, **kwargs):
         """
@@ -1940,8 +2636,21 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/nlp/sentence/mining/result/get", params, opts)
-        body = self.process_common_request(request)
-        return MiningResult.from_dict(body)
+        return self.process_common_request(request, MiningResult)
+
+    def iter_mining_result(self, page_size: int=100, prefetch: bool=True, **kwargs):
+        """
+        获取聚类结果列表（遍历所有页）
+        逐页请求并逐个返回簇(Cluster)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {}
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/nlp/sentence/mining/result/get", params, page_size, opts, prefetch)
 
     def delete_mining_sentence(self, sentence_id: int, **kwargs):
         """
@@ -1972,8 +2681,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/list", params, opts)
-        body = self.process_common_request(request)
-        return Scenes.from_dict(body)
+        return self.process_common_request(request, Scenes)
 
     def create_scene(self, scene: dict, **kwargs):
         """
@@ -1998,8 +2706,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateScene.from_dict(body)
+        return self.process_common_request(request, CreateScene)
 
     def update_scene(self, scene: dict, **kwargs):
         """
@@ -2025,8 +2732,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateScene.from_dict(body)
+        return self.process_common_request(request, UpdateScene)
 
     def delete_scene(self, scene_id: int, **kwargs):
         """
@@ -2059,8 +2765,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/intent/list", params, opts)
-        body = self.process_common_request(request)
-        return Intents.from_dict(body)
+        return self.process_common_request(request, Intents)
 
     def create_intent(self, intent: dict, **kwargs):
         """
@@ -2083,8 +2788,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/intent/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateIntent.from_dict(body)
+        return self.process_common_request(request, CreateIntent)
 
     def update_intent(self, intent: dict, **kwargs):
         """
@@ -2106,8 +2810,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/intent/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateIntent.from_dict(body)
+        return self.process_common_request(request, UpdateIntent)
 
     def delete_intent(self, intent_id: int, **kwargs):
         """
@@ -2144,8 +2847,24 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/intent/trigger/list", params, opts)
-        body = self.process_common_request(request)
-        return IntentTriggers.from_dict(body)
+        return self.process_common_request(request, IntentTriggers)
+
+    def iter_intent_triggers(self, intent_id: int, page_size: int=100, prefetch: bool=True, **kwargs):
+        """
+        查询触发器列表（遍历所有页）
+        逐页请求并逐个返回触发器(IntentTrigger)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param intent_id: int(意图ID) >= 1
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {
+            "intent_id": intent_id,
+        }
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/scene/intent/trigger/list", params, page_size, opts, prefetch)
 
     def create_intent_trigger(self, intent_trigger: dict, **kwargs):
         """
@@ -2171,8 +2890,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/intent/trigger/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateIntentTrigger.from_dict(body)
+        return self.process_common_request(request, CreateIntentTrigger)
 
     def update_intent_trigger(self, intent_trigger: dict, **kwargs):
         """
@@ -2193,8 +2911,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/intent/trigger/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateIntentTrigger.from_dict(body)
+        return self.process_common_request(request, UpdateIntentTrigger)
 
     def delete_intent_trigger(self, intent_trigger_id: int, **kwargs):
         """
@@ -2231,8 +2948,24 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/slot/list", params, opts)
-        body = self.process_common_request(request)
-        return Slots.from_dict(body)
+        return self.process_common_request(request, Slots)
+
+    def iter_slots(self, scene_id: int, page_size: int=100, prefetch: bool=True, **kwargs):
+        """
+        查询词槽列表（遍历所有页）
+        逐页请求并逐个返回词槽(SlotSimple)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param scene_id: int (场景ID)
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {
+            "scene_id": scene_id,
+        }
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/scene/slot/list", params, page_size, opts, prefetch)
 
     def create_slot(self, slot: dict, **kwargs):
         """
@@ -2258,8 +2991,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/slot/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateSlot.from_dict(body)
+        return self.process_common_request(request, CreateSlot)
 
     def update_slot(self, slot: dict, **kwargs):
         """
@@ -2283,8 +3015,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/slot/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateSlot.from_dict(body)
+        return self.process_common_request(request, UpdateSlot)
 
     def get_slot(self, slot_id: int, **kwargs):
         """
@@ -2300,8 +3031,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/slot/get", params, opts)
-        body = self.process_common_request(request)
-        return GetSlot.from_dict(body)
+        return self.process_common_request(request, GetSlot)
 
     def delete_slot(self, slot_id: int, **kwargs):
         """
@@ -2334,8 +3064,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/slot/data-source/list", params, opts)
-        body = self.process_common_request(request)
-        return SlotDataSource.from_dict(body)
+        return self.process_common_request(request, SlotDataSource)
 
     def create_slot_data_source(self, data_source: dict, **kwargs):
         """
@@ -2358,8 +3087,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/slot/data-source/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateSlotDataSource.from_dict(body)
+        return self.process_common_request(request, CreateSlotDataSource)
 
     def delete_slot_data_source(self, slot_data_source_id: int, **kwargs):
         """
@@ -2392,8 +3120,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/inform-block/get", params, opts)
-        body = self.process_common_request(request)
-        return GetInformBlock.from_dict(body)
+        return self.process_common_request(request, GetInformBlock)
 
     def create_inform_block(self, block: dict, **kwargs):
         """
@@ -2419,8 +3146,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/inform-block/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateInformBlock.from_dict(body)
+        return self.process_common_request(request, CreateInformBlock)
 
     def update_inform_block(self, block: dict, **kwargs):
         """
@@ -2446,8 +3172,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/inform-block/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateInformBlock.from_dict(body)
+        return self.process_common_request(request, UpdateInformBlock)
 
     def request_block(self, block_id: int, **kwargs):
         """
@@ -2465,8 +3190,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/request-block/get", params, opts)
-        body = self.process_common_request(request)
-        return GetRequestBlock.from_dict(body)
+        return self.process_common_request(request, GetRequestBlock)
 
     def create_request_block(self, block: dict, **kwargs):
         """
@@ -2501,8 +3225,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/request-block/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateRequestBlock.from_dict(body)
+        return self.process_common_request(request, CreateRequestBlock)
 
     def update_request_block(self, block: dict, **kwargs):
         """
@@ -2537,8 +3260,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/request-block/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateRequestBlock.from_dict(body)
+        return self.process_common_request(request, UpdateRequestBlock)
 
     def create_block_response(self, response: dict, **kwargs):
         """
@@ -2589,8 +3311,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/response/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateResponse.from_dict(body)
+        return self.process_common_request(request, CreateResponse)
 
     def update_block_response(self, response: dict, **kwargs):
         """
@@ -2641,8 +3362,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/response/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateResponse.from_dict(body)
+        return self.process_common_request(request, UpdateResponse)
 
     def delete_block_response(self, response_id: int, **kwargs):
         """
@@ -2675,8 +3395,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/end-block/get", params, opts)
-        body = self.process_common_request(request)
-        return GetEndBlock.from_dict(body)
+        return self.process_common_request(request, GetEndBlock)
 
     def create_end_block(self, block: dict, **kwargs):
         """
@@ -2711,8 +3430,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/end-block/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateEndBlock.from_dict(body)
+        return self.process_common_request(request, CreateEndBlock)
 
     def update_end_block(self, block: dict, **kwargs):
         """
@@ -2745,8 +3463,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/end-block/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateEndBlock.from_dict(body)
+        return self.process_common_request(request, UpdateEndBlock)
 
     def blocks(self, intent_id: int, page: int, page_size: int, **kwargs):
         """
@@ -2766,8 +3483,24 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/list", params, opts)
-        body = self.process_common_request(request)
-        return Blocks.from_dict(body)
+        return self.process_common_request(request, Blocks)
+
+    def iter_blocks(self, intent_id: int, page_size: int=100, prefetch: bool=True, **kwargs):
+        """
+        查询单元列表（遍历所有页）
+        逐页请求并逐个返回单元(Block)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param intent_id: int (意图ID)
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {
+            "intent_id": intent_id,
+        }
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/scene/block/list", params, page_size, opts, prefetch)
 
     def create_block_relation(self, relation: dict, **kwargs):
         """
@@ -2821,8 +3554,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/block/relation/create", params, opts)
-        body = self.process_common_request(request)
-        return CreateBlockRelation.from_dict(body)
+        return self.process_common_request(request, CreateBlockRelation)
 
     def delete_block_relation(self, relation_id: int, **kwargs):
         """
@@ -2874,8 +3606,21 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/intent/trigger-learning/list", params, opts)
-        body = self.process_common_request(request)
-        return IntentTriggerLearning.from_dict(body)
+        return self.process_common_request(request, IntentTriggerLearning)
+
+    def iter_intent_trigger_learning(self, page_size: int=100, prefetch: bool=True, **kwargs):
+        """
+        查询待审核的消息列表（遍历所有页）
+        逐页请求并逐个返回用户消息(QueryItem)，消费当前页时在后台预取下一页，内存中最多保留两页数据。
+        :param page_size: int (每页的数量)
+        :param prefetch: bool (是否后台预取下一页)
+        :param kwargs:
+        :return: iterator
+        """
+        params = {}
+        opts = self.opts_create(kwargs)
+
+        return self.iter_pages("/scene/intent/trigger-learning/list", params, page_size, opts, prefetch)
 
     def delete_intent_trigger_learning(self, msg_id: int, **kwargs):
         """
@@ -2914,8 +3659,7 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/scene/intent/status/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateIntentStatus.from_dict(body)
+        return self.process_common_request(request, UpdateIntentStatus)
 
     # 配置类
     def update_config(self, app_config: dict, **kwargs):
@@ -2963,5 +3707,4 @@ class WulaiClient:
         opts = self.opts_create(kwargs)
 
         request = CommonRequest("/config/update", params, opts)
-        body = self.process_common_request(request)
-        return UpdateConfig.from_dict(body)
+        return self.process_common_request(request, UpdateConfig)
@@ -0,0 +1,54 @@
+import json
+
+from wulaisdk.exceptions import ClientException
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class JSONCodec:
+    """
+    请求体编码及响应体解码，基于标准库json
+    自定义codec实现dumps(obj) -> bytes及loads(bytes) -> obj即可
+    """
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def loads(self, data):
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    基于orjson，需要安装orjson：pip install wulaisdk[orjson]
+    """
+    name = "orjson"
+
+    def dumps(self, obj):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+def get_codec(codec):
+    """
+    :param codec: None、"json"、"orjson"、"fast"或codec对象。
+    None时由传输层自行编码（requests/httpx内置的json）；"orjson"及"fast"在未安装orjson时使用标准库json
+    :return:
+    """
+    if codec is None:
+        return None
+    if isinstance(codec, str):
+        if codec == "json":
+            return JSONCodec()
+        if codec in ("orjson", "fast"):
+            return OrjsonCodec() if orjson is not None else JSONCodec()
+        raise ClientException("SDK_INVALID_PARAMS", "Unsupported codec: {}".format(codec))
+    if not (hasattr(codec, "dumps") and hasattr(codec, "loads")):
+        raise ClientException("SDK_INVALID_PARAMS", "Codec must implement dumps and loads")
+    return codec
@@ -0,0 +1,42 @@
+import gzip
+import zlib
+
+from wulaisdk.actions import BULK_ACTIONS
+from wulaisdk.exceptions import ClientException
+
+ENCODINGS = ("gzip", "deflate")
+
+
+class CompressionPolicy:
+    """
+    请求体压缩
+    对指定api的POST请求体进行gzip或deflate压缩，并设置Content-Encoding，小于min_size的请求体不压缩
+    """
+
+    def __init__(self, actions=BULK_ACTIONS, min_size: int=64 * 1024, encoding: str="gzip", level: int=6):
+        """
+        :param actions: 压缩请求体的api，默认为batch_create_knowledge、mining_upload、create_dictionary_entity_enumeration
+        :param min_size: 请求体大于等于该字节数时才压缩
+        :param encoding: "gzip"或"deflate"
+        :param level: 压缩级别 1-9
+        """
+        if encoding not in ENCODINGS:
+            raise ClientException("SDK_INVALID_PARAMS", "Unsupported encoding: {}".format(encoding))
+        self.actions = frozenset(actions)
+        self.min_size = min_size
+        self.encoding = encoding
+        self.level = level
+
+    def applies(self, action):
+        return action in self.actions
+
+    def compress(self, body: bytes):
+        """
+        :param body: 编码后的请求体
+        :return: (请求体, Content-Encoding)，未压缩时Content-Encoding为None
+        """
+        if len(body) < self.min_size:
+            return body, None
+        if self.encoding == "gzip":
+            return gzip.compress(body, compresslevel=self.level), self.encoding
+        return zlib.compress(body, self.level), self.encoding
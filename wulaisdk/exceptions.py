@@ -23,6 +23,23 @@ class ServerException(Exception):
         return "{} {}: {}".format(self.http_status_code, self.error_code, self.error_msg)
 
 
+class BulkPartialFailure(ClientException):
+    """
+    分块批量提交时，部分块最终失败
+    result为成功的块合并后的结果，格式与正常返回值一致；failed为[(块序号, 块内的元素列表, 异常)]。
+    批量添加不是幂等操作，重新提交时只需提交failed_items，避免重复添加已成功的部分
+    """
+
+    def __init__(self, result, failed):
+        super().__init__("SDK_BULK_PARTIAL_FAILURE", ERR_INFO["SDK_BULK_PARTIAL_FAILURE"].format(len(failed)))
+        self.result = result
+        self.failed = failed
+
+    @property
+    def failed_items(self):
+        return [item for _, chunk, _ in self.failed for item in chunk]
+
+
 ERR_INFO = {
     "SDK_SERVER_UNREACHABLE": "无法连接服务器",
     "SDK_INVALID_REQUEST": "The request is not a valid CommonRequest.",
@@ -32,5 +49,11 @@ ERR_INFO = {
     "SDK_NOT_SUPPORT": "Invalid action, please check it",
     "SDK_HTTP_ERROR": "http request error",
     "SDK_METHOD_NOT_ALLOW": "Method not allow, please check it.",
-    "SDK_INVALID_API_VERSION": "Invalid api version, please check it."
+    "SDK_INVALID_API_VERSION": "Invalid api version, please check it.",
+    "SDK_DEPENDENCY_MISSING": "Optional dependency '{}' is not installed, please install it.",
+    "SDK_CIRCUIT_OPEN": "Circuit breaker is open, request is rejected: {}",
+    "SDK_MINING_TIMEOUT": "Mining is not finished in {} seconds",
+    "SDK_MINING_FAILED": "Mining is not completed, status: {}",
+    "SDK_BULK_PARTIAL_FAILURE": "{} chunks failed, results of the other chunks are kept in the exception",
+    "SDK_RATE_LIMITED": "Rate limit of {} requests per second exceeded"
 }
@@ -0,0 +1,87 @@
+import threading
+
+from collections import deque, defaultdict
+
+from wulaisdk.actions import BOT_RESPONSE_ACTIONS
+from wulaisdk.retry import RetryBudget
+
+
+class HedgePolicy:
+    """
+    对冲请求策略
+    首个请求在delay秒内未返回时，再发出一个相同的请求，先成功返回的结果生效，另一个请求被取消或丢弃。
+    delay默认取该action最近window_size次成功请求耗时的percentile分位数，样本数不足min_samples时不对冲。
+    对冲请求数受budget限制，默认最多约为请求数的10%，预算不足或令牌桶没有可用令牌时只等待首个请求。
+    """
+
+    def __init__(self, actions=BOT_RESPONSE_ACTIONS, percentile: float=0.95, delay: float=None,
+                 min_delay: float=0.05, min_samples: int=20, window_size: int=200, max_workers: int=None,
+                 max_primaries: int=None, budget: RetryBudget=None):
+        """
+        :param actions: 需要对冲的api，默认为获取机器人回复的4个api
+        :param percentile: 按耗时分位数计算对冲等待时间
+        :param delay: 固定的对冲等待时间（秒），设置后不再按分位数计算
+        :param min_delay: 对冲等待时间下限（秒）
+        :param min_samples: 按分位数计算时所需的最少样本数
+        :param window_size: 每个api保留的耗时样本数
+        :param max_workers: 同步client执行对冲请求的线程数，默认为pool_maxsize的2倍
+        :param max_primaries: 同步client执行首个请求的线程数，默认为pool_maxsize的2倍，已满时在调用方线程发出请求，不再对冲
+        :param budget: 对冲预算，默认为RetryBudget(ratio=0.1)
+        """
+        self.actions = frozenset(actions)
+        self.percentile = percentile
+        self.delay = delay
+        self.min_delay = min_delay
+        self.min_samples = min_samples
+        self.window_size = window_size
+        self.max_workers = max_workers
+        self.max_primaries = max_primaries
+        self.budget = budget if budget is not None else RetryBudget(ratio=0.1)
+        self._latencies = defaultdict(lambda: deque(maxlen=window_size))
+        self._stats = defaultdict(lambda: {"requests": 0, "hedged": 0, "hedge_wins": 0})
+        self._lock = threading.Lock()
+
+    def applies(self, action):
+        return action in self.actions
+
+    def get_delay(self, action):
+        """
+        :param action:
+        :return: 对冲等待时间（秒），为None时不对冲
+        """
+        self.budget.record_request()
+        with self._lock:
+            self._stats[action]["requests"] += 1
+            if self.delay is not None:
+                return max(self.delay, self.min_delay)
+            samples = self._latencies[action]
+            if len(samples) < self.min_samples:
+                return None
+            ordered = sorted(samples)
+        return max(ordered[int(self.percentile * (len(ordered) - 1))], self.min_delay)
+
+    def can_hedge(self):
+        """
+        预算充足时消耗一次对冲额度并返回True
+        :return:
+        """
+        return self.budget.can_retry()
+
+    def record_latency(self, action, seconds):
+        with self._lock:
+            self._latencies[action].append(seconds)
+
+    def record_hedge(self, action):
+        with self._lock:
+            self._stats[action]["hedged"] += 1
+
+    def record_hedge_win(self, action):
+        with self._lock:
+            self._stats[action]["hedge_wins"] += 1
+
+    def stats(self):
+        """
+        :return: {action: {"requests": 请求数, "hedged": 发出对冲请求数, "hedge_wins": 对冲请求先返回的次数}}
+        """
+        with self._lock:
+            return {action: dict(stat) for action, stat in self._stats.items()}
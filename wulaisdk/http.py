@@ -1,8 +1,46 @@
+import abc
+import threading
+
 import requests
 from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError, ConnectTimeout, RequestException
+
+from wulaisdk.exceptions import ClientException, ERR_INFO
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+
+class BaseTransport(abc.ABC):
+    """
+    传输层接口，WulaiClient通过send发起请求
+    自定义传输层需实现send，持有连接时还需实现close：
+    send返回的响应对象需提供status_code、json()、text及content
+    多个client（如WulaiClientRegistry）可共用一个传输层，send需要线程安全
+    """
+
+    @abc.abstractmethod
+    def send(self, method: str, url: str, data: dict, headers: dict, timeout: int=3, stream: bool=False):
+        """
+        :param method: "POST" or "GET"
+        :param url:
+        :param data: POST时作为json请求体（bytes时为已编码的请求体），GET时作为query参数
+        :param headers:
+        :param timeout:
+        :param stream: 是否延迟读取响应体
+        :return: response
+        """
+
+    def close(self):
+        pass
 
 
-class BaseRequest:
+class BaseRequest(BaseTransport):
+    """
+    默认传输层，基于requests.Session + HTTPAdapter连接池
+    """
 
     _session = None
 
@@ -13,6 +51,7 @@ class BaseRequest:
         self.pool_connections = pool_connections
         self.pool_maxsize = pool_maxsize
         self.max_retries = max_retries
+        self._lock = threading.Lock()
 
     def init_session(self):
         session = requests.Session()
@@ -24,14 +63,205 @@ class BaseRequest:
         session.mount(self.endpoint, adapter)
         self._session = session
 
+    def get_session(self):
+        """
+        首次使用时创建session，多个线程同时首次使用时只创建一个
+        """
+        session = self._session
+        if session is None:
+            with self._lock:
+                if self._session is None:
+                    self.init_session()
+                session = self._session
+        return session
+
     def post(self, url: str, data: dict, headers: dict, timeout: int=3, **kwargs):
-        if self._session is None:
-            self.init_session()
-        resp = self._session.post(url, json=data, headers=headers, timeout=timeout, **kwargs)
+        session = self.get_session()
+        if isinstance(data, bytes):
+            return session.post(url, data=data, headers=headers, timeout=timeout, **kwargs)
+        resp = session.post(url, json=data, headers=headers, timeout=timeout, **kwargs)
+        return resp
+
+    def get(self, url: str, params: dict, headers: dict, timeout: int=3, **kwargs):
+        session = self.get_session()
+        resp = session.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+        return resp
+
+    def send(self, method: str, url: str, data: dict, headers: dict, timeout: int=3, stream: bool=False):
+        if method == "GET":
+            return self.get(url, data, headers, timeout, stream=stream)
+        return self.post(url, data, headers, timeout, stream=stream)
+
+    def close(self):
+        with self._lock:
+            session, self._session = self._session, None
+        if session is not None:
+            session.close()
+
+
+def translate_httpx_error(e):
+    """
+    将httpx的异常转换为requests的异常，client层只需处理一套异常
+    :param e: httpx.HTTPError
+    :return:
+    """
+    if isinstance(e, httpx.ConnectTimeout):
+        return ConnectTimeout(str(e))
+    if isinstance(e, httpx.ConnectError):
+        return ConnectionError(str(e))
+    return RequestException(str(e))
+
+
+def check_httpx(http2=False):
+    if httpx is None:
+        raise ClientException("SDK_DEPENDENCY_MISSING", ERR_INFO["SDK_DEPENDENCY_MISSING"].format("httpx"))
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            raise ClientException("SDK_DEPENDENCY_MISSING", ERR_INFO["SDK_DEPENDENCY_MISSING"].format("h2"))
+
+
+class HTTP2Request(BaseTransport):
+    """
+    HTTP/2传输层，基于httpx.Client
+    同一域名下的请求复用一条TCP+TLS连接并发传输(multiplexing)，避免高并发时频繁的TLS握手。
+    需要安装httpx及h2：pip install wulaisdk[http2]
+    """
+
+    _client = None
+
+    def __init__(self, endpoint: str="https://openapi.wul.ai", method: str="POST",
+                 pool_connections: int=10, pool_maxsize: int=10, max_retries: int=3,
+                 keepalive_expiry: float=5.0):
+        self.endpoint = endpoint
+        self.method = method
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.keepalive_expiry = keepalive_expiry
+        self._lock = threading.Lock()
+
+    def init_client(self):
+        check_httpx(http2=True)
+        limits = httpx.Limits(
+            max_connections=self.pool_maxsize,
+            max_keepalive_connections=self.pool_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        transport = httpx.HTTPTransport(http2=True, limits=limits, retries=self.max_retries)
+        self._client = httpx.Client(transport=transport, limits=limits)
+
+    def get_client(self):
+        """
+        首次使用时创建client，多个线程同时首次使用时只创建一个
+        """
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self.init_client()
+                client = self._client
+        return client
+
+    def send(self, method: str, url: str, data: dict, headers: dict, timeout: int=3, stream: bool=False):
+        client = self.get_client()
+        if method == "GET":
+            req = client.build_request(method, url, params=data, headers=headers, timeout=timeout)
+        elif isinstance(data, bytes):
+            req = client.build_request(method, url, content=data, headers=headers, timeout=timeout)
+        else:
+            req = client.build_request(method, url, json=data, headers=headers, timeout=timeout)
+        try:
+            resp = client.send(req, stream=stream)
+        except httpx.HTTPError as e:
+            raise translate_httpx_error(e)
         return resp
 
+    def post(self, url: str, data: dict, headers: dict, timeout: int=3, **kwargs):
+        return self.send("POST", url, data, headers, timeout, **kwargs)
+
     def get(self, url: str, params: dict, headers: dict, timeout: int=3, **kwargs):
-        if self._session is None:
-            self.init_session()
-        resp = self._session.get(url, params=params, headers=headers, timeout=timeout, **kwargs)
+        return self.send("GET", url, params, headers, timeout, **kwargs)
+
+    def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+
+
+class AsyncBaseRequest:
+    """
+    基于httpx.AsyncClient的非阻塞连接池，供AsyncWulaiClient使用
+    接口与BaseTransport一致，send/close为协程
+    需要安装httpx：pip install wulaisdk[async]
+    """
+
+    _client = None
+
+    def __init__(self, endpoint: str="https://openapi.wul.ai", method: str="POST",
+                 pool_connections: int=100, pool_maxsize: int=100, max_retries: int=3,
+                 keepalive_expiry: float=5.0, http2: bool=False):
+        self.endpoint = endpoint
+        self.method = method
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_retries = max_retries
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self._lock = threading.Lock()
+
+    def init_client(self):
+        check_httpx(http2=self.http2)
+        limits = httpx.Limits(
+            max_connections=self.pool_maxsize,
+            max_keepalive_connections=self.pool_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+        transport = httpx.AsyncHTTPTransport(http2=self.http2, limits=limits, retries=self.max_retries)
+        self._client = httpx.AsyncClient(transport=transport, limits=limits)
+
+    def get_client(self):
+        """
+        首次使用时创建client，多个线程同时首次使用时只创建一个
+        """
+        client = self._client
+        if client is None:
+            with self._lock:
+                if self._client is None:
+                    self.init_client()
+                client = self._client
+        return client
+
+    async def send(self, method: str, url: str, data: dict, headers: dict, timeout: int=3, stream: bool=False):
+        client = self.get_client()
+        if method == "GET":
+            req = client.build_request(method, url, params=data, headers=headers, timeout=timeout)
+        elif isinstance(data, bytes):
+            req = client.build_request(method, url, content=data, headers=headers, timeout=timeout)
+        else:
+            req = client.build_request(method, url, json=data, headers=headers, timeout=timeout)
+        try:
+            resp = await client.send(req, stream=stream)
+        except httpx.HTTPError as e:
+            raise translate_httpx_error(e)
         return resp
+
+    async def post(self, url: str, data: dict, headers: dict, timeout: int=3, **kwargs):
+        return await self.send("POST", url, data, headers, timeout, **kwargs)
+
+    async def get(self, url: str, params: dict, headers: dict, timeout: int=3, **kwargs):
+        return await self.send("GET", url, params, headers, timeout, **kwargs)
+
+    async def close(self):
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            await client.aclose()
+
+
+TRANSPORTS = {
+    "requests": BaseRequest,
+    "http2": HTTP2Request,
+}
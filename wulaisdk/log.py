@@ -0,0 +1,191 @@
+import json
+import logging
+import threading
+
+
+DEFAULT_FORMAT = "%(asctime)s %(process)d %(thread)d %(levelname)s %(message)s"
+# 日志中请求参数、响应体等单个值的最大长度，超出部分截断
+PAYLOAD_LIMIT = 2048
+# 日志中需要隐藏的key，不区分大小写
+REDACTED_KEYS = frozenset(["secret", "password", "token", "authorization",
+                           "api-auth-pubkey", "api-auth-sign", "api-auth-nonce"])
+REDACTED = "***"
+
+
+class _Truncated(Exception):
+    pass
+
+
+class _Writer:
+    def __init__(self, limit):
+        self.parts = []
+        self.size = 0
+        self.limit = limit
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.limit is not None and self.size > self.limit:
+            raise _Truncated()
+
+
+def _write(value, writer):
+    if isinstance(value, dict):
+        writer.write("{")
+        for i, (k, v) in enumerate(value.items()):
+            if i:
+                writer.write(", ")
+            writer.write(repr(k))
+            writer.write(": ")
+            if isinstance(k, str) and k.lower() in REDACTED_KEYS:
+                writer.write(repr(REDACTED))
+            else:
+                _write(v, writer)
+        writer.write("}")
+    elif isinstance(value, (list, tuple)):
+        writer.write("[")
+        for i, v in enumerate(value):
+            if i:
+                writer.write(", ")
+            _write(v, writer)
+        writer.write("]")
+    elif isinstance(value, (bytes, bytearray)):
+        writer.write("<{} bytes>".format(len(value)))
+    elif isinstance(value, str) and writer.limit is not None and len(value) > writer.limit:
+        writer.write(repr(value[:writer.limit + 1]))
+    else:
+        writer.write(repr(value) if isinstance(value, str) else str(value))
+
+
+def render(value, limit=PAYLOAD_LIMIT):
+    """
+    将请求参数、响应体等转换为日志文本：敏感key的值替换为***，bytes只输出长度，超过limit时截断
+    超过limit后不再继续遍历，大payload的开销与limit成正比
+    :param value:
+    :param limit: 最大长度，为None时不截断
+    :return: str
+    """
+    writer = _Writer(limit)
+    try:
+        _write(value, writer)
+    except _Truncated:
+        return "".join(writer.parts)[:limit] + "...(truncated)"
+    return "".join(writer.parts)
+
+
+class Fields:
+    """
+    日志的键值对，只在日志实际输出时格式化为 key=value key=value
+    """
+    __slots__ = ("fields", "limit")
+
+    def __init__(self, fields, limit=PAYLOAD_LIMIT):
+        self.fields = fields
+        self.limit = limit
+
+    def __str__(self):
+        return " ".join("{}={}".format(k, render(v, self.limit)) for k, v in self.fields.items())
+
+
+def log_event(logger, level, message, payload_limit=PAYLOAD_LIMIT, **fields):
+    """
+    未启用该级别时直接返回，不做任何格式化
+    fields保存在record.wulai中，默认格式为"message key=value ..."，使用StructuredFormatter时输出json
+    :param logger:
+    :param level: logging.DEBUG等
+    :param message: 固定的事件描述
+    :param payload_limit: 单个值的最大长度
+    :param fields: 键值对
+    """
+    if not logger.isEnabledFor(level):
+        return
+    extra = {"wulai": fields, "wulai_event": message}
+    if fields:
+        logger.log(level, "%s. %s", message, Fields(fields, payload_limit), extra=extra)
+    else:
+        logger.log(level, message, extra=extra)
+
+
+class StructuredFormatter(logging.Formatter):
+    """
+    每条日志输出为一行json：{"time": ..., "level": ..., "logger": ..., "message": ..., 其他键值对}
+    键值对中的dict、list等按render转换为字符串（隐藏敏感信息并截断）
+        handler.setFormatter(StructuredFormatter())
+    """
+
+    def __init__(self, limit=PAYLOAD_LIMIT, **kwargs):
+        super().__init__(**kwargs)
+        self.limit = limit
+
+    def format(self, record):
+        fields = getattr(record, "wulai", None)
+        data = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": getattr(record, "wulai_event", None) or record.getMessage(),
+        }
+        for k, v in (fields or {}).items():
+            data[k] = v if isinstance(v, (int, float, bool, type(None))) else render(v, self.limit)
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+# 模块级logger，不添加handler也不修改级别，各client的logger以它为parent
+module_logger = logging.getLogger("wulaisdk.client")
+
+_default_handler = None
+_default_handler_lock = threading.Lock()
+
+
+def default_handler():
+    """
+    debug模式且未指定handler时使用的StreamHandler，所有client共用一个，首次使用时创建
+    """
+    global _default_handler
+    with _default_handler_lock:
+        if _default_handler is None:
+            _default_handler = logging.StreamHandler()
+            _default_handler.setFormatter(logging.Formatter(DEFAULT_FORMAT))
+        return _default_handler
+
+
+class LogConfig:
+    """
+    client的日志配置，每个client独立，互不影响
+    未指定logger时每个client使用独立的logger（不注册到logging全局，parent为wulaisdk.client）：
+        debug为False时级别为ERROR，没有handler，日志交给parent及应用的logging配置处理；
+        debug为True时级别为DEBUG，未指定handlers时使用共用的StreamHandler。
+    logger有自己的handler时不再向parent传递，避免重复输出。
+    """
+
+    def __init__(self, debug: bool=False, logger: logging.Logger=None, handlers=None,
+                 payload_limit: int=PAYLOAD_LIMIT):
+        """
+        :param debug: 是否输出DEBUG日志
+        :param logger: 自定义logger，级别及handler由调用方管理，debug及handlers不生效
+        :param handlers: logging.Handler列表
+        :param payload_limit: 日志中请求参数、响应体等单个值的最大长度，为None时不截断
+        """
+        self.debug = debug
+        self.payload_limit = payload_limit
+        self.owns_logger = logger is None
+        if logger is None:
+            logger = logging.Logger(module_logger.name, logging.DEBUG if debug else logging.ERROR)
+            logger.parent = module_logger
+            for handler in handlers or ([default_handler()] if debug else []):
+                logger.addHandler(handler)
+            logger.propagate = not logger.handlers
+        self.logger = logger
+
+    def add_handler(self, handler):
+        self.logger.addHandler(handler)
+        if self.owns_logger:
+            self.logger.propagate = False
+
+    def log(self, level, message, **fields):
+        """
+        见log_event
+        """
+        log_event(self.logger, level, message, self.payload_limit, **fields)
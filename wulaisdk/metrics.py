@@ -0,0 +1,229 @@
+import bisect
+import threading
+
+
+# 延迟直方图的桶上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class ResponseTiming:
+    """
+    单次http请求（每次重试、对冲各算一次）的耗时
+    requests及httpx不提供DNS、建连、TLS握手的单独耗时，以ttfb（发出请求到收到响应头）近似网络及服务端耗时
+    """
+    __slots__ = ("status_code", "ttfb", "duration", "decode_time", "response_size")
+
+    def __init__(self, status_code=None, ttfb=None, duration=0.0, decode_time=0.0, response_size=0):
+        """
+        :param status_code: http状态码，未收到响应时为None
+        :param ttfb: 收到响应头的耗时（秒），传输层不支持时为None
+        :param duration: 发出请求到读取完响应体的耗时（秒）
+        :param decode_time: 响应体json解码的耗时（秒）
+        :param response_size: 响应体字节数
+        """
+        self.status_code = status_code
+        self.ttfb = ttfb
+        self.duration = duration
+        self.decode_time = decode_time
+        self.response_size = response_size
+
+
+class MetricsHook:
+    """
+    请求指标的回调接口，默认实现均为空操作，按需覆盖
+    回调在请求线程（异步client为事件循环）中同步执行，应尽量轻量
+    """
+
+    def on_request_start(self, request):
+        """
+        一次api调用开始（缓存命中及合并的请求不会触发）
+        :param request: CommonRequest
+        """
+
+    def on_response(self, request, timing: ResponseTiming):
+        """
+        收到一次http响应
+        :param request: CommonRequest
+        :param timing: ResponseTiming
+        """
+
+    def on_retry(self, request, attempt: int, delay: float, exception):
+        """
+        :param request: CommonRequest
+        :param attempt: 第几次重试，从1开始
+        :param delay: 重试前的等待时间（秒）
+        :param exception: 上一次请求的异常
+        """
+
+    def on_error(self, request, exception, retries: int, duration: float):
+        """
+        一次api调用最终失败
+        :param request: CommonRequest
+        :param exception: ClientException或ServerException
+        :param retries: 重试次数
+        :param duration: 包含重试的总耗时（秒）
+        """
+
+    def on_request_end(self, request, retries: int, duration: float, parse_time: float):
+        """
+        一次api调用成功完成
+        :param request: CommonRequest
+        :param retries: 重试次数
+        :param duration: 包含重试及响应解析的总耗时（秒）
+        :param parse_time: 转换为响应类的耗时（秒）
+        """
+
+
+class Histogram:
+    """
+    固定桶的直方图，线程安全由调用方保证
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def quantile(self, q):
+        """
+        按桶内线性插值估算分位数
+        :param q: 0~1
+        :return: 无数据时返回None
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        for i, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.max
+                lower, upper = max(lower, self.min), min(upper, self.max)
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.max
+
+    def snapshot(self):
+        """
+        :return: dict，buckets为[(桶上界, 累计数量), ...]，最后一个桶上界为"+Inf"，可直接转换为prometheus格式
+        """
+        cumulative, buckets = 0, []
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.quantile(0.5),
+            "p90": self.quantile(0.9),
+            "p99": self.quantile(0.99),
+            "buckets": buckets,
+        }
+
+
+class ActionMetrics:
+    """
+    单个api的指标
+    """
+    LATENCIES = ("total", "ttfb", "http", "decode", "parse")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.requests = 0
+        self.responses = 0
+        self.retries = 0
+        self.errors = {}
+        self.status_codes = {}
+        self.response_bytes = 0
+        self.latencies = {name: Histogram(buckets) for name in self.LATENCIES}
+
+    def snapshot(self):
+        return {
+            "requests": self.requests,
+            "responses": self.responses,
+            "retries": self.retries,
+            "errors": dict(self.errors),
+            "status_codes": dict(self.status_codes),
+            "response_bytes": self.response_bytes,
+            "latency": {name: histogram.snapshot() for name, histogram in self.latencies.items()},
+        }
+
+
+class MetricsCollector(MetricsHook):
+    """
+    内存中按api统计的指标，线程安全
+    latency中各直方图：
+        total: 一次api调用包含重试及解析的总耗时
+        ttfb: 每次http请求收到响应头的耗时，即网络及服务端耗时
+        http: 每次http请求读取完响应体的耗时
+        decode: 响应体json解码耗时
+        parse: 转换为响应类的耗时
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._actions = {}
+        self._lock = threading.Lock()
+
+    def get_action(self, action):
+        metrics = self._actions.get(action)
+        if metrics is None:
+            metrics = self._actions.setdefault(action, ActionMetrics(self.buckets))
+        return metrics
+
+    def on_request_start(self, request):
+        with self._lock:
+            self.get_action(request.action).requests += 1
+
+    def on_response(self, request, timing):
+        with self._lock:
+            metrics = self.get_action(request.action)
+            metrics.responses += 1
+            metrics.response_bytes += timing.response_size
+            status_code = str(timing.status_code)
+            metrics.status_codes[status_code] = metrics.status_codes.get(status_code, 0) + 1
+            if timing.ttfb is not None:
+                metrics.latencies["ttfb"].observe(timing.ttfb)
+            metrics.latencies["http"].observe(timing.duration)
+            metrics.latencies["decode"].observe(timing.decode_time)
+
+    def on_retry(self, request, attempt, delay, exception):
+        with self._lock:
+            self.get_action(request.action).retries += 1
+
+    def on_error(self, request, exception, retries, duration):
+        error_code = getattr(exception, "error_code", type(exception).__name__)
+        with self._lock:
+            metrics = self.get_action(request.action)
+            metrics.errors[error_code] = metrics.errors.get(error_code, 0) + 1
+            metrics.latencies["total"].observe(duration)
+
+    def on_request_end(self, request, retries, duration, parse_time):
+        with self._lock:
+            metrics = self.get_action(request.action)
+            metrics.latencies["total"].observe(duration)
+            metrics.latencies["parse"].observe(parse_time)
+
+    def snapshot(self):
+        """
+        :return: {api: 指标dict}
+        """
+        with self._lock:
+            return {action: metrics.snapshot() for action, metrics in self._actions.items()}
+
+    def reset(self):
+        with self._lock:
+            self._actions = {}
@@ -0,0 +1,200 @@
+import time
+import random
+import asyncio
+
+from wulaisdk.exceptions import ClientException, ERR_INFO
+
+
+MINING_RESULT_ACTION = "/nlp/sentence/mining/result/get"
+MINING_IN_PROGRESS = "MINING_STATUS_IN_PROGRESS"
+MINING_COMPLETED = "MINING_STATUS_COMPLETED"
+
+
+class PollBackoff:
+    """
+    聚类状态的轮询间隔
+    第一次等待initial秒，之后每次乘以factor，不超过maximum，并加入±jitter比例的随机抖动。
+    聚类耗时随语料量增长，间隔逐渐变长可以减少长任务的无效请求，同时不拖慢短任务。
+    """
+
+    def __init__(self, initial: float=1, maximum: float=30, factor: float=1.5, jitter: float=0.1,
+                 timeout: float=None):
+        """
+        :param initial: 第一次轮询前的等待时间（秒）
+        :param maximum: 最大轮询间隔（秒）
+        :param factor: 间隔增长倍数
+        :param jitter: 随机抖动比例，多个任务同时轮询时错开请求
+        :param timeout: 最长等待时间（秒），为None时不限制
+        """
+        self.initial = initial
+        self.maximum = maximum
+        self.factor = factor
+        self.jitter = jitter
+        self.timeout = timeout
+
+    def delays(self):
+        """
+        :return: 轮询间隔的迭代器，超过timeout时结束
+        """
+        start = time.monotonic()
+        interval = self.initial
+        while True:
+            delay = interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+            if self.timeout is not None:
+                remaining = self.timeout - (time.monotonic() - start)
+                if remaining <= 0:
+                    return
+                delay = min(delay, remaining)
+            yield delay
+            interval = min(self.maximum, interval * self.factor)
+
+
+def cluster_sentences(cluster):
+    if isinstance(cluster, dict):
+        return cluster.get("sentences") or []
+    return cluster.sentences
+
+
+def mining_finished(body):
+    """
+    :param body: 聚类结果第一页的响应体
+    :return: 聚类完成时返回True，进行中返回False，失败或其他状态抛出ClientException
+    """
+    status = (body or {}).get("status")
+    if status == MINING_COMPLETED:
+        return True
+    if status == MINING_IN_PROGRESS:
+        return False
+    raise ClientException("SDK_MINING_FAILED", ERR_INFO["SDK_MINING_FAILED"].format(status))
+
+
+class MiningJob:
+    """
+    聚类任务：清空语料 -> 上传语料 -> 发起聚类 -> 轮询聚类状态 -> 逐页获取聚类结果
+        job = MiningJob(client, queries)
+        for cluster in job.run():
+            ...
+    """
+
+    def __init__(self, client, queries=None, page_size: int=100, empty: bool=True, poll: PollBackoff=None,
+                 prefetch: bool=True, **upload_kwargs):
+        """
+        :param client: WulaiClient
+        :param queries: 语料的可迭代对象，为None时不上传，直接使用已上传的语料
+        :param page_size: 获取聚类结果时每页的簇数量
+        :param empty: 上传前是否清空待聚类语料
+        :param poll: PollBackoff，默认PollBackoff()
+        :param prefetch: 获取聚类结果时是否预取下一页
+        :param upload_kwargs: bulk_mining_upload的参数，如chunk_size、concurrency、checkpoint_path
+        """
+        self.client = client
+        self.queries = queries
+        self.page_size = page_size
+        self.empty = empty
+        self.poll = poll or PollBackoff()
+        self.prefetch = prefetch
+        self.upload_kwargs = upload_kwargs
+        self.upload_result = None
+        self.first_page = None
+
+    def result_opts(self):
+        return dict(self.client.opts_create({}), response_format="dict")
+
+    def start(self):
+        """
+        清空、上传语料并发起聚类
+        :return: 上传结果，queries为None时返回None
+        """
+        if self.empty:
+            self.client.mining_empty()
+        if self.queries is not None:
+            self.upload_result = self.client.bulk_mining_upload(self.queries, **self.upload_kwargs)
+        self.client.mining_execute()
+        return self.upload_result
+
+    def check(self):
+        """
+        请求聚类结果的第一页
+        :return: 聚类完成时返回True，进行中返回False，失败或其他状态抛出ClientException
+        """
+        body = self.client.fetch_page(MINING_RESULT_ACTION, {}, 1, self.page_size, self.result_opts())
+        if not mining_finished(body):
+            return False
+        self.first_page = body
+        return True
+
+    def wait(self):
+        """
+        按poll轮询直到聚类完成，超过poll.timeout或聚类失败时抛出ClientException
+        """
+        for delay in self.poll.delays():
+            time.sleep(delay)
+            if self.check():
+                return
+        raise ClientException("SDK_MINING_TIMEOUT", ERR_INFO["SDK_MINING_TIMEOUT"].format(self.poll.timeout))
+
+    def iter_clusters(self):
+        """
+        逐页获取聚类结果，逐个返回簇(Cluster)，需在wait之后调用
+        :return: iterator
+        """
+        return self.client.iter_pages(MINING_RESULT_ACTION, {}, self.page_size, self.client.opts_create({}),
+                                      self.prefetch, first_page=self.first_page)
+
+    def iter_sentences(self):
+        """
+        :return: (簇, 句子)的迭代器
+        """
+        for cluster in self.iter_clusters():
+            for sentence in cluster_sentences(cluster):
+                yield cluster, sentence
+
+    def run(self):
+        """
+        执行整个聚类流程
+        :return: 簇(Cluster)的迭代器
+        """
+        self.start()
+        self.wait()
+        return self.iter_clusters()
+
+
+class AsyncMiningJob(MiningJob):
+    """
+    AsyncWulaiClient的聚类任务，轮询等待使用asyncio.sleep，不阻塞线程，可在一个事件循环中同时运行多个任务
+        job = AsyncMiningJob(async_client, queries)
+        async for cluster in await job.run():
+            ...
+    """
+
+    async def start(self):
+        if self.empty:
+            await self.client.mining_empty()
+        if self.queries is not None:
+            self.upload_result = await self.client.bulk_mining_upload(self.queries, **self.upload_kwargs)
+        await self.client.mining_execute()
+        return self.upload_result
+
+    async def check(self):
+        body = await self.client.fetch_page(MINING_RESULT_ACTION, {}, 1, self.page_size, self.result_opts())
+        if not mining_finished(body):
+            return False
+        self.first_page = body
+        return True
+
+    async def wait(self):
+        for delay in self.poll.delays():
+            await asyncio.sleep(delay)
+            if await self.check():
+                return
+        raise ClientException("SDK_MINING_TIMEOUT", ERR_INFO["SDK_MINING_TIMEOUT"].format(self.poll.timeout))
+
+    async def iter_sentences(self):
+        async for cluster in self.iter_clusters():
+            for sentence in cluster_sentences(cluster):
+                yield cluster, sentence
+
+    async def run(self):
+        await self.start()
+        await self.wait()
+        return self.iter_clusters()
@@ -0,0 +1,56 @@
+from wulaisdk.response.category_knowledge import KnowledgeItem, KnowledgeTag, SimilarQuestion, \
+    UserAttributeGroupItem, UserAttributeGroupAnswer
+from wulaisdk.response.category_dictionary import TermItem, Entity
+from wulaisdk.response.category_nlp import Cluster
+from wulaisdk.response.category_task import IntentTrigger, SlotSimple, Block, QueryItem
+
+
+# 分页api: (响应体中列表的key, 列表元素的响应类)
+PAGINATED_ACTIONS = {
+    "/qa/knowledge-items/list": ("knowledge_items", KnowledgeItem),
+    "/qa/knowledge-tags/list": ("knowledge_tags", KnowledgeTag),
+    "/qa/similar-question/list": ("similar_questions", SimilarQuestion),
+    "/qa/user-attribute-group-items/list": ("user_attribute_group_items", UserAttributeGroupItem),
+    "/qa/user-attribute-group-answers/list": ("user_attribute_group_answers", UserAttributeGroupAnswer),
+    "/dictionary/term/list": ("term_item", TermItem),
+    "/dictionary/entity/list": ("entities", Entity),
+    "/nlp/sentence/mining/result/get": ("clusters", Cluster),
+    "/scene/intent/trigger/list": ("intent_triggers", IntentTrigger),
+    "/scene/slot/list": ("slots", SlotSimple),
+    "/scene/block/list": ("blocks", Block),
+    "/scene/intent/trigger-learning/list": ("query_items", QueryItem),
+}
+
+
+def page_items(action, body):
+    """
+    :param action: 分页api
+    :param body: 一页的响应体
+    :return: 该页的原始列表
+    """
+    items_key, _ = PAGINATED_ACTIONS[action]
+    return (body or {}).get(items_key) or []
+
+
+def item_model(action):
+    """
+    :param action: 分页api
+    :return: 列表元素的响应类
+    """
+    _, model = PAGINATED_ACTIONS[action]
+    return model
+
+
+def has_next_page(body, items, page, page_size):
+    """
+    响应体中有page_count时以page_count为准，否则以当前页是否已满判断
+    :param body: 当前页的响应体
+    :param items: 当前页的列表
+    :param page: 当前页码
+    :param page_size:
+    :return:
+    """
+    page_count = (body or {}).get("page_count")
+    if page_count is not None:
+        return page < page_count
+    return len(items) >= page_size > 0
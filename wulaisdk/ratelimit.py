@@ -0,0 +1,75 @@
+import time
+import asyncio
+import threading
+
+from wulaisdk.exceptions import ClientException, ERR_INFO
+
+
+class TokenBucket:
+    """
+    令牌桶限流，线程安全
+    每秒补充rate个令牌，最多累积burst个。每次http请求（包括重试）消耗一个令牌，
+    令牌不足时按预约顺序等待，等待时间超过timeout时抛出SDK_RATE_LIMITED。
+    """
+
+    def __init__(self, rate: float, burst: int=None, timeout: float=None):
+        """
+        :param rate: 每秒请求数
+        :param burst: 桶容量，默认为max(1, rate)
+        :param timeout: 最长等待时间（秒），为None时一直等待，为0时令牌不足立即抛出异常
+        """
+        if rate <= 0:
+            raise ClientException("SDK_INVALID_PARAMS", "rate must be positive")
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1, rate)
+        self.timeout = timeout
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self):
+        """
+        预约一个令牌
+        :return: 需要等待的时间（秒）
+        """
+        with self._lock:
+            self._refill()
+            wait = 0.0 if self._tokens >= 1 else (1 - self._tokens) / self.rate
+            if self.timeout is not None and wait > self.timeout:
+                raise ClientException("SDK_RATE_LIMITED", ERR_INFO["SDK_RATE_LIMITED"].format(self.rate))
+            self._tokens -= 1
+            return wait
+
+    def try_acquire(self):
+        """
+        不等待，有可用令牌时消耗一个并返回True，令牌不足时返回False
+        :return:
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    def is_full(self):
+        """
+        :return: 令牌是否已补满，补满的令牌桶与新建的等价
+        """
+        with self._lock:
+            return self._tokens + (time.monotonic() - self._updated) * self.rate >= self.burst
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
@@ -0,0 +1,251 @@
+import time
+import threading
+
+from collections import OrderedDict
+
+from wulaisdk.client import WulaiClient
+from wulaisdk.ratelimit import TokenBucket
+from wulaisdk.exceptions import ClientException
+
+
+# 按请求参数缓存或合并请求，不区分pubkey，不能在租户之间共用
+TENANT_SCOPED_OPTIONS = ("response_cache", "single_flight")
+
+
+class WulaiClientRegistry:
+    """
+    多租户client注册表，每个租户（机器人）一组pubkey/secret
+    所有租户的client共用一个连接池，client在首次get时创建；
+    超过max_clients或空闲超过idle_timeout的client按LRU淘汰，淘汰时不关闭共用的连接池，
+    也不释放client本身，其他线程仍在使用的client可以继续使用，不再被引用后自动回收。
+    每个租户的限流令牌桶与client分开保存，client被淘汰后重新创建时沿用原来的令牌桶。
+    获取密钥及创建client时不持有注册表的锁，只阻塞同一个租户的get。
+        registry = WulaiClientRegistry(credentials=load_credentials, rate=20)
+        resp = registry.get(bot_id).get_bot_response(user_id, msg_body)
+    """
+
+    def __init__(self, credentials=None, endpoint: str="https://openapi.wul.ai", api_version: str="v2",
+                 pool=None, pool_connections: int=10, pool_maxsize: int=100, max_retries: int=3,
+                 transport: str="requests", max_clients: int=1000, idle_timeout: float=None, rate: float=None,
+                 burst: int=None, rate_limit_timeout: float=None, client_class=WulaiClient, **client_kwargs):
+        """
+        :param credentials: credentials(tenant) -> (pubkey, secret)，未register的租户通过它获取密钥，为None时只能使用已register的租户
+        :param endpoint:
+        :param api_version:
+        :param pool: 共用的连接池，默认按client_class创建
+        :param pool_connections:
+        :param pool_maxsize: 共用连接池的最大连接数
+        :param max_retries:
+        :param transport: "requests"或"http2"，传入pool时不生效
+        :param max_clients: 最多保留的client数量
+        :param idle_timeout: client空闲多久（秒）后淘汰，为None时只按max_clients淘汰
+        :param rate: 每个租户每秒的http请求数，为None时不限流，可在register时单独设置
+        :param burst: 令牌桶容量，见TokenBucket
+        :param rate_limit_timeout: 令牌不足时的最长等待时间，见TokenBucket
+        :param client_class: WulaiClient或AsyncWulaiClient
+        :param client_kwargs: 创建client的其他参数，如retry_policy、metrics，所有租户共用
+        """
+        for option in TENANT_SCOPED_OPTIONS:
+            if client_kwargs.get(option) is not None:
+                raise ClientException("SDK_INVALID_PARAMS", "{} can not be shared between tenants".format(option))
+        self.credentials = credentials
+        self.endpoint = endpoint
+        self.api_version = api_version
+        self.pool_maxsize = pool_maxsize
+        self.max_clients = max_clients
+        self.idle_timeout = idle_timeout
+        self.rate = rate
+        self.burst = burst
+        self.rate_limit_timeout = rate_limit_timeout
+        self.client_class = client_class
+        self.client_kwargs = client_kwargs
+        self.pool = pool or client_class.connection_pool_init(endpoint, pool_connections, pool_maxsize,
+                                                              max_retries, transport)
+        self.created = 0
+        self.evicted = 0
+        self._tenants = {}
+        self._clients = OrderedDict()
+        self._last_used = {}
+        self._limiters = {}
+        self._creating = {}
+        self._lock = threading.Lock()
+
+    def register(self, tenant, pubkey: str, secret: str, rate: float=None, burst: int=None):
+        """
+        注册租户，client在首次get时创建。已有client时会被替换，限流按新的rate重新开始
+        :param tenant: 租户标识，如机器人id
+        :param pubkey:
+        :param secret:
+        :param rate: 该租户每秒的http请求数，为None时使用registry的rate
+        :param burst:
+        :return:
+        """
+        with self._lock:
+            self._tenants[tenant] = (pubkey, secret, rate, burst)
+            self._limiters.pop(tenant, None)
+            self.remove(tenant)
+
+    def unregister(self, tenant):
+        with self._lock:
+            self._tenants.pop(tenant, None)
+            self._limiters.pop(tenant, None)
+            self.remove(tenant)
+
+    def make_rate_limiter(self, rate=None, burst=None):
+        rate = rate if rate is not None else self.rate
+        if rate is None:
+            return None
+        return TokenBucket(rate, burst if burst is not None else self.burst, self.rate_limit_timeout)
+
+    def get_rate_limiter(self, tenant, rate=None, burst=None):
+        """
+        租户的令牌桶，不随client淘汰而重置，调用时需持有self._lock
+        """
+        if tenant not in self._limiters:
+            self._limiters[tenant] = self.make_rate_limiter(rate, burst)
+        return self._limiters[tenant]
+
+    def get_credentials(self, tenant):
+        """
+        :return: (pubkey, secret, rate, burst)
+        """
+        with self._lock:
+            registered = self._tenants.get(tenant)
+        if registered is not None:
+            return registered
+        if self.credentials is None:
+            raise ClientException("SDK_INVALID_PARAMS", "Unknown tenant: {}".format(tenant))
+        pubkey, secret = self.credentials(tenant)
+        return pubkey, secret, None, None
+
+    def create_client(self, tenant):
+        """
+        获取密钥并创建client，不持有self._lock
+        """
+        pubkey, secret, rate, burst = self.get_credentials(tenant)
+        with self._lock:
+            rate_limiter = self.get_rate_limiter(tenant, rate, burst)
+        return self.client_class(pubkey, secret, endpoint=self.endpoint, api_version=self.api_version,
+                                 pool=self.pool, pool_maxsize=self.pool_maxsize, rate_limiter=rate_limiter,
+                                 **self.client_kwargs)
+
+    def lookup(self, tenant, now):
+        """
+        调用时需持有self._lock
+        """
+        client = self._clients.get(tenant)
+        if client is not None:
+            self._clients.move_to_end(tenant)
+            self._last_used[tenant] = now
+        return client
+
+    def get(self, tenant):
+        """
+        :param tenant: 租户标识
+        :return: 该租户的client，不要调用其close，以免关闭共用的连接池
+        """
+        with self._lock:
+            now = time.monotonic()
+            client = self.lookup(tenant, now)
+            self.evict_expired(now)
+            if client is not None:
+                return client
+            creating = self._creating.setdefault(tenant, threading.Lock())
+        # 同一个租户只创建一次，其他租户不受影响
+        with creating:
+            with self._lock:
+                client = self.lookup(tenant, time.monotonic())
+            if client is not None:
+                return client
+            try:
+                client = self.create_client(tenant)
+                with self._lock:
+                    now = time.monotonic()
+                    self._clients[tenant] = client
+                    self._last_used[tenant] = now
+                    self.created += 1
+                    self.evict_expired(now)
+            finally:
+                with self._lock:
+                    if self._creating.get(tenant) is creating:
+                        del self._creating[tenant]
+            return client
+
+    def evict_expired(self, now):
+        """
+        淘汰超出max_clients及空闲超过idle_timeout的client，从最久未使用的开始，调用时需持有self._lock
+        """
+        while len(self._clients) > self.max_clients:
+            self.remove(next(iter(self._clients)), evicted=True)
+        if self.idle_timeout is not None:
+            while self._clients:
+                tenant = next(iter(self._clients))
+                if now - self._last_used[tenant] <= self.idle_timeout:
+                    break
+                self.remove(tenant, evicted=True)
+        if len(self._limiters) > 2 * self.max_clients:
+            self.prune_rate_limiters()
+
+    def prune_rate_limiters(self):
+        """
+        删除已没有client且令牌已补满的令牌桶，再次创建的令牌桶与之等价
+        """
+        for tenant, limiter in list(self._limiters.items()):
+            if tenant not in self._clients and (limiter is None or limiter.is_full()):
+                del self._limiters[tenant]
+
+    def remove(self, tenant, evicted=False):
+        """
+        只从注册表中移除，不释放client，其他线程可能仍在使用
+        """
+        client = self._clients.pop(tenant, None)
+        self._last_used.pop(tenant, None)
+        if client is not None and evicted:
+            self.evicted += 1
+
+    def __contains__(self, tenant):
+        return tenant in self._clients
+
+    def __len__(self):
+        return len(self._clients)
+
+    def stats(self):
+        """
+        :return: {"clients": 当前client数, "created": 累计创建数, "evicted": 累计淘汰数}
+        """
+        with self._lock:
+            return {"clients": len(self._clients), "created": self.created, "evicted": self.evicted}
+
+    def release_clients(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            self._last_used.clear()
+        for client in clients:
+            client.release()
+
+    def close(self):
+        """
+        释放所有client并关闭共用的连接池
+        """
+        self.release_clients()
+        self.pool.close()
+
+    async def aclose(self):
+        """
+        client_class为AsyncWulaiClient时使用
+        """
+        self.release_clients()
+        await self.pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
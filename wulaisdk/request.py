@@ -12,11 +12,14 @@ class CommonRequest:
         self.path = ""
         self.headers = {
             "Accept": "application/json",
+            "Accept-Encoding": "gzip, deflate",
             "Content-Type": "application/json"
         }
         self.action = action
         self.params = params
         self.opts = opts
+        # 启用响应缓存时，发出请求前确定的缓存key
+        self.cache_key = None
         self.check()
 
     def check(self):
@@ -44,3 +47,13 @@ class CommonRequest:
 
     def update_headers(self, headers):
         self.headers.update(headers)
+
+    def copy(self):
+        """
+        复制请求，headers独立，params及opts共用
+        :return:
+        """
+        request = CommonRequest(self.action, self.params, self.opts)
+        request.path = self.path
+        request.set_headers(dict(self.headers))
+        return request
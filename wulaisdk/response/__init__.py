@@ -1,14 +1,105 @@
 import six
+import typing
 import inspect
 
 
+def parse_field(field, value, lazy=False):
+    """
+    按字段类型转换原始值
+    :param field: (响应类, 是否为列表)，响应类为None时直接返回原始值
+    :param value:
+    :param lazy:
+    :return:
+    """
+    model, is_list = field
+    if model is None or value is None:
+        return value
+    if is_list:
+        return [model.from_dict(v, lazy) for v in value]
+    return model.from_dict(value, lazy)
+
+
+def compile_fields(cls):
+    """
+    由类型注解得到字段及子对象的响应类
+    :return: {字段名: (响应类, 是否为列表)}
+    """
+    fields = {}
+    for name, hint in typing.get_type_hints(cls).items():
+        is_list = getattr(hint, "__origin__", None) in (list, typing.List)
+        if is_list:
+            hint = hint.__args__[0]
+        model = hint if isinstance(hint, type) and issubclass(hint, BaseModel) else None
+        fields[name] = (model, is_list)
+    return fields
+
+
 class BaseModel:
+    # 空__slots__使生成的__slots__子类（见wulaisdk/response/slots.py）不带__dict__，普通子类不受影响
+    __slots__ = ()
+
+    # __init__中除赋值及子对象from_dict外还有其他逻辑的类需设为False，lazy模式下按原方式解析
+    lazy_parsing = True
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        类创建时生成解析计划，from_dict不再每次调用inspect.signature
+        _parameters: __init__接受的参数名
+        _accepts_any: __init__只有**kwargs，原始dict整体传入
+        _fields: 字段及子对象的响应类
+        _lazy: 是否支持lazy模式
+        """
+        super().__init_subclass__(**kwargs)
+        parameters = inspect.signature(cls).parameters
+        cls._parameters = frozenset(parameters)
+        cls._accepts_any = set(parameters) == {"kwargs"}
+        cls._fields = compile_fields(cls)
+        cls._lazy = cls.lazy_parsing and bool(parameters) and all(
+            p.kind != p.VAR_KEYWORD for p in parameters.values())
+
+    @classmethod
+    def model_fields(cls):
+        """
+        :return: {字段名: (响应类, 是否为列表)}
+        """
+        return cls._fields
+
+    @classmethod
+    def supports_lazy(cls):
+        return cls._lazy
+
+    def __getattr__(self, name):
+        # 只在正常属性查找失败时调用，lazy模式下首次访问字段时解析并缓存
+        raw = self.__dict__.get("_raw")
+        if raw is None or name not in raw or name not in type(self)._fields:
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+        value = parse_field(type(self)._fields[name], raw[name], lazy=True)
+        self.__dict__[name] = value
+        return value
+
+    def materialize(self):
+        """
+        lazy模式下解析所有字段
+        :return:
+        """
+        raw = self.__dict__.get("_raw")
+        if raw is not None:
+            for name in type(self)._fields:
+                if name in raw:
+                    getattr(self, name)
+
+    def attributes(self):
+        """
+        :return: 已赋值的属性名
+        """
+        return [attr for attr, _ in six.iteritems(self.__dict__) if attr != "_raw"]
 
     def to_dict(self):
         """Returns the model properties as a dict"""
         result = {}
+        self.materialize()
 
-        for attr, _ in six.iteritems(self.__dict__):
+        for attr in self.attributes():
             value = getattr(self, attr)
             if isinstance(value, list):
                 result[attr] = list(map(
@@ -29,11 +120,19 @@ class BaseModel:
         return result
 
     @classmethod
-    def from_dict(cls, env):
+    def from_dict(cls, env, lazy=False):
+        """
+        :param env: dict
+        :param lazy: 为True时只保存原始dict，字段在首次访问时解析
+        :return:
+        """
         if not isinstance(env, dict):
             return env
-        parameters = inspect.signature(cls).parameters
-        return cls(**{
-            k: v for k, v in env.items()
-            if k in parameters or set(parameters.keys()) == {'kwargs'}
-        })
+        if lazy and cls._lazy:
+            model = cls.__new__(cls)
+            model._raw = env
+            return model
+        if cls._accepts_any:
+            return cls(**env)
+        parameters = cls._parameters
+        return cls(**{k: v for k, v in env.items() if k in parameters})
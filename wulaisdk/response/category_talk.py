@@ -48,6 +48,8 @@ class Msg(BaseModel):
     """
     返回的单条消息
     """
+    lazy_parsing = False
+
     direction: str
     sender_info: SenderInfo
     msg_type: str
@@ -0,0 +1,96 @@
+"""
+__slots__响应类
+slotted(cls)按响应类的类型注解生成对应的__slots__类，实例不带__dict__，适合在内存中保存大量消息记录、聚类结果等。
+生成的类与原响应类同名，字段、from_dict及to_dict用法一致，但不是原响应类的子类，也不支持lazy模式。
+__init__只接受**kwargs的响应类（如MsgBody、Bot）属性不固定，保持原响应类。
+"""
+import functools
+
+from wulaisdk.response import BaseModel
+
+_slotted = {}
+
+
+class SlotsModel(BaseModel):
+    """
+    slotted生成的响应类的基类
+    """
+    __slots__ = ()
+    lazy_parsing = False
+
+    def __init__(self, **kwargs) -> None:
+        for name, field in type(self)._fields.items():
+            if name not in kwargs:
+                raise TypeError("{}() missing required argument: '{}'".format(type(self).__name__, name))
+            setattr(self, name, parse_slotted_field(field, kwargs[name]))
+
+    def __getattr__(self, name):
+        raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
+    def materialize(self):
+        pass
+
+    def attributes(self):
+        return [name for name in type(self).__slots__ if hasattr(self, name)]
+
+
+def parse_slotted_field(field, value):
+    model, is_list = field
+    if model is None or value is None:
+        return value
+    if is_list:
+        return [to_slotted(model, v) for v in value]
+    return to_slotted(model, value)
+
+
+def to_slotted(model, value):
+    """
+    :param model: slotted生成的响应类
+    :param value: dict或原响应类实例
+    :return:
+    """
+    if isinstance(value, BaseModel) and not isinstance(value, model):
+        value = value.to_dict()
+    return model.from_dict(value)
+
+
+def wrap_init(init):
+    """
+    __init__中有其他逻辑的响应类（如Msg）沿用原__init__，子对象再转换为__slots__类
+    """
+    @functools.wraps(init)
+    def __init__(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        for name, field in type(self)._fields.items():
+            if field[0] is not None and hasattr(self, name):
+                setattr(self, name, parse_slotted_field(field, getattr(self, name)))
+    return __init__
+
+
+def slotted(cls):
+    """
+    生成cls对应的__slots__响应类，结果按类缓存
+    :param cls: BaseModel子类
+    :return:
+    """
+    if cls in _slotted:
+        return _slotted[cls]
+    if cls._accepts_any or issubclass(cls, SlotsModel):
+        _slotted[cls] = cls
+        return cls
+    fields = {
+        name: (slotted(model) if model is not None else None, is_list)
+        for name, (model, is_list) in cls._fields.items()
+    }
+    namespace = {
+        "__slots__": tuple(fields),
+        "__module__": cls.__module__,
+        "__qualname__": cls.__qualname__,
+        "__doc__": cls.__doc__,
+    }
+    if not cls._lazy:
+        namespace["__init__"] = wrap_init(cls.__init__)
+    model = type(cls.__name__, (SlotsModel,), namespace)
+    model._fields = fields
+    _slotted[cls] = model
+    return model
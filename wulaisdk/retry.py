@@ -0,0 +1,132 @@
+import time
+import random
+import threading
+
+from collections import deque
+
+from wulaisdk.actions import NON_IDEMPOTENT_ACTIONS
+from wulaisdk.exceptions import ClientException, ServerException
+
+
+class RetryBudget:
+    """
+    client级别的重试预算
+    统计最近ttl秒内的请求数，重试次数不超过 min_retries_per_second * ttl + 请求数 * ratio。
+    后端大面积异常时，重试会被预算拦截，避免重试风暴放大流量。
+    """
+
+    def __init__(self, ratio: float=0.2, min_retries_per_second: float=1, ttl: int=10):
+        """
+        :param ratio: 可用于重试的请求比例
+        :param min_retries_per_second: 请求量很小时，保证每秒最少可重试的次数
+        :param ttl: 统计窗口，单位秒
+        """
+        self.ratio = ratio
+        self.min_retries_per_second = min_retries_per_second
+        self.ttl = ttl
+        self._buckets = deque()  # [second, requests, retries]
+        self._lock = threading.Lock()
+
+    def _current_bucket(self):
+        now = int(time.monotonic())
+        while self._buckets and self._buckets[0][0] <= now - self.ttl:
+            self._buckets.popleft()
+        if not self._buckets or self._buckets[-1][0] != now:
+            self._buckets.append([now, 0, 0])
+        return self._buckets[-1]
+
+    def record_request(self):
+        with self._lock:
+            self._current_bucket()[1] += 1
+
+    def can_retry(self):
+        """
+        预算充足时消耗一次重试额度并返回True
+        :return:
+        """
+        with self._lock:
+            bucket = self._current_bucket()
+            requests = sum(b[1] for b in self._buckets)
+            retries = sum(b[2] for b in self._buckets)
+            if retries >= self.min_retries_per_second * self.ttl + requests * self.ratio:
+                return False
+            bucket[2] += 1
+            return True
+
+
+class RetryPolicy:
+    """
+    重试策略
+    1. 仅对可重试的状态码及异常重试，400/401等参数错误不重试
+    2. 指数退避 + full jitter：第n次重试前等待 random(0, min(backoff_max, backoff_base * 2 ** (n - 1))) 秒
+    3. 非幂等api（如/msg/receive）仅在请求确定未被服务端处理时重试（无法连接服务器、429）
+    4. 受RetryBudget限制
+    """
+
+    def __init__(self, max_retries: int=2, backoff_base: float=0.1, backoff_max: float=2.0,
+                 retryable_status_codes=(429, 500, 502, 503, 504),
+                 retryable_error_codes=("SDK_HTTP_ERROR", "SDK_SERVER_UNREACHABLE"),
+                 non_idempotent_actions=NON_IDEMPOTENT_ACTIONS, budget: RetryBudget=None):
+        """
+        :param max_retries: 默认最大重试次数，可被api的retry参数覆盖
+        :param backoff_base: 退避基数，单位秒
+        :param backoff_max: 单次退避上限，单位秒
+        :param retryable_status_codes: 可重试的http状态码
+        :param retryable_error_codes: 可重试的ClientException错误码
+        :param non_idempotent_actions: 非幂等api
+        :param budget: 重试预算，默认RetryBudget()；传入False关闭
+        """
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retryable_status_codes = frozenset(retryable_status_codes)
+        self.retryable_error_codes = frozenset(retryable_error_codes)
+        self.non_idempotent_actions = frozenset(non_idempotent_actions)
+        self.budget = RetryBudget() if budget is None else budget
+
+    def record_request(self):
+        if self.budget:
+            self.budget.record_request()
+
+    def is_idempotent(self, action):
+        return action not in self.non_idempotent_actions
+
+    def is_retryable(self, request, exception):
+        """
+        :param request: CommonRequest
+        :param exception: 本次请求的异常
+        :return:
+        """
+        if isinstance(exception, ServerException):
+            retryable = exception.http_status_code in self.retryable_status_codes
+            unprocessed = exception.http_status_code == 429
+        elif isinstance(exception, ClientException):
+            retryable = exception.error_code in self.retryable_error_codes
+            unprocessed = exception.error_code == "SDK_SERVER_UNREACHABLE"
+        else:
+            return False
+        if not retryable:
+            return False
+        return unprocessed or self.is_idempotent(request.action)
+
+    def should_retry(self, request, exception, attempt, max_retries=None):
+        """
+        :param request: CommonRequest
+        :param exception: 本次请求的异常
+        :param attempt: 已重试次数
+        :param max_retries: 最大重试次数，为None时使用self.max_retries
+        :return:
+        """
+        if max_retries is None:
+            max_retries = self.max_retries
+        if attempt >= max_retries or not self.is_retryable(request, exception):
+            return False
+        return not self.budget or self.budget.can_retry()
+
+    def backoff(self, attempt):
+        """
+        第attempt次重试前的等待时间
+        :param attempt: 从1开始
+        :return: 秒
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
@@ -0,0 +1,98 @@
+import json
+import asyncio
+import threading
+
+from wulaisdk.actions import READ_ACTIONS
+
+
+class Call:
+    """
+    进行中的请求
+    """
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.exception = None
+
+
+class SingleFlight:
+    """
+    请求合并（single-flight）
+    对于只读api，同一时刻参数相同的请求只发出一次，并发的调用方共享同一个响应结果（同一个对象，请勿修改）。
+    """
+
+    def __init__(self, actions=READ_ACTIONS):
+        """
+        :param actions: 允许合并的api，默认为只读api
+        """
+        self.actions = frozenset(actions)
+        self.requests = 0
+        self.shared = 0
+        self._calls = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+
+    def applies(self, action):
+        return action in self.actions
+
+    @staticmethod
+    def make_key(request, response_model=None):
+        params = json.dumps(request.params, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+        model = response_model.__name__ if response_model is not None else ""
+        response_format = request.opts.get("response_format") or ""
+        return "{}|{}|{}|{}".format(request.action, model, response_format, params)
+
+    def do(self, key, fn):
+        """
+        :param key:
+        :param fn: 实际发起请求的函数
+        :return: fn的返回值
+        """
+        with self._lock:
+            self.requests += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.event.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.exception = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+    async def do_async(self, key, coro_fn):
+        """
+        :param key:
+        :param coro_fn: 返回coroutine的函数
+        :return: coroutine的返回值
+        """
+        with self._lock:
+            self.requests += 1
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(coro_fn())
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            else:
+                self.shared += 1
+        # 调用方被取消时不影响其他共享该请求的调用方
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """
+        :return: {"requests": 经过合并层的请求数, "shared": 共享了其他请求结果的请求数}
+        """
+        with self._lock:
+            return {"requests": self.requests, "shared": self.shared}
@@ -0,0 +1,92 @@
+import hashlib
+import contextlib
+
+from wulaisdk.exceptions import ClientException, ERR_INFO
+
+try:
+    from opentelemetry import trace, propagate
+except ImportError:  # pragma: no cover
+    trace = propagate = None
+
+
+class TracingPolicy:
+    """
+    链路追踪
+    每次api调用创建一个span，每次http请求（包括重试）创建一个子span，并在请求headers中注入追踪信息。
+    默认使用OpenTelemetry：pip install wulaisdk[tracing]
+    span属性：
+        wulai.action、wulai.api_version、wulai.user_id_hash（请求参数中user_id的sha256前16位）、wulai.retries、
+        wulai.attempt、wulai.error_code、http.response.status_code
+    """
+
+    def __init__(self, tracer=None, inject=None, hash_salt: str="", record_user_id: bool=True):
+        """
+        :param tracer: OpenTelemetry的Tracer，默认opentelemetry.trace.get_tracer("wulaisdk")。
+        也可以是实现同名start_as_current_span方法的对象，span需实现set_attribute及record_exception
+        :param inject: inject(headers)，在请求headers中写入追踪信息，默认使用OpenTelemetry全局配置的propagator（W3C traceparent）
+        :param hash_salt: 计算user_id哈希时的盐
+        :param record_user_id: 是否记录wulai.user_id_hash
+        """
+        if tracer is None:
+            if trace is None:
+                raise ClientException("SDK_DEPENDENCY_MISSING",
+                                      ERR_INFO["SDK_DEPENDENCY_MISSING"].format("opentelemetry-api"))
+            tracer = trace.get_tracer("wulaisdk")
+        if inject is None and propagate is not None:
+            inject = propagate.inject
+        self.tracer = tracer
+        self.inject = inject
+        self.hash_salt = hash_salt
+        self.record_user_id = record_user_id
+
+    def hash_user_id(self, user_id):
+        return hashlib.sha256((self.hash_salt + str(user_id)).encode("utf-8")).hexdigest()[:16]
+
+    def request_attributes(self, request, api_version):
+        attributes = {"wulai.action": request.action, "wulai.api_version": api_version}
+        user_id = request.params.get("user_id") if isinstance(request.params, dict) else None
+        if self.record_user_id and user_id:
+            attributes["wulai.user_id_hash"] = self.hash_user_id(user_id)
+        return attributes
+
+    def request_span(self, request, api_version):
+        """
+        一次api调用的span
+        :return: context manager
+        """
+        return self.tracer.start_as_current_span("wulai " + request.action,
+                                                 attributes=self.request_attributes(request, api_version),
+                                                 record_exception=False)
+
+    @contextlib.contextmanager
+    def attempt_span(self, request, attempt):
+        """
+        一次http请求的span，在其中注入追踪headers
+        :return: context manager
+        """
+        with self.tracer.start_as_current_span("wulai " + request.action + " attempt",
+                                               attributes={"wulai.attempt": attempt},
+                                               record_exception=False) as span:
+            if self.inject is not None:
+                self.inject(request.headers)
+            yield span
+
+    @staticmethod
+    def record_result(span, exception=None, retries=None):
+        """
+        :param span:
+        :param exception: 请求的异常，成功时为None
+        :param retries: 重试次数，api调用的span记录
+        """
+        if retries is not None:
+            span.set_attribute("wulai.retries", retries)
+        if exception is None:
+            span.set_attribute("http.response.status_code", 200)
+            return
+        status_code = getattr(exception, "http_status_code", None)
+        if status_code is not None:
+            span.set_attribute("http.response.status_code", status_code)
+        span.set_attribute("wulai.error_code", exception.error_code)
+        span.record_exception(exception)
+        if trace is not None and hasattr(span, "set_status"):
+            span.set_status(trace.Status(trace.StatusCode.ERROR, str(exception)))